@@ -1,4 +1,4 @@
-from physics.thermophysical import density_thermo, density_mendeleev
+from engine.sweep import sweep
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
@@ -7,9 +7,9 @@ import numpy as np
 # Define temperature range and step
 temperatures = np.arange(-50, 501, 50)
 
-# Calculate density using density_thermo and density_mendeleev
-density_thermo = [density_thermo(t) for t in temperatures]
-density_mendeleev = [density_mendeleev(t) for t in temperatures]
+# Calculate density using density_thermo and density_mendeleev (vectorized, cached on disk)
+density_thermo = sweep("density_thermo", {"t": temperatures})["value"]
+density_mendeleev = sweep("density_mendeleev", {"t": temperatures})["value"]
 
 # Create a DataFrame with temperature, density_thermo, and density_mendeleev
 data = {
@@ -1,4 +1,4 @@
-from physics.thermophysical import kinematic_viscosity_idelchik, kinematic_viscosity_thermo
+from engine.sweep import sweep
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
@@ -8,8 +8,9 @@ import numpy as np
 temperatures = np.arange(-80, 80, 5)
 
 # Calculate viscosity using kinematic_viscosity_idelchik and kinematic_viscosity_thermo
-kinematic_viscosity_thermo = [kinematic_viscosity_thermo(t) for t in temperatures]
-kinematic_viscosity_idelchik = [kinematic_viscosity_idelchik(t) for t in temperatures]
+# (vectorized, cached on disk)
+kinematic_viscosity_thermo = sweep("kinematic_viscosity_thermo", {"t": temperatures})["value"]
+kinematic_viscosity_idelchik = sweep("kinematic_viscosity_idelchik", {"t": temperatures})["value"]
 
 # Create a DataFrame
 data = {
@@ -0,0 +1,86 @@
+from engine.sweep import sweep
+import matplotlib.pyplot as plt
+import numpy as np
+
+# Define flow range (m^3/h)
+flows = np.linspace(100, 3000, 60)
+
+# Typical element of each type: (title, sweep target, flow argument, branch flows
+# proportional to the total flow, fixed arguments, results)
+elements = [
+    (
+        "Duct Ø250, 1 m",
+        "duct",
+        "flow",
+        None,
+        dict(length=1.0, temperature=20, diameter=0.25),
+        ["dP"],
+    ),
+    (
+        "Elbow 90° Ø250",
+        "elbow",
+        "flow",
+        None,
+        dict(temperature=20, angle=90, r0=0.25, diameter=0.25),
+        ["dP"],
+    ),
+    (
+        "Transition Ø250 -> Ø315",
+        "transition",
+        "flow",
+        None,
+        dict(temperature=20, diameter1=0.25, diameter2=0.315, length=0.3),
+        ["dP"],
+    ),
+    (
+        "Tee Ø315 (diverge, 1/3 to branch)",
+        "tee",
+        "flow_c",
+        {"flow_o": ("flow_c", 1 / 3)},
+        dict(
+            temperature=20,
+            angle=90,
+            flowtype="diverge",
+            diameter_c=0.315,
+            diameter_o=0.2,
+            diameter_p=0.315,
+        ),
+        ["dP_o", "dP_p"],
+    ),
+    (
+        "Cross Ø315 (converge, 1/4 per branch)",
+        "cross",
+        "flow_c",
+        {"flow_o1": ("flow_c", 1 / 4), "flow_o2": ("flow_c", 1 / 4)},
+        dict(
+            temperature=20,
+            flowtype="converge",
+            angle_o1=90,
+            angle_o2=90,
+            diameter_c=0.315,
+            diameter_o1=0.2,
+            diameter_o2=0.2,
+            diameter_p=0.315,
+        ),
+        ["dP_o1", "dP_p"],
+    ),
+]
+
+fig, axes = plt.subplots(len(elements), 1, figsize=(7, 3 * len(elements)), sharex=True)
+for ax, (title, target, flow_name, linked, fixed, names) in zip(axes, elements):
+    # Calculate dP over the whole flow range at once (vectorized, cached on disk)
+    result = sweep(target, {flow_name: flows}, linked, **fixed)
+    for name in names:
+        ax.plot(flows, result[name], label=name)
+    ax.set_title(title)
+    ax.set_ylabel("dP (Pa)")
+    ax.legend()
+    ax.grid()
+axes[-1].set_xlabel("Flow (m^3/h)")
+plt.tight_layout()
+
+# Save the plot as a file
+plt.savefig("analytics/plots/pressure_loss_plot.png")
+
+# Close the plot
+plt.close()
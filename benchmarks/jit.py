@@ -0,0 +1,71 @@
+# Сравнение пакетного расчета по NumPy и скомпилированными циклами numba (jit=True).
+# Запуск из корня репозитория: python -m benchmarks.jit
+import time
+import numpy as np
+from engine.store import KERNELS
+from physics import compiled
+
+SIZES = [10**4, 10**5, 10**6]
+REPEATS = 3
+
+
+def duct_columns(size, rng):
+    return {
+        "flow": rng.uniform(100, 5000, size),
+        "length": rng.uniform(0.5, 10, size),
+        "temperature": rng.uniform(-30, 40, size),
+        "diameter": rng.choice([0.1, 0.16, 0.2, 0.25, 0.315], size),
+    }
+
+
+def elbow_columns(size, rng):
+    return {
+        "flow": rng.uniform(100, 5000, size),
+        "temperature": rng.uniform(-30, 40, size),
+        "angle": rng.choice([30, 45, 60, 90], size),
+        "r0": rng.uniform(0.1, 0.5, size),
+        "oriented": np.where(rng.random(size) < 0.5, "horiz", "vert"),
+        "height": rng.choice([0.2, 0.3, 0.4], size),
+        "width": rng.choice([0.2, 0.3, 0.5], size),
+    }
+
+
+def transition_columns(size, rng):
+    return {
+        "flow": rng.uniform(100, 5000, size),
+        "temperature": rng.uniform(-30, 40, size),
+        "diameter1": rng.choice([0.16, 0.2, 0.25], size),
+        "diameter2": rng.choice([0.315, 0.4], size),
+        "length": rng.uniform(0.1, 0.5, size),
+    }
+
+
+def best_time(function):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+if __name__ == "__main__":
+    if not compiled.AVAILABLE:
+        raise SystemExit("numba не установлен: пакетные функции считают только по NumPy")
+    rng = np.random.default_rng(0)
+    print(f"Лучшее из {REPEATS} повторов, с (первый вызов с jit=True - компиляция, не учитывается)")
+    print(f"{'элемент':>10} {'строк':>9} {'numpy':>8} {'jit':>8} {'ускорение':>10}")
+    for kind, make_columns in [
+        ("duct", duct_columns),
+        ("elbow", elbow_columns),
+        ("transition", transition_columns),
+    ]:
+        for size in SIZES:
+            columns = make_columns(size, rng)
+            KERNELS[kind](**columns, jit=True)
+            numpy_time = best_time(lambda: KERNELS[kind](**columns, derivative=True))
+            jit_time = best_time(lambda: KERNELS[kind](**columns, derivative=True, jit=True))
+            print(
+                f"{kind:>10} {size:>9} {numpy_time:>8.4f} {jit_time:>8.4f} "
+                f"{numpy_time / jit_time:>10.2f}"
+            )
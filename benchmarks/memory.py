@@ -0,0 +1,227 @@
+# Память пакетных функций: пик выделенной памяти (tracemalloc) и пик RSS процесса
+# на расчет пакета, сравнение с допустимыми значениями из benchmarks/memory_budgets.json.
+# Пик tracemalloc приводится к количеству столбцов float64 длины пакета - это число
+# одновременно живущих временных массивов (и результатов) и от размера пакета почти
+# не зависит. Запуск из корня репозитория:
+#   python -m benchmarks.memory [--sizes 10000 1000000] [--kinds duct tee] [--update]
+# Код завершения 1, если хотя бы одно значение больше допустимого.
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+from benchmarks.jit import elbow_columns, transition_columns
+from benchmarks.transport import duct_columns, tee_columns
+from engine.store import KERNELS
+
+SIZES = [10**4, 10**5, 10**6]
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "memory_budgets.json")
+
+# Запас при записи допустимых значений по замеру (--update)
+HEADROOM = 1.25
+
+# RSS меньших пакетов определяется в основном округлением до страниц и работой
+# распределителя памяти, поэтому сравнивается только от этого размера
+RSS_MIN_SIZE = 10**5
+
+
+def cross_columns(size, rng):
+    flow_c = rng.uniform(1000, 5000, size)
+    return {
+        "temperature": rng.uniform(-30, 40, size),
+        "angle_o1": 90,
+        "angle_o2": rng.choice([45, 90], size),
+        "flowtype": np.where(rng.random(size) < 0.5, "diverge", "converge"),
+        "flow_c": flow_c,
+        "flow_o1": flow_c * rng.uniform(0.05, 0.3, size),
+        "flow_o2": flow_c * rng.uniform(0.05, 0.3, size),
+        "diameter_c": 0.4,
+        "diameter_o1": 0.2,
+        "diameter_o2": 0.16,
+        "diameter_p": 0.315,
+    }
+
+
+COLUMNS = {
+    "duct": duct_columns,
+    "elbow": elbow_columns,
+    "transition": transition_columns,
+    "tee": tee_columns,
+    "cross": cross_columns,
+}
+
+
+def _rss(field):
+    # Значение из /proc/self/status, байт (VmRSS - текущий RSS, VmHWM - пик); None вне Linux
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def _reset_peak_rss():
+    # Сброс пика RSS процесса (Linux 4.0+), чтобы пик относился только к замеру
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(kind, size, seed=0, **batch_params):
+    """
+    Замер памяти одного вызова пакетной функции.
+
+    Аргументы:
+    kind - вид элемента
+    size - размер пакета
+    seed - начальное значение генератора случайных столбцов
+    batch_params - аргументы на весь пакет (derivative, dtype, jit)
+
+    Возвращает:
+    словарь: 'time' (с), 'traced_peak' (байт), 'columns' (пик в столбцах float64),
+    'rss_peak' (прирост пика RSS над RSS до вызова, байт; None, если не измеряется)
+    """
+    columns = COLUMNS[kind](size, np.random.default_rng(seed))
+    # Прогрев: таблицы, кэши и компиляция не относятся к расчету пакета
+    KERNELS[kind](
+        **{name: value[:1] if np.ndim(value) else value for name, value in columns.items()}
+    )
+
+    # Пик RSS - в отдельном вызове: tracemalloc сам занимает память под трассировку
+    rss_peak = None
+    if _reset_peak_rss():
+        before = _rss("VmRSS")
+        started = time.perf_counter()
+        result = KERNELS[kind](**columns, **batch_params)
+        elapsed = time.perf_counter() - started
+        rss_peak = _rss("VmHWM") - before
+        del result
+    else:
+        started = time.perf_counter()
+        KERNELS[kind](**columns, **batch_params)
+        elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        result = KERNELS[kind](**columns, **batch_params)
+        traced_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "time": elapsed,
+        "traced_peak": traced_peak,
+        "columns": traced_peak / (8 * size),
+        "rss_peak": rss_peak,
+    }
+
+
+def budget_key(kind, derivative=False):
+    """
+    Ключ допустимых значений: вид элемента, с производными - '<вид>:derivative'.
+    """
+    return f"{kind}:derivative" if derivative else kind
+
+
+def violations(kind, size, measurement, budgets, derivative=False):
+    """
+    Сравнение замера с допустимыми значениями вида элемента.
+
+    Аргументы:
+    kind - вид элемента
+    size - размер пакета
+    measurement - результат measure()
+    budgets - словарь {ключ (budget_key()): {'columns': ..., 'rss_bytes_per_row': ...}}
+    derivative - замер с производными
+
+    Возвращает:
+    список строк с описанием превышений (пустой, если превышений нет)
+    """
+    budget = budgets.get(budget_key(kind, derivative), {})
+    result = []
+    if "columns" in budget and measurement["columns"] > budget["columns"]:
+        result.append(
+            f"{kind} {size}: пик {measurement['columns']:.1f} столбцов > {budget['columns']}"
+        )
+    if (
+        "rss_bytes_per_row" in budget
+        and measurement["rss_peak"] is not None
+        and size >= RSS_MIN_SIZE
+        and measurement["rss_peak"] / size > budget["rss_bytes_per_row"]
+    ):
+        result.append(
+            f"{kind} {size}: RSS {measurement['rss_peak'] / size:.0f} байт/строка "
+            f"> {budget['rss_bytes_per_row']}"
+        )
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.memory",
+        description="Пик памяти пакетных функций и сравнение с допустимыми значениями",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="размеры пакетов")
+    parser.add_argument("--kinds", nargs="+", choices=list(COLUMNS), default=list(COLUMNS))
+    parser.add_argument("--derivative", action="store_true", help="считать производные")
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=f"записать допустимые значения по замеру (с запасом {HEADROOM})",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(BUDGETS_PATH, encoding="utf-8") as jsonfile:
+        budgets = json.load(jsonfile)
+
+    print(
+        f"{'элемент':>10} {'строк':>9} {'время, с':>9} {'пик, МБ':>9} {'столбцов':>9} "
+        f"{'RSS, МБ':>9}"
+    )
+    failures = []
+    measured = {}
+    for kind in args.kinds:
+        for size in args.sizes:
+            measurement = measure(kind, size, derivative=args.derivative)
+            rss = measurement["rss_peak"]
+            print(
+                f"{kind:>10} {size:>9} {measurement['time']:>9.3f} "
+                f"{measurement['traced_peak'] / 2**20:>9.1f} {measurement['columns']:>9.1f} "
+                f"{'-' if rss is None else f'{rss / 2**20:.1f}':>9}"
+            )
+            failures.extend(violations(kind, size, measurement, budgets, args.derivative))
+            worst = measured.setdefault(
+                budget_key(kind, args.derivative), {"columns": 0, "rss_bytes_per_row": 0}
+            )
+            worst["columns"] = max(worst["columns"], measurement["columns"])
+            if rss is not None and size >= RSS_MIN_SIZE:
+                worst["rss_bytes_per_row"] = max(worst["rss_bytes_per_row"], rss / size)
+
+    if args.update:
+        for key, worst in measured.items():
+            budgets[key] = {
+                name: round(value * HEADROOM, 1) for name, value in worst.items() if value
+            }
+        with open(BUDGETS_PATH, "w", encoding="utf-8") as jsonfile:
+            json.dump(budgets, jsonfile, indent=4)
+        print(f"Допустимые значения записаны в {BUDGETS_PATH}")
+        return 0
+
+    for failure in failures:
+        print(f"Превышение: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
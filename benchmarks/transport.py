@@ -0,0 +1,61 @@
+# Сравнение передачи данных исполнителям: общая память против сериализации срезов.
+# Запуск из корня репозитория: python -m benchmarks.transport
+import concurrent.futures
+import time
+import numpy as np
+from engine.parallel import evaluate_columns
+
+JOBS = 4
+SIZES = [10**5, 10**6, 4 * 10**6]
+REPEATS = 3
+
+
+def duct_columns(size, rng):
+    return {
+        "flow": rng.uniform(100, 5000, size),
+        "length": rng.uniform(0.5, 10, size),
+        "temperature": rng.uniform(-30, 40, size),
+        "diameter": rng.choice([0.1, 0.16, 0.2, 0.25, 0.315], size),
+    }
+
+
+def tee_columns(size, rng):
+    return {
+        "temperature": rng.uniform(-30, 40, size),
+        "angle": 90,
+        "flowtype": np.where(rng.random(size) < 0.5, "diverge", "converge"),
+        "flow_o": rng.uniform(100, 1000, size),
+        "flow_p": rng.uniform(100, 1000, size),
+        "diameter_c": 0.315,
+        "diameter_o": 0.2,
+        "diameter_p": 0.25,
+    }
+
+
+def best_time(function):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"Процессов: {JOBS}, лучшее из {REPEATS} повторов, с")
+    print(f"{'элемент':>8} {'строк':>9} {'1 процесс':>10} {'pickle':>8} {'shared':>8}")
+    with concurrent.futures.ProcessPoolExecutor(JOBS) as executor:
+        for kind, make_columns in [("duct", duct_columns), ("tee", tee_columns)]:
+            for size in SIZES:
+                columns = make_columns(size, rng)
+                single = best_time(lambda: evaluate_columns(kind, columns))
+                pickled, shared = [
+                    best_time(
+                        lambda: evaluate_columns(
+                            kind, columns, JOBS, transport=transport, executor=executor
+                        )
+                    )
+                    for transport in ("pickle", "shared")
+                ]
+                print(f"{kind:>8} {size:>9} {single:>10.3f} {pickled:>8.3f} {shared:>8.3f}")
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from physics.hydraulic import (
     velocity,
     dynamic_pressure,
@@ -7,8 +8,20 @@ from physics.thermophysical import (
     density_mendeleev,
     density_thermo,
 )
+from physics import vectorized
 
-from calculations.tee import velocity_best_mixture, dzeta_converge, dzeta_diverge
+from calculations.tee import (
+    velocity_best_mixture,
+    velocity_best_mixture_derivative,
+    dzeta_converge,
+    dzeta_diverge,
+    dzeta_converge_derivative,
+    dzeta_diverge_derivative,
+    dzeta_converge_batch,
+    dzeta_diverge_batch,
+    dzeta_converge_derivative_batch,
+    dzeta_diverge_derivative_batch,
+)
 
 
 def cross(
@@ -34,6 +47,7 @@ def cross(
     width_p=None,
     roughness=0.001,
     thermophysics="idelchik",
+    derivative=False,
 ):
     """
     Рассчитывает потери давления в крестовине на основе функции для расчета потерь в тройнике.
@@ -58,12 +72,16 @@ def cross(
     width_x - ширина патрубка, м
     angle_x - угол между ответвлением и проходом, °
     thermophysics - модель термофизических свойств (idelchik или thermo)
+    derivative - если True, дополнительно рассчитываются производные потерь по расходам
 
     Возвращает:
     Словарь с потерями давления на трение, Па.
     Ключи словаря:
     'dP_o' - потери при движении среды «на отвод»,
     'dP_p' - потери при движении среды «на проход».
+    При derivative=True дополнительно ключи вида 'ddP_x_dflow_y' (x, y - o1, o2, p) -
+    производные потерь по расходам ответвлений и прохода, Па/(куб.м/ч).
+    Независимыми считаются flow_o1, flow_o2 и flow_p, flow_c - их сумма.
     """
 
     print("================================")
@@ -193,6 +211,205 @@ height_p: {height_p} м, width_p: {width_p} м, diameter_p: {diameter_p} м"""
     print(f"Полные dP крестовины, на отвод 1: {result['dP_o1']:.3f} Па")
     print(f"Полные dP крестовины, на отвод 2: {result['dP_o2']:.3f} Па")
     print(f"Полные dP крестовины, на проход: {result['dP_p']:.3f} Па")
+
+    if derivative:
+        # Производные скоростей по расходам: скорость в патрубке пропорциональна его расходу,
+        # а flow_c (сумма) меняется вместе с любым из них
+        branches = {
+            "o1": (flow_o1, v_o1, angle_o1, dzeta_o1),
+            "o2": (flow_o2, v_o2, angle_o2, dzeta_o2),
+            "p": (flow_p, v_p, 0, dzeta_p),
+        }
+        dv_c = v_c / flow_c
+        dp_dyn = 2 * p_dyn / v_c * dv_c
+        for name, (flow_x, v_x, angle_x, _) in branches.items():
+            if flowtype == "converge":
+                dv_base = velocity_best_mixture_derivative(v_x, angle_x, flow_c, v_base)
+            for path, (flow_path, v_path, angle_path, dzeta_path) in branches.items():
+                dv_path = v_path / flow_path if path == name else 0
+                if flowtype == "converge":
+                    ddzeta = dzeta_converge_derivative(v_path, v_c, v_base, dv_path, dv_c, dv_base)
+                elif flowtype == "diverge":
+                    ddzeta = dzeta_diverge_derivative(angle_path, v_path, v_c, dv_path, dv_c)
+                result[f"ddP_{path}_dflow_{name}"] = dp_dyn * dzeta_path + p_dyn * ddzeta
+            print(
+                f"Производные dP по flow_{name}, на отвод 1: {result[f'ddP_o1_dflow_{name}']:.5f}, "
+                f"на отвод 2: {result[f'ddP_o2_dflow_{name}']:.5f}, "
+                f"на проход: {result[f'ddP_p_dflow_{name}']:.5f} Па/(куб.м/ч)"
+            )
+
     print("================================")
 
     return result
+
+
+def cross_batch(
+    temperature,
+    flowtype,
+    flow_c=None,
+    flow_o1=None,
+    flow_o2=None,
+    flow_p=None,
+    diameter_c=None,
+    height_c=None,
+    width_c=None,
+    angle_o1=None,
+    diameter_o1=None,
+    height_o1=None,
+    width_o1=None,
+    angle_o2=None,
+    diameter_o2=None,
+    height_o2=None,
+    width_o2=None,
+    diameter_p=None,
+    height_p=None,
+    width_p=None,
+    roughness=0.001,
+    thermophysics="idelchik",
+    derivative=False,
+    dtype="float64",
+    out=None,
+    intermediates=None,
+):
+    """
+    Пакетный (векторизованный) расчет потерь давления в крестовинах, формулы как в cross().
+    Каждый аргумент, кроме thermophysics, может быть массивом или скаляром
+    (скаляр растягивается на весь пакет), в т.ч. flowtype.
+    Незаданные расходы и габариты - None или NaN, в каждой строке должно быть задано
+    три из четырех расходов. Проверки входных данных не выполняются,
+    строки с некорректными данными дают NaN. Ничего не печатает.
+
+    Аргументы:
+    как у cross(), плюс
+    dtype - тип чисел расчета: "float64" или "float32" (компактный режим - вдвое меньше
+        памяти на столбцы; отклонение от float64 - см. engine.precision.check_precision())
+    out - словарь массивов длины пакета, в которые записываются результаты
+        'dP_o1', 'dP_o2', 'dP_p', 'zeta_o1', 'zeta_o2', 'zeta_p', 'velocity'
+        (скорость в сборном рукаве) - только имена, которые есть в out
+        (см. vectorized.write_out())
+    intermediates - имена промежуточных величин, которые нужно вернуть столбцами
+        вместе с результатом (см. vectorized.capture()): 'zeta_o1', 'zeta_o2',
+        'zeta_p', 'v_base', 'velocity_c', 'velocity_o1', 'velocity_o2', 'velocity_p',
+        'flow_c', 'flow_o1', 'flow_o2', 'flow_p', 'p_dyn', 'density'
+
+    Возвращает:
+    Словарь массивов с теми же ключами, что и у cross(), а также запрошенные
+    промежуточные величины.
+    """
+    dtype = vectorized.float_dtype(dtype)
+    density = vectorized.thermophysics_functions(thermophysics, dtype)[1]
+    (
+        temperature,
+        flowtype,
+        flow_c,
+        flow_o1,
+        flow_o2,
+        flow_p,
+        diameter_c,
+        height_c,
+        width_c,
+        angle_o1,
+        diameter_o1,
+        height_o1,
+        width_o1,
+        angle_o2,
+        diameter_o2,
+        height_o2,
+        width_o2,
+        diameter_p,
+        height_p,
+        width_p,
+    ) = vectorized.as_columns(
+        temperature,
+        flowtype,
+        flow_c,
+        flow_o1,
+        flow_o2,
+        flow_p,
+        diameter_c,
+        height_c,
+        width_c,
+        angle_o1,
+        diameter_o1,
+        height_o1,
+        width_o1,
+        angle_o2,
+        diameter_o2,
+        height_o2,
+        width_o2,
+        diameter_p,
+        height_p,
+        width_p,
+        dtype=dtype,
+    )
+    converge = flowtype == "converge"
+
+    # Недостающий расход из баланса
+    flow_c = np.where(np.isnan(flow_c), flow_o1 + flow_o2 + flow_p, flow_c)
+    flow_o1 = np.where(np.isnan(flow_o1), flow_c - flow_o2 - flow_p, flow_o1)
+    flow_o2 = np.where(np.isnan(flow_o2), flow_c - flow_o1 - flow_p, flow_o2)
+    flow_p = np.where(np.isnan(flow_p), flow_c - flow_o1 - flow_o2, flow_p)
+
+    dv_c = 1 / 3600 / vectorized.section_area(height_c, width_c, diameter_c)
+    v_c = flow_c * dv_c
+    zero = np.zeros_like(v_c)
+    branches = {}
+    for name, flow_x, angle_x, height_x, width_x, diameter_x in [
+        ("o1", flow_o1, angle_o1, height_o1, width_o1, diameter_o1),
+        ("o2", flow_o2, angle_o2, height_o2, width_o2, diameter_o2),
+        ("p", flow_p, zero, height_p, width_p, diameter_p),
+    ]:
+        dv_x = 1 / 3600 / vectorized.section_area(height_x, width_x, diameter_x)
+        branches[name] = (flow_x * dv_x, dv_x, angle_x)
+
+    v_base = (
+        sum(
+            flow_x * branches[name][0] * np.cos(np.radians(branches[name][2]))
+            for name, flow_x in [("o1", flow_o1), ("o2", flow_o2), ("p", flow_p)]
+        )
+        / flow_c
+    )
+
+    rho = density(temperature)
+    p_dyn = vectorized.dynamic_pressure(rho, v_c)
+
+    dzeta = {}
+    result = {}
+    for name, (v_x, _, angle_x) in branches.items():
+        dzeta[name] = np.where(
+            converge,
+            dzeta_converge_batch(v_x, v_c, v_base),
+            dzeta_diverge_batch(angle_x, v_x, v_c),
+        )
+        result[f"dP_{name}"] = p_dyn * dzeta[name]
+
+    if derivative:
+        dp_dyn = rho * v_c * dv_c
+        for name, (v_x, _, angle_x) in branches.items():
+            dv_base = velocity_best_mixture_derivative(v_x, angle_x, flow_c, v_base)
+            for path, (v_path, dv_x, angle_path) in branches.items():
+                dv_path = dv_x if path == name else zero
+                ddzeta = np.where(
+                    converge,
+                    dzeta_converge_derivative_batch(v_path, v_c, v_base, dv_path, dv_c, dv_base),
+                    dzeta_diverge_derivative_batch(angle_path, v_path, v_c, dv_path, dv_c),
+                )
+                result[f"ddP_{path}_dflow_{name}"] = dp_dyn * dzeta[path] + p_dyn * ddzeta
+
+    values = {
+        **result,
+        **{f"zeta_{name}": value for name, value in dzeta.items()},
+        "velocity": v_c,
+        "v_base": v_base,
+        "velocity_c": v_c,
+        **{f"velocity_{name}": branch[0] for name, branch in branches.items()},
+        "flow_c": flow_c,
+        "flow_o1": flow_o1,
+        "flow_o2": flow_o2,
+        "flow_p": flow_p,
+        "p_dyn": p_dyn,
+        "density": rho,
+    }
+    vectorized.write_out(out, values)
+    result.update(vectorized.capture(intermediates, values, dtype))
+    return result
@@ -1,6 +1,7 @@
 from physics.hydraulic import (
     reynolds_number,
     friction_factor,
+    friction_factor_derivative,
     dynamic_pressure,
     velocity,
     hydraulic_diameter,
@@ -11,6 +12,7 @@ from physics.thermophysical import (
     density_mendeleev,
     density_thermo,
 )
+from physics import compiled, vectorized
 
 
 # Главная функция для расчета потерь в воздуховоде
@@ -23,6 +25,7 @@ def duct(
     diameter=None,
     roughness=0.001,
     thermophysics="idelchik",
+    derivative=False,
 ):
     """
     Рассчитывает потери давления в воздуховоде по формуле Дарси-Вейсбаха.
@@ -39,9 +42,11 @@ def duct(
     temperature - Температура воздуха, °C
     roughness - абсолютная шероховатость, м
     thermophysics - модель термофизических свойств (idelchik или thermo)
+    derivative - если True, дополнительно рассчитывается производная потерь по расходу
 
     Возвращает:
-    Потери давления на трение, Па
+    Потери давления на трение, Па.
+    При derivative=True - кортеж (потери, Па; производная потерь по расходу, Па/(м^3/ч))
     """
 
     ###########Проверки#############
@@ -92,6 +97,109 @@ def duct(
     result = p_dyn * dzeta
 
     print(f"Полные dP в воздуховоде: {result:.3f} Па")
+
+    if derivative:
+        # Аналитическая производная: скорость, Re и p_dyn зависят от расхода,
+        # p_dyn ~ flow^2, lmbd зависит от расхода через Re
+        dlmbd = friction_factor_derivative(re, d_hyd, roughness) * re / flow
+        dp_dyn = 2 * p_dyn / flow
+        result_derivative = (dlmbd * p_dyn + lmbd * dp_dyn) * length / d_hyd
+        print(f"Производная dP по расходу: {result_derivative:.5f} Па/(м^3/ч)")
+        print("================================")
+        return result, result_derivative
+
     print("================================")
 
     return result
+
+
+def duct_batch(
+    flow,
+    length,
+    temperature,
+    height=None,
+    width=None,
+    diameter=None,
+    roughness=0.001,
+    thermophysics="idelchik",
+    derivative=False,
+    dtype="float64",
+    jit=False,
+    out=None,
+    intermediates=None,
+):
+    """
+    Пакетный (векторизованный) расчет потерь давления в воздуховодах, формулы как в duct().
+    Каждый аргумент может быть массивом или скаляром (скаляр растягивается на весь пакет).
+    Незаданные габариты - None или NaN. Проверки входных данных не выполняются,
+    строки с некорректными данными дают NaN. Ничего не печатает.
+
+    Аргументы:
+    как у duct(), плюс
+    dtype - тип чисел расчета: "float64" или "float32" (компактный режим - вдвое меньше
+        памяти на столбцы; отклонение от float64 - см. engine.precision.check_precision())
+    jit - если True и установлен numba, потери считаются одним скомпилированным циклом
+        без промежуточных массивов (physics.compiled); без numba, а также с out,
+        intermediates или dtype="float32" - по NumPy
+    out - словарь массивов длины пакета, в которые записываются результаты
+        'dP', 'zeta' (λ·l/d), 'velocity', 'Re', 'lambda' - только имена, которые есть в out
+        (см. vectorized.write_out()), например срезы engine.results
+    intermediates - имена промежуточных величин, которые нужно вернуть столбцами
+        вместе с результатом (см. vectorized.capture()): 'Re', 'lambda', 'zeta',
+        'velocity', 'p_dyn', 'density', 'kinematic_viscosity', 'd_hyd'
+
+    Возвращает:
+    Словарь массивов:
+    'dP' - потери давления на трение, Па,
+    'ddP_dflow' - производная потерь по расходу, Па/(м^3/ч) (только при derivative=True),
+    а также запрошенные промежуточные величины.
+    """
+    dtype = vectorized.float_dtype(dtype)
+    kinematic_viscosity, density = vectorized.thermophysics_functions(thermophysics, dtype)
+    flow, length, temperature, height, width, diameter, roughness = vectorized.as_columns(
+        flow, length, temperature, height, width, diameter, roughness, dtype=dtype
+    )
+    if compiled.enabled(jit, dtype, out, intermediates):
+        return compiled.duct_losses(
+            flow,
+            length,
+            height,
+            width,
+            diameter,
+            roughness,
+            kinematic_viscosity(temperature),
+            density(temperature),
+            derivative,
+        )
+
+    d_hyd = vectorized.hydraulic_diameter(height, width, diameter)
+    dv = 1 / 3600 / vectorized.section_area(height, width, diameter)
+    v = flow * dv
+    nu = kinematic_viscosity(temperature)
+    re = vectorized.reynolds_number(v, d_hyd, nu)
+    lmbd = vectorized.friction_factor(re, d_hyd, roughness)
+    rho = density(temperature)
+    p_dyn = vectorized.dynamic_pressure(rho, v)
+
+    result = {"dP": p_dyn * lmbd * length / d_hyd}
+
+    if derivative:
+        dre = d_hyd / nu * dv
+        dlmbd = vectorized.friction_factor_derivative(re, d_hyd, roughness) * dre
+        dp_dyn = rho * v * dv
+        result["ddP_dflow"] = (dlmbd * p_dyn + lmbd * dp_dyn) * length / d_hyd
+
+    values = {
+        "dP": result["dP"],
+        "zeta": lambda: lmbd * length / d_hyd,
+        "velocity": v,
+        "Re": re,
+        "lambda": lmbd,
+        "p_dyn": p_dyn,
+        "density": rho,
+        "kinematic_viscosity": nu,
+        "d_hyd": d_hyd,
+    }
+    vectorized.write_out(out, values)
+    result.update(vectorized.capture(intermediates, values, dtype))
+    return result
@@ -1,7 +1,9 @@
 import math
+import numpy as np
 from physics.hydraulic import (
     reynolds_number,
     friction_factor,
+    friction_factor_derivative,
     dynamic_pressure,
     velocity,
     hydraulic_diameter,
@@ -12,6 +14,7 @@ from physics.thermophysical import (
     density_mendeleev,
     density_thermo,
 )
+from physics import compiled, vectorized
 
 
 def elbow(
@@ -26,6 +29,7 @@ def elbow(
     roughness=0.0015,
     thermophysics="idelchik",
     calcversion=None,
+    derivative=False,
 ):
     """
     Рассчитывает потери давления в отводе (повороте воздуховода) по
@@ -47,9 +51,11 @@ def elbow(
     roughness - абсолютная шероховатость, м
     thermophysics - модель термофизических свойств (idelchik или thermo)
     calcversion - версия расчета. "22" - версия без kdelta и kre
+    derivative - если True, дополнительно рассчитывается производная потерь по расходу
 
     Возвращает:
-    Потери давления на трение, Па
+    Потери давления на трение, Па.
+    При derivative=True - кортеж (потери, Па; производная потерь по расходу, Па/(м^3/ч))
     """
     print("================================")
     print(
@@ -138,6 +144,198 @@ k_re: {k_re:.3f}, A1: {A1:.3f}, B1: {B1:.3f}, C1: {C1:.3f}\ndzeta: {dzeta:.3f}"
 
     result = dzeta * p_dyn
     print(f"Полные dP в отводе: {result:.3f} Па")
+
+    if derivative:
+        # Аналитическая производная: от расхода зависят p_dyn (~flow^2), lmbd и k_re (через Re).
+        # k_delta кусочно-постоянный, его производная равна нулю
+        dlmbd = friction_factor_derivative(re, d_hyd, roughness) * re / flow
+        dk_re = -0.29 / flow if calcversion is None else 0
+        ddzeta = k_delta * dk_re * dzeta_local + 0.0175 * angle * dlmbd * r0 / d_hyd
+        result_derivative = ddzeta * p_dyn + dzeta * 2 * p_dyn / flow
+        print(f"Производная dP по расходу: {result_derivative:.5f} Па/(м^3/ч)")
+        print("================================")
+        return result, result_derivative
+
     print("================================")
 
     return result
+
+
+def coefficient_a1_batch(angle):
+    """
+    Коэффициент A1 отвода (влияние угла поворота), формула как в elbow().
+
+    Аргументы:
+    angle - угол поворота, ° (число или массив)
+    """
+    return np.where(
+        angle < 70,
+        0.9 * np.sin(np.radians(angle)),
+        np.where(angle > 100, 0.7 + 0.35 * angle / 90, 1),
+    )
+
+
+def coefficient_b1_batch(r0b0):
+    """
+    Коэффициент B1 отвода (влияние относительного радиуса поворота), формула как в elbow().
+
+    Аргументы:
+    r0b0 - относительный радиус поворота r0/b0 (число или массив)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 0.21 * np.where(r0b0 <= 1, r0b0**-2.5, r0b0**-0.5)
+
+
+def coefficient_c1_batch(a0b0, aspect_low):
+    """
+    Коэффициент C1 прямоугольного отвода (влияние соотношения сторон), формула как в elbow().
+
+    Аргументы:
+    a0b0 - соотношение сторон сечения a0/b0 (число или массив)
+    aspect_low - условие height/width <= 4 (число или массив)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(aspect_low, 0.85 + 0.125 / a0b0, 1.115 - 0.84 / a0b0)
+
+
+def elbow_batch(
+    flow,
+    temperature,
+    angle,
+    r0,
+    oriented=None,
+    height=None,
+    width=None,
+    diameter=None,
+    roughness=0.0015,
+    thermophysics="idelchik",
+    calcversion=None,
+    derivative=False,
+    dtype="float64",
+    jit=False,
+    out=None,
+    intermediates=None,
+):
+    """
+    Пакетный (векторизованный) расчет потерь давления в отводах, формулы как в elbow().
+    Каждый аргумент, кроме thermophysics и calcversion, может быть массивом или скаляром
+    (скаляр растягивается на весь пакет). Незаданные габариты - None или NaN.
+    Проверки входных данных не выполняются, строки с некорректными данными дают NaN.
+    Ничего не печатает.
+
+    Аргументы:
+    как у elbow(), плюс
+    dtype - тип чисел расчета: "float64" или "float32" (компактный режим - вдвое меньше
+        памяти на столбцы; отклонение от float64 - см. engine.precision.check_precision())
+    jit - если True и установлен numba, потери считаются одним скомпилированным циклом
+        без промежуточных массивов (physics.compiled); без numba, а также с out,
+        intermediates или dtype="float32" - по NumPy
+    out - словарь массивов длины пакета, в которые записываются результаты
+        'dP', 'zeta', 'velocity', 'Re', 'lambda' - только имена, которые есть в out
+        (см. vectorized.write_out())
+    intermediates - имена промежуточных величин, которые нужно вернуть столбцами
+        вместе с результатом (см. vectorized.capture()): 'Re', 'lambda', 'zeta',
+        'k_delta', 'k_re', 'A1', 'B1', 'C1', 'r0b0', 'a0b0', 'dzeta_local', 'velocity', 'p_dyn',
+        'density', 'kinematic_viscosity', 'd_hyd'
+
+    Возвращает:
+    Словарь массивов:
+    'dP' - потери давления, Па,
+    'ddP_dflow' - производная потерь по расходу, Па/(м^3/ч) (только при derivative=True),
+    а также запрошенные промежуточные величины.
+    """
+    if calcversion not in ("22", None):
+        raise ValueError("Неизвестная версия расчета")
+    dtype = vectorized.float_dtype(dtype)
+    kinematic_viscosity, density = vectorized.thermophysics_functions(thermophysics, dtype)
+    (
+        flow,
+        temperature,
+        angle,
+        r0,
+        oriented,
+        height,
+        width,
+        diameter,
+        roughness,
+    ) = vectorized.as_columns(
+        flow, temperature, angle, r0, oriented, height, width, diameter, roughness, dtype=dtype
+    )
+    horiz = oriented == "horiz"
+    if compiled.enabled(jit, dtype, out, intermediates):
+        return compiled.elbow_losses(
+            flow,
+            angle,
+            r0,
+            horiz,
+            height,
+            width,
+            diameter,
+            roughness,
+            kinematic_viscosity(temperature),
+            density(temperature),
+            calcversion,
+            derivative,
+        )
+    is_round = ~np.isnan(diameter)
+
+    d_hyd = vectorized.hydraulic_diameter(height, width, diameter)
+    dv = 1 / 3600 / vectorized.section_area(height, width, diameter)
+    v = flow * dv
+    nu = kinematic_viscosity(temperature)
+    re = vectorized.reynolds_number(v, d_hyd, nu)
+    lmbd = vectorized.friction_factor(re, d_hyd, roughness)
+    rho = density(temperature)
+    p_dyn = vectorized.dynamic_pressure(rho, v)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r0b0 = np.where(is_round, r0 / diameter, np.where(horiz, r0 / width, r0 / height))
+        a0b0 = np.where(horiz, height / width, width / height)
+
+        if calcversion == "22":
+            k_delta = np.ones_like(re)
+            k_re = np.ones_like(re)
+        else:
+            k_delta = np.where(re < 40000, 1, np.where(r0b0 <= 0.55, 1.5, 2)).astype(dtype)
+            k_re = 1.3 - 0.29 * np.log(re * 10**-5)
+
+        aspect_low = height / width <= 4
+        A1 = coefficient_a1_batch(angle)
+        B1 = coefficient_b1_batch(r0b0)
+        C1 = coefficient_c1_batch(a0b0, aspect_low)
+        C1 = np.where(is_round, 1, C1)
+
+    dzeta_local = A1 * B1 * C1
+    dzeta = k_delta * k_re * dzeta_local + 0.0175 * angle * lmbd * r0 / d_hyd
+
+    result = {"dP": dzeta * p_dyn}
+
+    if derivative:
+        dre = d_hyd / nu * dv
+        dlmbd = vectorized.friction_factor_derivative(re, d_hyd, roughness) * dre
+        dk_re = -0.29 * dre / re if calcversion is None else 0
+        ddzeta = k_delta * dk_re * dzeta_local + 0.0175 * angle * dlmbd * r0 / d_hyd
+        result["ddP_dflow"] = ddzeta * p_dyn + dzeta * rho * v * dv
+
+    values = {
+        "dP": result["dP"],
+        "zeta": dzeta,
+        "velocity": v,
+        "Re": re,
+        "lambda": lmbd,
+        "k_delta": k_delta,
+        "k_re": k_re,
+        "A1": A1,
+        "B1": B1,
+        "C1": C1,
+        "r0b0": r0b0,
+        "a0b0": a0b0,
+        "dzeta_local": dzeta_local,
+        "p_dyn": p_dyn,
+        "density": rho,
+        "kinematic_viscosity": nu,
+        "d_hyd": d_hyd,
+    }
+    vectorized.write_out(out, values)
+    result.update(vectorized.capture(intermediates, values, dtype))
+    return result
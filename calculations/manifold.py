@@ -0,0 +1,137 @@
+import numpy as np
+from physics import vectorized
+
+from calculations.tee import dzeta_converge_batch, dzeta_diverge_batch
+
+
+def manifold(
+    temperature,
+    flowtype,
+    flows_o,
+    angles,
+    diameters_main=None,
+    heights_main=None,
+    widths_main=None,
+    diameters_o=None,
+    heights_o=None,
+    widths_o=None,
+    flow_through=0,
+    thermophysics="idelchik",
+):
+    """
+    Рассчитывает потери давления в коллекторе (распределителе) - магистрали
+    с N боковыми ответвлениями. Каждый узел ответвления считается как тройник
+    по тем же формулам Щекин, Кореневский (dzeta_diverge() и dzeta_converge()),
+    но все узлы - за один линейный проход с накопленной суммой расходов,
+    без повторного расчета скоростей и балансов для каждого тройника.
+
+    Участки магистрали и ответвления нумеруются по ходу среды.
+    Магистраль состоит из N+1 участков: узел i находится между участками i и i+1.
+    При разделении (приток) в участок 0 входит весь расход, при смешении (вытяжка)
+    весь расход выходит из участка N.
+    Для каждого участка магистрали и каждого ответвления нужно задать пару
+    height/width или diameter (в списках незаданное значение - None).
+
+    Аргументы:
+    temperature - температура воздуха, °C
+    flowtype - одно из двух
+        "converge" (смешение, вытяжная система - коллектор)
+        "diverge" (разделение, приточная система - распределитель)
+    flows_o - список расходов ответвлений, куб.м/ч (N значений)
+    angles - список углов между ответвлениями и магистралью, ° (N значений)
+    diameters_main, heights_main, widths_main - габариты участков магистрали, м (N+1 значений)
+    diameters_o, heights_o, widths_o - габариты ответвлений, м (N значений)
+    flow_through - расход на тупиковом конце магистрали, куб.м/ч: при разделении -
+        уходящий дальше последнего ответвления, при смешении - входящий в участок 0
+    thermophysics - модель термофизических свойств (idelchik или thermo)
+
+    Возвращает:
+    Словарь массивов по узлам (N значений):
+    'dP_o' - потери при движении среды «на отвод», Па,
+    'dP_p' - потери при движении среды «на проход», Па,
+    'dzeta_o', 'dzeta_p' - соответствующие КМС,
+    а также 'flow_main' - расходы в участках магистрали, куб.м/ч (N+1 значений).
+    """
+    count = len(flows_o)
+    for sizes in [diameters_main, heights_main, widths_main]:
+        assert (
+            np.ndim(sizes) == 0 or len(sizes) == count + 1
+        ), "Участков магистрали должно быть на один больше, чем ответвлений."
+
+    flows_o, angles, diameters_o, heights_o, widths_o = vectorized.as_columns(
+        flows_o, angles, diameters_o, heights_o, widths_o
+    )
+    diameters_main, heights_main, widths_main, _ = vectorized.as_columns(
+        diameters_main, heights_main, widths_main, np.empty(count + 1)
+    )
+
+    print("================================")
+    print(
+        f"""Расчет коллектора с параметрами:
+temperature: {temperature} °C, flowtype: {flowtype}, thermophysics: {thermophysics},
+количество ответвлений: {count}, flow_through: {flow_through} куб.м/ч"""
+    )
+
+    ###########Проверки#############
+    assert flowtype in [
+        "converge",
+        "diverge",
+    ], "flowtype должен быть одним из двух допустимых значений: converge или diverge."
+    assert np.all(flows_o > 0) and flow_through >= 0, "Расходы заданы не верно"
+    assert np.all(angles > 0), "Нужно задавать углы"
+    for heights, widths, diameters, name in [
+        (heights_main, widths_main, diameters_main, "main"),
+        (heights_o, widths_o, diameters_o, "o"),
+    ]:
+        given = ~np.isnan(heights) | ~np.isnan(widths)
+        assert not np.any(
+            given & ~np.isnan(diameters)
+        ), f"Необходимо указать одно из двух: пару heights_{name}/widths_{name} или diameters_{name}."
+        assert not np.any(
+            (np.isnan(heights) | np.isnan(widths)) & np.isnan(diameters)
+        ), f"Не указана ни пара heights_{name}/widths_{name}, ни diameters_{name}."
+    ###########Проверки#############
+
+    density = vectorized.thermophysics_functions(thermophysics)[1]
+
+    # Расходы в участках магистрали - накопленной суммой по ходу среды
+    if flowtype == "diverge":
+        flow_main = flow_through + np.concatenate([np.cumsum(flows_o[::-1])[::-1], [0]])
+    else:
+        flow_main = flow_through + np.concatenate([[0], np.cumsum(flows_o)])
+
+    # Скорость в каждом участке магистрали считается один раз и используется
+    # в двух соседних узлах
+    v_main = vectorized.velocity(flow_main, heights_main, widths_main, diameters_main)
+    v_o = vectorized.velocity(flows_o, heights_o, widths_o, diameters_o)
+
+    # Для узла i: при разделении «c» - участок i, «p» - участок i+1; при смешении наоборот
+    if flowtype == "diverge":
+        v_c, v_p = v_main[:-1], v_main[1:]
+        dzeta_o = dzeta_diverge_batch(angles, v_o, v_c)
+        dzeta_p = dzeta_diverge_batch(0, v_p, v_c)
+    else:
+        v_p, v_c = v_main[:-1], v_main[1:]
+        flow_p, flow_c = flow_main[:-1], flow_main[1:]
+        v_base = (flows_o * v_o * np.cos(np.radians(angles)) + flow_p * v_p) / flow_c
+        dzeta_o = dzeta_converge_batch(v_o, v_c, v_base)
+        dzeta_p = dzeta_converge_batch(v_p, v_c, v_base)
+
+    p_dyn = vectorized.dynamic_pressure(density(temperature), v_c)
+
+    result = {
+        "dP_o": p_dyn * dzeta_o,
+        "dP_p": p_dyn * dzeta_p,
+        "dzeta_o": dzeta_o,
+        "dzeta_p": dzeta_p,
+        "flow_main": flow_main,
+    }
+
+    for i in range(count):
+        print(
+            f"Узел {i}: КМС на отвод: {dzeta_o[i]:.3f}, на проход: {dzeta_p[i]:.3f}, "
+            f"dP на отвод: {result['dP_o'][i]:.3f} Па, на проход: {result['dP_p'][i]:.3f} Па"
+        )
+    print("================================")
+
+    return result
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from physics.hydraulic import (
     velocity,
     dynamic_pressure,
@@ -7,6 +8,7 @@ from physics.thermophysical import (
     density_mendeleev,
     density_thermo,
 )
+from physics import vectorized
 
 
 def velocity_best_mixture(flow_o1, v_o1, angle_o1, flow_o2, v_o2, angle_o2, flow_p, v_p, flow_c):
@@ -80,6 +82,114 @@ def dzeta_converge(v_current, v_c, v_base):
     return result
 
 
+def velocity_best_mixture_derivative(v_current, angle_current, flow_c, v_base):
+    """
+    Рассчитывает производную наивыгоднейшей скорости смешивания (velocity_best_mixture())
+    по расходу одного из патрубков o1, o2 или p при неизменных остальных
+    (расход flow_c при этом меняется на ту же величину).
+    Для прохода angle_current = 0.
+    Работает как со скалярами, так и с массивами numpy.
+
+    Аргументы:
+    v_current - скорость в патрубке, по расходу которого берется производная, м/с
+    angle_current - угол патрубка, °
+    flow_c - расход в смесительном патрубке, куб.м/ч
+    v_base - наивыгоднейшая скорость смешивания, м/с
+
+    Возвращает:
+    производная v_base по расходу патрубка, (м/с)/(куб.м/ч)
+    """
+    # Слагаемое flow_x * v_x растет как flow_x^2, а знаменатель flow_c - линейно
+    return (2 * v_current * np.cos(np.radians(angle_current)) - v_base) / flow_c
+
+
+def dzeta_diverge_derivative(alfa, v_current, v_c, dv_current, dv_c):
+    """
+    Рассчитывает производную КМС dzeta_diverge() по расходу через известные
+    производные скоростей по этому расходу.
+
+    Аргументы:
+    alfa, v_current, v_c - как в dzeta_diverge()
+    dv_current - производная скорости v_current по расходу
+    dv_c - производная скорости v_c по расходу
+
+    Возвращает производную коэффициента местного сопротивления.
+    """
+    ratio = v_current / v_c
+    d_ratio = (dv_current * v_c - v_current * dv_c) / v_c**2
+    cos = math.cos(math.radians(alfa))
+    if v_c * cos > v_current:
+        result = -2 * (cos - ratio) * d_ratio
+    else:
+        # Ветка записана как sin^2 + 0.5 * (ratio^2 - ratio * cos)
+        result = (ratio - 0.5 * cos) * d_ratio
+    return result
+
+
+def dzeta_converge_derivative(v_current, v_c, v_base, dv_current, dv_c, dv_base):
+    """
+    Рассчитывает производную КМС dzeta_converge() по расходу через известные
+    производные скоростей по этому расходу.
+
+    Аргументы:
+    v_current, v_c, v_base - как в dzeta_converge()
+    dv_current, dv_c, dv_base - производные соответствующих скоростей по расходу
+
+    Возвращает производную коэффициента местного сопротивления.
+    """
+    ratio = v_current / v_c
+    d_ratio = (dv_current * v_c - v_current * dv_c) / v_c**2
+    base_ratio = v_base / v_c
+    d_base_ratio = (dv_base * v_c - v_base * dv_c) / v_c**2
+    if v_base > v_c:
+        result = 2 * ratio * d_ratio - 2 * d_base_ratio
+    else:
+        result = 2 * ratio * d_ratio - (2 * base_ratio + 0.5) * d_base_ratio
+    return result
+
+
+def dzeta_diverge_batch(alfa, v_current, v_c):
+    """
+    Векторизованный вариант dzeta_diverge() для массивов numpy.
+    """
+    cos = np.cos(np.radians(alfa))
+    ratio = v_current / v_c
+    return np.sin(np.radians(alfa)) ** 2 + np.where(
+        v_c * cos > v_current, (cos - ratio) ** 2, 0.5 * (ratio**2 - ratio * cos)
+    )
+
+
+def dzeta_diverge_derivative_batch(alfa, v_current, v_c, dv_current, dv_c):
+    """
+    Векторизованный вариант dzeta_diverge_derivative() для массивов numpy.
+    """
+    cos = np.cos(np.radians(alfa))
+    ratio = v_current / v_c
+    d_ratio = (dv_current * v_c - v_current * dv_c) / v_c**2
+    return np.where(v_c * cos > v_current, -2 * (cos - ratio), ratio - 0.5 * cos) * d_ratio
+
+
+def dzeta_converge_batch(v_current, v_c, v_base):
+    """
+    Векторизованный вариант dzeta_converge() для массивов numpy.
+    """
+    base_ratio = v_base / v_c
+    return ((v_current / v_c) ** 2 - base_ratio**2) + np.where(
+        v_base > v_c, (base_ratio - 1) ** 2, 0.5 * (1 - base_ratio)
+    )
+
+
+def dzeta_converge_derivative_batch(v_current, v_c, v_base, dv_current, dv_c, dv_base):
+    """
+    Векторизованный вариант dzeta_converge_derivative() для массивов numpy.
+    """
+    ratio = v_current / v_c
+    d_ratio = (dv_current * v_c - v_current * dv_c) / v_c**2
+    base_ratio = v_base / v_c
+    d_base_ratio = (dv_base * v_c - v_base * dv_c) / v_c**2
+    return 2 * ratio * d_ratio - np.where(v_base > v_c, 2, 2 * base_ratio + 0.5) * d_base_ratio
+
+
 def tee(
     temperature,
     angle,
@@ -97,6 +207,7 @@ def tee(
     height_p=None,
     width_p=None,
     thermophysics="idelchik",
+    derivative=False,
 ):
     """
     Рассчитывает потери давления в тройнике.
@@ -119,12 +230,16 @@ def tee(
     height_x - высота патрубка, м
     width_x - ширина патрубка, м
     thermophysics - модель термофизических свойств (idelchik или thermo)
+    derivative - если True, дополнительно рассчитываются производные потерь по расходам
 
     Возвращает:
     Словарь с потерями давления на трение, Па.
     Ключи словаря:
     'dP_o' - потери при движении среды «на отвод»,
     'dP_p' - потери при движении среды «на проход».
+    При derivative=True дополнительно ключи 'ddP_o_dflow_o', 'ddP_o_dflow_p',
+    'ddP_p_dflow_o', 'ddP_p_dflow_p' - производные потерь по расходам ответвления и прохода,
+    Па/(куб.м/ч). Независимыми считаются flow_o и flow_p, flow_c = flow_o + flow_p.
     """
 
     print("================================")
@@ -234,6 +349,186 @@ height_p: {height_p} м, width_p: {width_p} м, diameter_p: {diameter_p} м"""
 
     print(f"Полные dP тройника, на отвод: {result['dP_o']:.3f} Па")
     print(f"Полные dP тройника, на проход: {result['dP_p']:.3f} Па")
+
+    if derivative:
+        # Производные скоростей по расходам: скорость в патрубке пропорциональна его расходу,
+        # а flow_c = flow_o + flow_p меняется вместе с любым из них
+        for name, flow_x, v_x, angle_x in [("o", flow_o, v_o, angle), ("p", flow_p, v_p, 0)]:
+            dv_c = v_c / flow_c
+            dv_o = v_o / flow_o if name == "o" else 0
+            dv_p = v_p / flow_p if name == "p" else 0
+            if flowtype == "converge":
+                dv_base = velocity_best_mixture_derivative(v_x, angle_x, flow_c, v_base)
+                ddzeta_o = dzeta_converge_derivative(v_o, v_c, v_base, dv_o, dv_c, dv_base)
+                ddzeta_p = dzeta_converge_derivative(v_p, v_c, v_base, dv_p, dv_c, dv_base)
+            elif flowtype == "diverge":
+                ddzeta_o = dzeta_diverge_derivative(angle, v_o, v_c, dv_o, dv_c)
+                ddzeta_p = dzeta_diverge_derivative(0, v_p, v_c, dv_p, dv_c)
+            dp_dyn = 2 * p_dyn / v_c * dv_c
+            result[f"ddP_o_dflow_{name}"] = dp_dyn * dzeta_o + p_dyn * ddzeta_o
+            result[f"ddP_p_dflow_{name}"] = dp_dyn * dzeta_p + p_dyn * ddzeta_p
+            print(
+                f"Производные dP по flow_{name}, на отвод: {result[f'ddP_o_dflow_{name}']:.5f}, "
+                f"на проход: {result[f'ddP_p_dflow_{name}']:.5f} Па/(куб.м/ч)"
+            )
+
     print("================================")
 
     return result
+
+
+def tee_batch(
+    temperature,
+    angle,
+    flowtype,
+    flow_c=None,
+    flow_o=None,
+    flow_p=None,
+    diameter_c=None,
+    height_c=None,
+    width_c=None,
+    diameter_o=None,
+    height_o=None,
+    width_o=None,
+    diameter_p=None,
+    height_p=None,
+    width_p=None,
+    thermophysics="idelchik",
+    derivative=False,
+    dtype="float64",
+    out=None,
+    intermediates=None,
+):
+    """
+    Пакетный (векторизованный) расчет потерь давления в тройниках, формулы как в tee().
+    Каждый аргумент, кроме thermophysics, может быть массивом или скаляром
+    (скаляр растягивается на весь пакет), в т.ч. flowtype.
+    Незаданные расходы и габариты - None или NaN, в каждой строке должно быть задано
+    два из трех расходов. Проверки входных данных не выполняются,
+    строки с некорректными данными дают NaN. Ничего не печатает.
+
+    Аргументы:
+    как у tee(), плюс
+    dtype - тип чисел расчета: "float64" или "float32" (компактный режим - вдвое меньше
+        памяти на столбцы; отклонение от float64 - см. engine.precision.check_precision())
+    out - словарь массивов длины пакета, в которые записываются результаты
+        'dP_o', 'dP_p', 'zeta_o', 'zeta_p', 'velocity' (скорость в сборном рукаве) -
+        только имена, которые есть в out (см. vectorized.write_out())
+    intermediates - имена промежуточных величин, которые нужно вернуть столбцами
+        вместе с результатом (см. vectorized.capture()): 'zeta_o', 'zeta_p',
+        'v_base', 'velocity_c', 'velocity_o', 'velocity_p', 'flow_c', 'flow_o', 'flow_p',
+        'p_dyn', 'density'
+
+    Возвращает:
+    Словарь массивов с теми же ключами, что и у tee(), а также запрошенные
+    промежуточные величины.
+    """
+    dtype = vectorized.float_dtype(dtype)
+    density = vectorized.thermophysics_functions(thermophysics, dtype)[1]
+    (
+        temperature,
+        angle,
+        flowtype,
+        flow_c,
+        flow_o,
+        flow_p,
+        diameter_c,
+        height_c,
+        width_c,
+        diameter_o,
+        height_o,
+        width_o,
+        diameter_p,
+        height_p,
+        width_p,
+    ) = vectorized.as_columns(
+        temperature,
+        angle,
+        flowtype,
+        flow_c,
+        flow_o,
+        flow_p,
+        diameter_c,
+        height_c,
+        width_c,
+        diameter_o,
+        height_o,
+        width_o,
+        diameter_p,
+        height_p,
+        width_p,
+        dtype=dtype,
+    )
+    converge = flowtype == "converge"
+
+    # Недостающий расход из баланса
+    flow_c = np.where(np.isnan(flow_c), flow_o + flow_p, flow_c)
+    flow_o = np.where(np.isnan(flow_o), flow_c - flow_p, flow_o)
+    flow_p = np.where(np.isnan(flow_p), flow_c - flow_o, flow_p)
+
+    dv_c = 1 / 3600 / vectorized.section_area(height_c, width_c, diameter_c)
+    dv_o = 1 / 3600 / vectorized.section_area(height_o, width_o, diameter_o)
+    dv_p = 1 / 3600 / vectorized.section_area(height_p, width_p, diameter_p)
+    v_c = flow_c * dv_c
+    v_o = flow_o * dv_o
+    v_p = flow_p * dv_p
+
+    v_base = (flow_o * v_o * np.cos(np.radians(angle)) + flow_p * v_p) / flow_c
+    zero = np.zeros_like(v_c)
+    dzeta_o = np.where(
+        converge,
+        dzeta_converge_batch(v_o, v_c, v_base),
+        dzeta_diverge_batch(angle, v_o, v_c),
+    )
+    dzeta_p = np.where(
+        converge,
+        dzeta_converge_batch(v_p, v_c, v_base),
+        dzeta_diverge_batch(zero, v_p, v_c),
+    )
+
+    rho = density(temperature)
+    p_dyn = vectorized.dynamic_pressure(rho, v_c)
+
+    result = {
+        "dP_p": p_dyn * dzeta_p,
+        "dP_o": p_dyn * dzeta_o,
+    }
+
+    if derivative:
+        dp_dyn = rho * v_c * dv_c
+        for name, v_x, angle_x, dv_o_x, dv_p_x in [
+            ("o", v_o, angle, dv_o, zero),
+            ("p", v_p, zero, zero, dv_p),
+        ]:
+            dv_base = velocity_best_mixture_derivative(v_x, angle_x, flow_c, v_base)
+            ddzeta_o = np.where(
+                converge,
+                dzeta_converge_derivative_batch(v_o, v_c, v_base, dv_o_x, dv_c, dv_base),
+                dzeta_diverge_derivative_batch(angle, v_o, v_c, dv_o_x, dv_c),
+            )
+            ddzeta_p = np.where(
+                converge,
+                dzeta_converge_derivative_batch(v_p, v_c, v_base, dv_p_x, dv_c, dv_base),
+                dzeta_diverge_derivative_batch(zero, v_p, v_c, dv_p_x, dv_c),
+            )
+            result[f"ddP_o_dflow_{name}"] = dp_dyn * dzeta_o + p_dyn * ddzeta_o
+            result[f"ddP_p_dflow_{name}"] = dp_dyn * dzeta_p + p_dyn * ddzeta_p
+
+    values = {
+        **result,
+        "zeta_o": dzeta_o,
+        "zeta_p": dzeta_p,
+        "velocity": v_c,
+        "v_base": v_base,
+        "velocity_c": v_c,
+        "velocity_o": v_o,
+        "velocity_p": v_p,
+        "flow_c": flow_c,
+        "flow_o": flow_o,
+        "flow_p": flow_p,
+        "p_dyn": p_dyn,
+        "density": rho,
+    }
+    vectorized.write_out(out, values)
+    result.update(vectorized.capture(intermediates, values, dtype))
+    return result
@@ -1,7 +1,9 @@
 import math
+import numpy
 from physics.hydraulic import (
     reynolds_number,
     friction_factor,
+    friction_factor_derivative,
     dynamic_pressure,
     hydraulic_diameter,
 )
@@ -11,6 +13,7 @@ from physics.thermophysical import (
     density_mendeleev,
     density_thermo,
 )
+from physics import compiled, vectorized
 
 
 def transition(
@@ -26,6 +29,7 @@ def transition(
     roughness=0.001,
     thermophysics="idelchik",
     calcversion=None,
+    derivative=False,
 ):
     """
     Рассчитывает потери давления в переходе воздуховода.
@@ -49,9 +53,11 @@ def transition(
     roughness - абсолютная шероховатость, м
     thermophysics - модель термофизических свойств (idelchik или thermo)
     calcversion - версия расчета. "22" - расчет по версии 22
+    derivative - если True, дополнительно рассчитывается производная потерь по расходу
 
     Возвращает:
-    Потери давления на трение, Па
+    Потери давления на трение, Па.
+    При derivative=True - кортеж (потери, Па; производная потерь по расходу, Па/(м^3/ч))
     """
 
     print("================================")
@@ -192,6 +198,179 @@ np1: {np:.2f}, d_hyd_base: {d_hyd_base:.3f}, alfa05: {alfa05:.3f} рад/{math.d
 
     result = dzeta * p_dyn
     print(f"Полные dP в переходе: {result:.3f} Па")
+
+    if derivative:
+        # Аналитическая производная: от расхода зависят p_dyn (~flow^2) и lmbd (через Re),
+        # местный коэффициент dzeta_transition определяется только геометрией
+        dlmbd = friction_factor_derivative(re, d_hyd_base, roughness) * re / flow
+        ddzeta = dlmbd / (8 * math.sin(alfa05)) * (1 - 1 / np**2)
+        result_derivative = ddzeta * p_dyn + dzeta * 2 * p_dyn / flow
+        print(f"Производная dP по расходу: {result_derivative:.5f} Па/(м^3/ч)")
+        print("================================")
+        return result, result_derivative
+
     print("================================")
 
     return result
+
+
+def transition_batch(
+    flow,
+    temperature,
+    diameter1=None,
+    height1=None,
+    width1=None,
+    diameter2=None,
+    height2=None,
+    width2=None,
+    length=None,
+    roughness=0.001,
+    thermophysics="idelchik",
+    calcversion=None,
+    derivative=False,
+    dtype="float64",
+    jit=False,
+    out=None,
+    intermediates=None,
+):
+    """
+    Пакетный (векторизованный) расчет потерь давления в переходах, формулы как в transition().
+    Каждый аргумент, кроме thermophysics и calcversion, может быть массивом или скаляром
+    (скаляр растягивается на весь пакет). Незаданные габариты - None или NaN.
+    Проверки входных данных не выполняются, строки с некорректными данными дают NaN.
+    Ничего не печатает.
+
+    Аргументы:
+    как у transition(), плюс
+    dtype - тип чисел расчета: "float64" или "float32" (компактный режим - вдвое меньше
+        памяти на столбцы; отклонение от float64 - см. engine.precision.check_precision())
+    jit - если True и установлен numba, потери считаются одним скомпилированным циклом
+        без промежуточных массивов (physics.compiled); без numba, а также с out,
+        intermediates или dtype="float32" - по NumPy
+    out - словарь массивов длины пакета, в которые записываются результаты
+        'dP', 'zeta', 'velocity' (расчетная скорость), 'Re', 'lambda' - только имена,
+        которые есть в out (см. vectorized.write_out())
+    intermediates - имена промежуточных величин, которые нужно вернуть столбцами
+        вместе с результатом (см. vectorized.capture()): 'Re', 'lambda', 'zeta',
+        'delta', 'alfa05', 'n_ratio' (отношение площадей), 'dzeta_transition', 'dzeta_friction',
+        'v_base', 'p_dyn', 'density', 'kinematic_viscosity', 'd_hyd'
+
+    Возвращает:
+    Словарь массивов:
+    'dP' - потери давления, Па,
+    'ddP_dflow' - производная потерь по расходу, Па/(м^3/ч) (только при derivative=True),
+    а также запрошенные промежуточные величины.
+    """
+    if calcversion not in ("22", None):
+        raise ValueError("Неизвестная версия расчета")
+    dtype = vectorized.float_dtype(dtype)
+    kinematic_viscosity, density = vectorized.thermophysics_functions(thermophysics, dtype)
+    (
+        flow,
+        temperature,
+        diameter1,
+        height1,
+        width1,
+        diameter2,
+        height2,
+        width2,
+        length,
+        roughness,
+    ) = vectorized.as_columns(
+        flow,
+        temperature,
+        diameter1,
+        height1,
+        width1,
+        diameter2,
+        height2,
+        width2,
+        length,
+        roughness,
+        dtype=dtype,
+    )
+    if compiled.enabled(jit, dtype, out, intermediates):
+        return compiled.transition_losses(
+            flow,
+            diameter1,
+            height1,
+            width1,
+            diameter2,
+            height2,
+            width2,
+            length,
+            roughness,
+            kinematic_viscosity(temperature),
+            density(temperature),
+            calcversion,
+            derivative,
+        )
+
+    # Наибольшая дельта между заданными габаритами сечений (fmax пропускает NaN)
+    delta = numpy.zeros_like(flow)
+    for dim1 in [height1, width1, diameter1]:
+        for dim2 in [height2, width2, diameter2]:
+            delta = numpy.fmax(delta, numpy.abs(dim2 - dim1))
+    alfa05 = numpy.arctan(delta / 2 / length)
+
+    s1 = vectorized.section_area(height1, width1, diameter1)
+    s2 = vectorized.section_area(height2, width2, diameter2)
+    n_ratio = numpy.maximum(s1, s2) / numpy.minimum(s1, s2)
+
+    # Местный коэффициент сопротивления перехода (расширение или сужение)
+    dzeta_expansion = 3.2 * (numpy.tan(alfa05) ** 1.25) * (1 - 1 / n_ratio) ** 2
+    if calcversion == "22":
+        dzeta_contraction = numpy.zeros_like(flow)
+    else:
+        alpha = alfa05 * 2
+        dzeta_contraction = (
+            -0.0125 * n_ratio**4
+            + 0.0224 * n_ratio**3
+            - 0.00723 * n_ratio**2
+            + 0.00444 * n_ratio
+            - 0.00745
+        ) * (alpha**3 + 2 * math.pi * alpha**2 - 10 * alpha)
+    dzeta_transition = numpy.where(s2 >= s1, dzeta_expansion, dzeta_contraction)
+
+    d_hyd_base = numpy.minimum(
+        vectorized.hydraulic_diameter(height1, width1, diameter1),
+        vectorized.hydraulic_diameter(height2, width2, diameter2),
+    )
+    dv = 1 / 3600 / (s2 if calcversion == "22" else s1)
+    v_base = flow * dv
+    nu = kinematic_viscosity(temperature)
+    re = vectorized.reynolds_number(v_base, d_hyd_base, nu)
+    lmbd = vectorized.friction_factor(re, d_hyd_base, roughness)
+    friction_geometry = (1 - 1 / n_ratio**2) / (8 * numpy.sin(alfa05))
+    dzeta = lmbd * friction_geometry + dzeta_transition
+
+    rho = density(temperature)
+    p_dyn = vectorized.dynamic_pressure(rho, v_base)
+
+    result = {"dP": dzeta * p_dyn}
+
+    if derivative:
+        dre = d_hyd_base / nu * dv
+        dlmbd = vectorized.friction_factor_derivative(re, d_hyd_base, roughness) * dre
+        result["ddP_dflow"] = dlmbd * friction_geometry * p_dyn + dzeta * rho * v_base * dv
+
+    values = {
+        "dP": result["dP"],
+        "zeta": dzeta,
+        "velocity": v_base,
+        "Re": re,
+        "lambda": lmbd,
+        "delta": delta,
+        "alfa05": alfa05,
+        "n_ratio": n_ratio,
+        "dzeta_transition": dzeta_transition,
+        "dzeta_friction": lambda: lmbd * friction_geometry,
+        "v_base": v_base,
+        "p_dyn": p_dyn,
+        "density": rho,
+        "kinematic_viscosity": nu,
+        "d_hyd": d_hyd_base,
+    }
+    vectorized.write_out(out, values)
+    result.update(vectorized.capture(intermediates, values, dtype))
+    return result
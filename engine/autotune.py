@@ -0,0 +1,205 @@
+import collections
+import concurrent.futures
+import logging
+import math
+import os
+import time
+import tracemalloc
+import numpy as np
+from engine.store import KERNELS
+from physics.vectorized import as_columns
+
+logger = logging.getLogger(__name__)
+
+# Размер первой пробной части и множитель следующих
+PROBE_START = 1024
+PROBE_GROWTH = 4
+PROBE_CHUNKS = 3
+
+# Доля постоянных затрат вызова пакетной функции во времени расчета части,
+# при которой часть считается достаточно большой
+OVERHEAD_SHARE = 0.05
+
+# Предельный объем памяти на части, которые считаются одновременно, байт
+MEMORY_LIMIT = 256 * 2**20
+
+# Расчет меньшей продолжительности (по оценке) не делится между процессами:
+# запуск процессов и передача столбцов дороже выигрыша
+PARALLEL_TIME = 1.0
+
+
+def _evaluate(kind, columns, batch_params):
+    # Расчет части в процессе-исполнителе
+    return KERNELS[kind](**columns, **batch_params)
+
+
+def probe_sizes():
+    """
+    Размеры пробных частей: первая (PROBE_START строк) - замер памяти на строку,
+    следующие PROBE_CHUNKS - замеры времени (от PROBE_START, каждая в PROBE_GROWTH раз
+    больше).
+    """
+    return [PROBE_START] + [PROBE_START * PROBE_GROWTH**i for i in range(PROBE_CHUNKS)]
+
+
+def measure(evaluate, traced=False):
+    """
+    Вызывает evaluate() и замеряет время расчета и, при traced=True, пик памяти
+    (tracemalloc; время под tracemalloc в несколько раз больше обычного, поэтому
+    для модели времени такой замер не используется).
+
+    Аргументы:
+    evaluate - функция без аргументов
+    traced - замерять ли память
+
+    Возвращает:
+    кортеж (результат evaluate(), время, с, пик памяти, байт (0 без traced))
+    """
+    if traced:
+        tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = evaluate()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if traced else 0
+    finally:
+        if traced:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def choose_settings(probes, row_bytes, remaining, max_jobs=None, memory_limit=MEMORY_LIMIT):
+    """
+    Выбирает размер части и количество процессов по замерам пробных частей.
+    Время расчета части моделируется как t = t0 + n·t1 (t0 - постоянные затраты
+    вызова, t1 - время одной строки, по наименьшей и наибольшей пробам); размер части
+    выбирается так, чтобы t0 составляло не больше OVERHEAD_SHARE времени части.
+    Процессы используются, только если оставшийся расчет дольше PARALLEL_TIME.
+    Размер части ограничивается так, чтобы одновременно считаемые части
+    занимали не больше memory_limit.
+
+    Аргументы:
+    probes - список пар (строк в части, время расчета, с) по возрастанию размера
+    row_bytes - память на одну строку при расчете, байт
+    remaining - количество оставшихся строк (None - неизвестно, например поток элементов:
+        процессы используются без оценки продолжительности)
+    max_jobs - наибольшее количество процессов (None - количество ядер)
+    memory_limit - предельный объем памяти на одновременно считаемые части, байт
+
+    Возвращает:
+    словарь: 'chunk_size', 'jobs', 'row_time' (с на строку), 'row_bytes'
+    """
+    (size1, time1), (size2, time2) = probes[0], probes[-1]
+    row_time = time2 / size2
+    chunk_size = size2 * PROBE_GROWTH
+    if size2 > size1 and time2 > time1:
+        row_time = (time2 - time1) / (size2 - size1)
+        overhead = max(time1 - row_time * size1, 0)
+        chunk_size = max(math.ceil(overhead / (OVERHEAD_SHARE * row_time)), PROBE_START)
+
+    max_jobs = max_jobs or os.cpu_count() or 1
+    jobs = 1
+    if remaining is None:
+        jobs = max_jobs
+    elif remaining * row_time > PARALLEL_TIME:
+        jobs = max(min(max_jobs, remaining // PROBE_START), 1)
+    # Части поровну между процессами, и одновременно не больше памяти memory_limit
+    if remaining:
+        chunk_size = min(chunk_size, -(-remaining // jobs))
+    chunk_size = min(chunk_size, memory_limit // max(row_bytes * jobs, 1))
+    return {
+        "chunk_size": int(max(chunk_size, 1)),
+        "jobs": int(jobs),
+        "row_time": float(row_time),
+        "row_bytes": int(row_bytes),
+    }
+
+
+def evaluate_autotuned(
+    kind, columns, settings=None, max_jobs=None, memory_limit=MEMORY_LIMIT, **batch_params
+):
+    """
+    Рассчитывает большой пакет однотипных элементов частями с автоматическим
+    выбором размера части и количества процессов. Первые части пакета - пробные:
+    на первой (PROBE_START строк) измеряется память на строку (tracemalloc), на
+    следующих PROBE_CHUNKS частях (размер от PROBE_START, каждая в PROBE_GROWTH раз
+    больше) - время расчета; затем выбираются параметры (choose_settings()),
+    и остальные строки считаются с ними. Каждая строка считается один раз: пробные
+    части - часть расчета, их результаты не теряются.
+    Выбранные параметры пишутся в журнал (logging, уровень INFO) и возвращаются;
+    переданные в settings, они используются без проб - расчет воспроизводится
+    с теми же частями.
+
+    Аргументы:
+    kind - вид элемента
+    columns - столбцы аргументов пакетной функции (числа, массивы, строки)
+    settings - параметры прошлого расчета ('chunk_size', 'jobs'); None - подбирать
+    max_jobs - наибольшее количество процессов (None - количество ядер)
+    memory_limit - предельный объем памяти на одновременно считаемые части, байт
+    batch_params - аргументы на весь пакет (thermophysics, calcversion, derivative, dtype)
+
+    Возвращает:
+    кортеж (словарь массивов результатов (ключи как у пакетной функции вида kind),
+    словарь параметров: 'chunk_size', 'jobs', 'row_time', 'row_bytes', 'probes')
+    """
+    names = [name for name, value in columns.items() if value is not None]
+    columns = dict(zip(names, as_columns(*[columns[name] for name in names])))
+    size = len(columns[names[0]])
+    if not size:
+        return KERNELS[kind](**columns, **batch_params), settings
+    parts = []
+    start = 0
+
+    if settings is None:
+        # Память на строку - по пиковому объему памяти при расчете первой части
+        # (ее результат - часть расчета). Перед ней - прогревочный вызов на одной
+        # строке: первый вызов загружает таблицы и кэши
+        KERNELS[kind](**{name: values[:1] for name, values in columns.items()}, **batch_params)
+        probes = []
+        for index, probe_size in enumerate(probe_sizes()):
+            if start >= size:
+                break
+            stop = min(start + probe_size, size)
+            chunk = {name: values[start:stop] for name, values in columns.items()}
+            result, elapsed, peak = measure(
+                lambda: KERNELS[kind](**chunk, **batch_params), traced=index == 0
+            )
+            if index == 0:
+                row_bytes = peak / (stop - start)
+            else:
+                probes.append((stop - start, elapsed))
+            parts.append(result)
+            start = stop
+        if not probes:
+            # Пакет уместился в первую часть: оценка времени - по ней
+            probes.append((start, elapsed))
+        settings = choose_settings(probes, row_bytes, size - start, max_jobs, memory_limit)
+        settings["probes"] = probes
+        logger.info(
+            "%s: %d строк, chunk_size=%d, jobs=%d, %.3g мкс/строка, %d байт/строка",
+            kind,
+            size,
+            settings["chunk_size"],
+            settings["jobs"],
+            settings["row_time"] * 1e6,
+            settings["row_bytes"],
+        )
+
+    chunk_size, jobs = settings["chunk_size"], settings["jobs"]
+    bounds = list(range(start, size, chunk_size)) + [size]
+    chunks = (
+        {name: values[first:last] for name, values in columns.items()}
+        for first, last in zip(bounds[:-1], bounds[1:])
+    )
+    if jobs <= 1:
+        parts.extend(KERNELS[kind](**chunk, **batch_params) for chunk in chunks)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            # Не больше двух частей на процесс одновременно - память ограничена
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_evaluate, kind, chunk, batch_params))
+                if len(pending) >= 2 * jobs:
+                    parts.append(pending.popleft().result())
+            parts.extend(future.result() for future in pending)
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}, settings
@@ -0,0 +1,186 @@
+import itertools
+import numpy as np
+from engine.store import KERNELS, main_flow, scaled_params
+
+
+def _fit_power(flows, values):
+    # Аппроксимация dP = K·Q^n методом наименьших квадратов в логарифмах.
+    # Знак dP на участке должен быть постоянным (например, у прохода тройника
+    # при смешении потери бывают отрицательными)
+    sign = np.sign(values)
+    if not (np.all(sign > 0) or np.all(sign < 0)):
+        raise ValueError("Потери меняют знак или равны нулю, аппроксимация K·Q^n невозможна")
+    n, log_k = np.polyfit(np.log(flows), np.log(np.abs(values)), 1)
+    return sign[0] * np.exp(log_k), n
+
+
+def fit_characteristic(kind, params, flow_min, flow_max, segments=4, points=8):
+    """
+    Аппроксимирует потери давления элемента в диапазоне расходов кусочной
+    степенной характеристикой dP = K·Q^n (по участку на каждый интервал).
+    Все точки аппроксимации и проверки считаются одним пакетом.
+    Для тройника и крестовины Q - суммарный расход flow_c, расходы по патрубкам
+    изменяются пропорционально (соотношение расходов сохраняется).
+
+    Аргументы:
+    kind - вид элемента: duct, elbow, transition, tee или cross
+    params - аргументы функции расчета элемента (расход задает соотношения,
+        его величина не важна)
+    flow_min, flow_max - диапазон главного расхода, м^3/ч
+    segments - количество участков (границы участков равномерны в логарифмах)
+    points - количество точек аппроксимации на участке
+
+    Возвращает:
+    Словарь-характеристику:
+    'kind' - вид элемента,
+    'breakpoints' - границы участков по расходу, м^3/ч,
+    'outputs' - {имя результата: {'K': [...], 'n': [...]}} по участкам,
+    'max_error' - максимальная относительная погрешность аппроксимации,
+        проверенная в промежуточных точках.
+    """
+    if kind not in KERNELS:
+        raise ValueError(f"Неизвестный вид элемента: {kind}")
+    if not 0 < flow_min < flow_max:
+        raise ValueError("Диапазон расходов задан неверно")
+
+    breakpoints = np.geomspace(flow_min, flow_max, segments + 1)
+    fit_flows = np.array(
+        [np.geomspace(breakpoints[i], breakpoints[i + 1], points) for i in range(segments)]
+    )
+    # Проверочные точки - середины (в логарифмах) между точками аппроксимации
+    check_flows = np.sqrt(fit_flows[:, 1:] * fit_flows[:, :-1])
+
+    flows = np.concatenate([fit_flows.ravel(), check_flows.ravel()])
+    values = KERNELS[kind](**scaled_params(kind, params, flows))
+
+    outputs = {}
+    max_error = 0.0
+    for name, column in values.items():
+        fit_values = column[: fit_flows.size].reshape(fit_flows.shape)
+        check_values = column[fit_flows.size :].reshape(check_flows.shape)
+        coefficients = [_fit_power(fit_flows[i], fit_values[i]) for i in range(segments)]
+        outputs[name] = {
+            "K": [float(k) for k, _ in coefficients],
+            "n": [float(n) for _, n in coefficients],
+        }
+        for i, (k, n) in enumerate(coefficients):
+            error = np.abs(k * check_flows[i] ** n / check_values[i] - 1)
+            max_error = max(max_error, float(error.max()))
+
+    return {
+        "kind": kind,
+        "breakpoints": [float(value) for value in breakpoints],
+        "outputs": outputs,
+        "max_error": max_error,
+    }
+
+
+def evaluate_characteristic(characteristic, flow, derivative=False):
+    """
+    Рассчитывает потери давления по характеристике из fit_characteristic().
+    За пределами диапазона аппроксимации используются крайние участки.
+
+    Аргументы:
+    characteristic - характеристика элемента
+    flow - главный расход, м^3/ч (число или массив)
+    derivative - если True, дополнительно возвращаются производные K·n·Q^(n-1)
+
+    Возвращает:
+    словарь массивов {имя результата: dP}, при derivative=True также
+    {'d<имя результата>_dflow': производная}
+    """
+    flow = np.atleast_1d(np.asarray(flow, dtype=float))
+    breakpoints = np.asarray(characteristic["breakpoints"])
+    # Номер участка - бинарным поиском по границам
+    segment = np.clip(np.searchsorted(breakpoints, flow) - 1, 0, len(breakpoints) - 2)
+
+    result = {}
+    for name, coefficients in characteristic["outputs"].items():
+        k = np.asarray(coefficients["K"])[segment]
+        n = np.asarray(coefficients["n"])[segment]
+        result[name] = k * flow**n
+        if derivative:
+            result[f"d{name}_dflow"] = k * n * flow ** (n - 1)
+    return result
+
+
+def evaluate_characteristics(characteristics, flow, derivative=False):
+    """
+    Рассчитывает потери давления сразу по многим характеристикам (по одному расходу
+    на характеристику) одним пакетом. Характеристики должны быть одного вида
+    и с одинаковым количеством участков (как у элементов после fit_store()).
+
+    Аргументы:
+    characteristics - список характеристик из fit_characteristic()
+    flow - главные расходы элементов, м^3/ч (массив длины len(characteristics))
+    derivative - если True, дополнительно возвращаются производные K·n·Q^(n-1)
+
+    Возвращает:
+    словарь массивов, как у evaluate_characteristic()
+    """
+    flow = np.asarray(flow, dtype=float)
+    size = len(characteristics[0]["breakpoints"])
+    breakpoints = np.fromiter(
+        itertools.chain.from_iterable(
+            characteristic["breakpoints"] for characteristic in characteristics
+        ),
+        dtype=float,
+        count=len(characteristics) * size,
+    ).reshape(len(characteristics), size)
+    # Номер участка - количество внутренних границ левее расхода (как searchsorted
+    # в evaluate_characteristic(), включая крайние участки за пределами диапазона)
+    segment = np.sum(flow[:, np.newaxis] > breakpoints[:, 1:-1], axis=1).tolist()
+
+    result = {}
+    for name in characteristics[0]["outputs"]:
+        # Коэффициенты выбираются по номеру участка до сборки массивов:
+        # так собирается один столбец, а не таблица всех участков
+        coefficients = [
+            (characteristic["outputs"][name], i)
+            for characteristic, i in zip(characteristics, segment)
+        ]
+        k = np.array([values["K"][i] for values, i in coefficients])
+        n = np.array([values["n"][i] for values, i in coefficients])
+        result[name] = k * flow**n
+        if derivative:
+            result[f"d{name}_dflow"] = k * n * flow ** (n - 1)
+    return result
+
+
+def fit_store(store, flow_min_factor=0.5, flow_max_factor=2.0, segments=4, points=8):
+    """
+    Аппроксимирует характеристики всех элементов хранилища и сохраняет их
+    в элементах (ключ 'characteristic'). Диапазон расходов задается множителями
+    к текущему главному расходу элемента. Если потери элемента в диапазоне меняют
+    знак или равны нулю, характеристика не строится: элемент пропускается, причина
+    записывается в элемент (ключ 'characteristic_error'), и в режиме
+    mode="characteristic" он считается по полным формулам.
+
+    Аргументы:
+    store - хранилище элементов
+    flow_min_factor, flow_max_factor - диапазон расходов относительно текущего
+    segments, points - как в fit_characteristic()
+
+    Возвращает:
+    максимальная относительная погрешность аппроксимации по всем элементам
+    с характеристикой
+    """
+    max_error = 0.0
+    for element in store.values():
+        element.pop("characteristic", None)
+        element.pop("characteristic_error", None)
+        flow = main_flow(element["kind"], element["params"])
+        try:
+            element["characteristic"] = fit_characteristic(
+                element["kind"],
+                element["params"],
+                flow * flow_min_factor,
+                flow * flow_max_factor,
+                segments=segments,
+                points=points,
+            )
+        except ValueError as error:
+            element["characteristic_error"] = str(error)
+            continue
+        max_error = max(max_error, element["characteristic"]["max_error"])
+    return max_error
@@ -0,0 +1,206 @@
+import itertools
+import json
+import numbers
+import os
+import numpy as np
+from engine.autotune import choose_settings, measure, probe_sizes
+from engine.parallel import evaluate_parallel
+from engine.project import element_spec
+from engine.statistics import update_groups
+from engine.store import add_element, create_store
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+# Замеры пробных частей и выбранные параметры при chunk_size="auto"
+AUTOTUNE_FILE = "autotune.json"
+
+
+def write_atomic(path, write):
+    """
+    Записывает файл через временный файл и переименование: при прерывании
+    на диске остается либо старый файл, либо новый целиком.
+
+    Аргументы:
+    path - путь к файлу
+    write - функция write(путь), записывающая содержимое по переданному пути
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def _dump(data, path):
+    with open(path, "w", encoding="utf-8") as jsonfile:
+        json.dump(data, jsonfile, ensure_ascii=False)
+
+
+def chunk_path(directory, index, extension):
+    """
+    Возвращает путь к файлу результатов части index в папке контрольной точки.
+    """
+    return os.path.join(directory, f"chunk-{index:06d}.{extension}")
+
+
+def open_checkpoint(directory, key):
+    """
+    Открывает контрольную точку долгого расчета (или создает новую).
+    Контрольная точка - папка с файлом checkpoint.json (ключ расчета и номера
+    готовых частей) и файлами результатов готовых частей.
+
+    Аргументы:
+    directory - путь к папке контрольной точки
+    key - описание расчета (словарь, сериализуемый в JSON): продолжить можно только
+        расчет с тем же ключом
+
+    Возвращает:
+    множество номеров готовых частей
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    key = json.loads(json.dumps(key, default=str))
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as jsonfile:
+            checkpoint = json.load(jsonfile)
+        if checkpoint["key"] != key:
+            raise ValueError(f"Контрольная точка {directory} создана для другого расчета")
+        return set(checkpoint["completed"])
+    os.makedirs(directory, exist_ok=True)
+    write_atomic(path, lambda temporary: _dump({"key": key, "completed": []}, temporary))
+    return set()
+
+
+def mark_completed(directory, index):
+    """
+    Отмечает часть index готовой. Вызывается после записи результатов части.
+    """
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    with open(path, encoding="utf-8") as jsonfile:
+        checkpoint = json.load(jsonfile)
+    checkpoint["completed"] = sorted(set(checkpoint["completed"]) | {index})
+    write_atomic(path, lambda temporary: _dump(checkpoint, temporary))
+
+
+def _load_tuning(directory):
+    # Замеры и параметры прошлого запуска: при продолжении расчета части те же
+    path = os.path.join(directory, AUTOTUNE_FILE)
+    if not os.path.exists(path):
+        return {"row_bytes": None, "probes": {}, "settings": None}
+    with open(path, encoding="utf-8") as jsonfile:
+        return json.load(jsonfile)
+
+
+def _save_tuning(directory, tuning):
+    path = os.path.join(directory, AUTOTUNE_FILE)
+    write_atomic(path, lambda temporary: _dump(tuning, temporary))
+
+
+def _update_statistics(statistics, chunk, values):
+    # Столбцы числовых результатов части по видам элементов (отсутствующие - NaN),
+    # кроме кодов ошибок проверки 'error'
+    by_kind = {}
+    for (_, kind, _), element_values in zip(chunk, values):
+        by_kind.setdefault(kind, []).append(element_values)
+    for kind, rows in by_kind.items():
+        names = []
+        for row in rows:
+            for name, value in row.items():
+                if name != "error" and name not in names and isinstance(value, numbers.Real):
+                    names.append(name)
+        columns = {name: np.array([row.get(name, np.nan) for row in rows]) for name in names}
+        update_groups(statistics, kind, columns)
+
+
+def evaluate_checkpointed(
+    elements, directory, chunk_size=10000, jobs=1, backend="batch", statistics=None, **options
+):
+    """
+    Расчет большого набора элементов с контрольными точками: элементы считаются
+    частями по chunk_size (engine.parallel.evaluate_parallel()), результаты каждой
+    готовой части сразу записываются в папку контрольной точки.
+    Если расчет прерван, повторный вызов с теми же аргументами читает готовые части
+    с диска и считает только остальные; итоговый результат совпадает с расчетом
+    без прерывания.
+
+    Аргументы:
+    elements - итерируемый объект описаний элементов: кортежей (id, kind, params)
+        или словарей (см. engine.project.element_spec()), порядок должен быть тем же
+        при продолжении расчета
+    directory - путь к папке контрольной точки
+    chunk_size - количество элементов в одной части; "auto" - первые части пробные
+        (размеры - engine.autotune.probe_sizes(), память и время на элемент), по ним
+        выбираются размер остальных частей и количество процессов
+        (engine.autotune.choose_settings()); замеры и выбор сохраняются в папке
+        контрольной точки (autotune.json) и используются при продолжении расчета
+    jobs - количество процессов для расчета части (при chunk_size="auto" - наибольшее)
+    backend - "batch" или "scalar", как в evaluate_parallel()
+    statistics - словарь статистики групп (см. engine.statistics.update_groups()): если
+        задан, числовые результаты каждой части (и готовых частей с диска) добавляются
+        в статистику группы вида элемента, а результаты всех элементов не собираются
+    options - аргументы evaluate_parallel() (mode, validate, coalesce или quiet)
+
+    Возвращает:
+    словарь {id элемента: {имя результата: значение}} в порядке элементов;
+    со statistics - statistics
+
+    Исключения:
+    ValueError, если chunk_size не положительный (и не "auto") или контрольная точка создана
+    для другого расчета
+    """
+    auto = chunk_size == "auto"
+    if not auto and chunk_size <= 0:
+        raise ValueError("Размер части должен быть положительным")
+    completed = open_checkpoint(
+        directory, {"chunk_size": chunk_size, "backend": backend, "options": options}
+    )
+    tuning = _load_tuning(directory) if auto else None
+    probes = probe_sizes() if auto else []
+    remaining = len(elements) if hasattr(elements, "__len__") else None
+    results = {}
+    elements = iter(elements)
+    for index in itertools.count():
+        size, chunk_jobs = chunk_size, jobs
+        if index < len(probes):
+            size, chunk_jobs = probes[index], 1
+        elif auto:
+            if tuning["settings"] is None:
+                timed = [tuning["probes"][key] for key in sorted(tuning["probes"], key=int)]
+                tuning["settings"] = choose_settings(timed, tuning["row_bytes"], remaining, jobs)
+                _save_tuning(directory, tuning)
+            chunk_jobs = tuning["settings"]["jobs"]
+            size = tuning["settings"]["chunk_size"] * chunk_jobs
+        chunk = [element_spec(spec) for spec in itertools.islice(elements, size)]
+        if not chunk:
+            return results if statistics is None else statistics
+        if remaining is not None:
+            remaining -= len(chunk)
+        path = chunk_path(directory, index, "json")
+        if index in completed:
+            with open(path, encoding="utf-8") as jsonfile:
+                pairs = json.load(jsonfile)
+        else:
+            store = create_store()
+            for element_id, kind, params in chunk:
+                add_element(store, element_id, kind, **params)
+            if index < len(probes):
+                if index == 0:
+                    # Прогревочный расчет одного элемента: первый вызов загружает таблицы
+                    evaluate_parallel(
+                        dict(itertools.islice(store.items(), 1)), 1, backend, **options
+                    )
+                chunk_results, elapsed, peak = measure(
+                    lambda: evaluate_parallel(store, 1, backend, **options), traced=index == 0
+                )
+                if index == 0:
+                    tuning["row_bytes"] = peak / len(chunk)
+                else:
+                    tuning["probes"][str(index)] = [len(chunk), elapsed]
+                _save_tuning(directory, tuning)
+            else:
+                chunk_results = evaluate_parallel(store, chunk_jobs, backend, **options)
+            pairs = list(chunk_results.items())
+            # Пары (id, результат), а не объект JSON: id - не обязательно строки
+            write_atomic(path, lambda temporary: _dump(pairs, temporary))
+            mark_completed(directory, index)
+        if statistics is None:
+            results.update((element_id, values) for element_id, values in pairs)
+        else:
+            _update_statistics(statistics, chunk, [values for _, values in pairs])
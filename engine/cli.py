@@ -0,0 +1,168 @@
+import argparse
+import collections
+import os
+import shutil
+import sys
+import time
+from engine.checkpoint import evaluate_checkpointed
+from engine.parallel import BACKENDS, evaluate_parallel
+from engine.project import load_project, save_results
+
+# Виды элементов, расчет которых зависит от calcversion
+CALCVERSION_KINDS = ("elbow", "transition")
+
+
+def apply_defaults(store, thermophysics=None, calcversion=None):
+    """
+    Задает thermophysics и calcversion элементам, у которых они не заданы в проекте.
+
+    Аргументы:
+    store - хранилище элементов (изменяется)
+    thermophysics - модель термофизических свойств (None - не задавать)
+    calcversion - версия расчета (None - не задавать), только для отводов и переходов
+    """
+    for element in store.values():
+        if thermophysics is not None:
+            element["params"].setdefault("thermophysics", thermophysics)
+        if calcversion is not None and element["kind"] in CALCVERSION_KINDS:
+            element["params"].setdefault("calcversion", calcversion)
+
+
+def output_path(input_path, output_dir=None, output_format="json"):
+    """
+    Возвращает путь к файлу результатов проекта: <имя проекта>.results.<формат>
+    в папке output_dir (по умолчанию - рядом с файлом проекта).
+    """
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    directory = output_dir if output_dir is not None else os.path.dirname(input_path)
+    return os.path.join(directory, f"{name}.results.{output_format}")
+
+
+def run_project(input_path, args):
+    """
+    Рассчитывает один проект по аргументам командной строки и записывает результаты.
+
+    Возвращает:
+    словарь сводки: 'project', 'output', 'elements', 'by_kind', 'invalid',
+    'read', 'calculate', 'write' (время, с) и 'rate' (элементов/с)
+    """
+    started = time.perf_counter()
+    store = load_project(input_path)
+    apply_defaults(store, args.thermophysics, args.calcversion)
+    read = time.perf_counter()
+
+    if args.backend == "scalar":
+        options = {"quiet": args.quiet}
+    else:
+        options = {"mode": args.mode, "validate": True, "coalesce": args.coalesce}
+    path = output_path(input_path, args.output_dir, args.format)
+    if args.checkpoint:
+        # Прерванный расчет проекта продолжается с последней готовой части
+        checkpoint = f"{path}.checkpoint"
+        elements = [
+            (element_id, element["kind"], element["params"])
+            for element_id, element in store.items()
+        ]
+        results = evaluate_checkpointed(
+            elements, checkpoint, args.chunk_size, args.jobs, args.backend, **options
+        )
+    else:
+        results = evaluate_parallel(store, args.jobs, args.backend, **options)
+    calculated = time.perf_counter()
+
+    save_results(results, path)
+    if args.checkpoint:
+        shutil.rmtree(checkpoint)
+    written = time.perf_counter()
+
+    invalid = sum(1 for values in results.values() if values.get("error") or "message" in values)
+    return {
+        "project": input_path,
+        "output": path,
+        "elements": len(store),
+        "by_kind": collections.Counter(element["kind"] for element in store.values()),
+        "invalid": invalid,
+        "read": read - started,
+        "calculate": calculated - read,
+        "write": written - calculated,
+        "rate": len(store) / max(calculated - read, 1e-9),
+    }
+
+
+def print_summary(summaries, file=None):
+    """
+    Печатает сводку времени расчета по проектам и итог (в file, по умолчанию - в stdout).
+    """
+    print("================================", file=file)
+    for summary in summaries:
+        kinds = ", ".join(f"{kind}: {count}" for kind, count in sorted(summary["by_kind"].items()))
+        print(
+            f"""Проект: {summary['project']} -> {summary['output']}
+элементов: {summary['elements']} ({kinds}), с ошибками: {summary['invalid']}
+чтение: {summary['read']:.3f} с, расчет: {summary['calculate']:.3f} с, \
+запись: {summary['write']:.3f} с, {summary['rate']:.0f} элементов/с""",
+            file=file,
+        )
+    total = sum(summary["read"] + summary["calculate"] + summary["write"] for summary in summaries)
+    elements = sum(summary["elements"] for summary in summaries)
+    print(f"Итого: проектов: {len(summaries)}, элементов: {elements}, {total:.3f} с", file=file)
+    print("================================", file=file)
+
+
+def _chunk_size(text):
+    # Размер части: положительное целое или auto
+    if text == "auto":
+        return text
+    if not text.isdigit() or int(text) <= 0:
+        raise argparse.ArgumentTypeError(f"ожидается положительное целое или auto: {text}")
+    return int(text)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.cli",
+        description="Пакетный расчет потерь давления в проектах вентиляционных систем",
+    )
+    parser.add_argument(
+        "projects", nargs="+", help="файлы проектов (.json сети или .csv элементов)"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="количество процессов")
+    parser.add_argument("--backend", choices=BACKENDS, default="batch", help="способ расчета")
+    parser.add_argument(
+        "--mode",
+        choices=("exact", "characteristic"),
+        default="exact",
+        help="режим пакетного расчета",
+    )
+    parser.add_argument("--coalesce", action="store_true", help="объединять прямые участки")
+    parser.add_argument("--thermophysics", choices=("idelchik", "thermo"), default=None)
+    parser.add_argument("--calcversion", choices=("22",), default=None)
+    parser.add_argument("-o", "--output-dir", default=None, help="папка для результатов")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="сохранять готовые части расчета и продолжать прерванный расчет",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=_chunk_size,
+        default=10000,
+        help="элементов в части при --checkpoint (auto - подбор по пробным частям)",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="без печати хода расчета")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки: python -m engine.cli проект.json [...] --jobs 4 --quiet
+    """
+    args = parse_args(argv)
+    summaries = [run_project(path, args) for path in args.projects]
+    print_summary(summaries)
+    return 1 if any(summary["invalid"] for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import numpy as np
+
+# Результаты (и промежуточные величины) пакетной функции воздуховода, пропорциональные
+# длине; остальные величины (Re, lambda, velocity и т.д.) от длины не зависят
+LENGTH_PROPORTIONAL = ("dP", "ddP_dflow", "zeta")
+
+
+def _run_key(element):
+    # Ключ прямого участка: все аргументы, кроме длины. None - элемент не объединяется
+    if element["kind"] != "duct" or "characteristic" in element:
+        return None
+    params = element["params"]
+    length = params.get("length")
+    if np.ndim(length) != 0 or length is None or not length > 0:
+        return None
+    return tuple(sorted((name, value) for name, value in params.items() if name != "length"))
+
+
+def coalesce_ducts(store):
+    """
+    Объединяет идущие подряд (в порядке хранилища) воздуховоды с одинаковыми сечением,
+    расходом, температурой и остальными аргументами в один эквивалентный воздуховод
+    с суммарной длиной. Потери на трение пропорциональны длине, поэтому Re, λ
+    и плотность для всего прямого участка считаются один раз без потери точности.
+
+    Аргументы:
+    store - хранилище элементов (см. engine.store)
+
+    Возвращает:
+    кортеж (новое хранилище, участки), где участки - словарь
+    {id объединенного элемента: [(id исходного элемента, длина), ...]};
+    id объединенного элемента - id первого воздуховода участка.
+    Необъединенные элементы переносятся в новое хранилище без изменений.
+    """
+    coalesced = {}
+    runs = {}
+    run_id, run_key = None, None
+    for element_id, element in store.items():
+        key = _run_key(element)
+        if key is not None and key == run_key:
+            runs[run_id].append((element_id, element["params"]["length"]))
+            continue
+        run_id, run_key = element_id, key
+        coalesced[element_id] = element
+        if key is not None:
+            runs[element_id] = [(element_id, element["params"]["length"])]
+
+    for run_id, segments in runs.items():
+        if len(segments) > 1:
+            params = dict(store[run_id]["params"])
+            params["length"] = sum(length for _, length in segments)
+            coalesced[run_id] = {"kind": "duct", "params": params}
+    return coalesced, {run_id: segments for run_id, segments in runs.items() if len(segments) > 1}
+
+
+def split_results(results, runs):
+    """
+    Раскладывает результаты объединенных воздуховодов обратно по исходным элементам:
+    потери давления, их производные и КМС zeta (λ·l/d) - пропорционально длине,
+    остальные результаты (например, Re или код ошибки) копируются.
+
+    Аргументы:
+    results - результаты расчета хранилища из coalesce_ducts(), {id: {имя: значение}}
+    runs - участки из coalesce_ducts()
+
+    Возвращает:
+    новый словарь результатов с id исходных элементов (порядок участков сохраняется)
+    """
+    split = {}
+    for element_id, values in results.items():
+        if element_id not in runs:
+            split[element_id] = values
+            continue
+        total = sum(length for _, length in runs[element_id])
+        for segment_id, length in runs[element_id]:
+            split[segment_id] = {
+                name: value * length / total if name in LENGTH_PROPORTIONAL else value
+                for name, value in values.items()
+            }
+    return split
@@ -0,0 +1,151 @@
+import numpy as np
+from engine.store import KERNELS, FLOW_PARAMS, scaled_params
+from physics.vectorized import as_columns, section_area
+
+
+def bisect(function, lower, upper, rtol=1e-8, max_iterations=200):
+    """
+    Векторизованный поиск корней монотонных функций методом деления отрезка пополам,
+    сразу для всех строк пакета. Отрезок делится в среднем геометрическом, поэтому
+    границы должны быть положительными (расходы, габариты).
+
+    Аргументы:
+    function - функция от массива x, возвращающая массив невязок той же длины
+    lower, upper - границы отрезков поиска (числа или массивы)
+    rtol - относительная точность по x
+    max_iterations - предельное количество делений
+
+    Возвращает:
+    массив корней; NaN там, где на границах отрезка невязка одного знака
+    (корень не окружен)
+    """
+    lower, upper = as_columns(lower, upper)
+    residual_lower = function(lower)
+    residual_upper = function(upper)
+    bracketed = np.sign(residual_lower) * np.sign(residual_upper) <= 0
+
+    for _ in range(max_iterations):
+        if np.all((upper / lower - 1 <= rtol) | ~bracketed):
+            break
+        middle = np.sqrt(lower * upper)
+        residual_middle = function(middle)
+        # Корень в правой половине, если в середине невязка того же знака, что и слева
+        right = (np.sign(residual_middle) == np.sign(residual_lower)) & (residual_lower != 0)
+        lower = np.where(right, middle, lower)
+        residual_lower = np.where(right, residual_middle, residual_lower)
+        upper = np.where(right, upper, middle)
+
+    return np.where(bracketed, np.sqrt(lower * upper), np.nan)
+
+
+def solve_flow(
+    kind,
+    params,
+    target,
+    criterion="dP",
+    output="dP",
+    lower=1.0,
+    upper=1e6,
+    rtol=1e-8,
+):
+    """
+    Обратная задача: находит расход, при котором потери давления (или скорость)
+    элемента равны заданной величине. Считается сразу для пакета элементов.
+    Для заданных удельных потерь (Па/м) воздуховода нужно задать length=1.
+    Для тройника и крестовины ищется суммарный расход flow_c, расходы по патрубкам
+    меняются пропорционально заданным в params.
+
+    Аргументы:
+    kind - вид элемента: duct, elbow, transition, tee или cross
+    params - аргументы пакетной функции расчета (числа или столбцы пакета),
+        в т.ч. thermophysics и calcversion
+    target - заданные потери давления, Па, или скорость, м/с (число или массив)
+    criterion - "dP" (потери давления) или "velocity" (скорость; для duct и elbow)
+    output - имя результата пакетной функции, по которому ищется решение
+        (для тройника, например, 'dP_o')
+    lower, upper - границы поиска расхода, м^3/ч
+    rtol - относительная точность
+
+    Возвращает:
+    массив расходов, м^3/ч; NaN, если решения в границах нет
+    """
+    if criterion == "velocity":
+        if kind not in ("duct", "elbow"):
+            raise ValueError("Подбор по скорости возможен только для duct и elbow")
+        target, height, width, diameter = as_columns(
+            target, params.get("height"), params.get("width"), params.get("diameter")
+        )
+        return target * 3600 * section_area(height, width, diameter)
+    elif criterion != "dP":
+        raise ValueError(f"Неизвестный критерий: {criterion}")
+
+    kernel = KERNELS[kind]
+    target = np.asarray(target, dtype=float)
+
+    if len(FLOW_PARAMS[kind]) == 1:
+
+        def residual(flow):
+            return kernel(**dict(params, flow=flow))[output] - target
+
+    else:
+
+        def residual(flow):
+            return kernel(**scaled_params(kind, params, flow))[output] - target
+
+    return bisect(residual, lower, upper, rtol=rtol)
+
+
+def solve_size(
+    kind,
+    params,
+    target,
+    size="diameter",
+    criterion="dP",
+    output="dP",
+    lower=0.01,
+    upper=5.0,
+    rtol=1e-8,
+):
+    """
+    Обратная задача: находит габарит сечения, при котором потери давления (или скорость)
+    элемента равны заданной величине. Считается сразу для пакета элементов.
+    Остальные габариты (и r0 отвода) не меняются. Для прямоугольного сечения
+    подбирается одна из сторон при заданной другой.
+
+    Аргументы:
+    kind - вид элемента (duct или elbow)
+    params - аргументы пакетной функции расчета (числа или столбцы пакета),
+        в т.ч. thermophysics и calcversion
+    target - заданные потери давления, Па, или скорость, м/с (число или массив)
+    size - подбираемый габарит: diameter, height или width
+    criterion - "dP" (потери давления) или "velocity" (скорость)
+    output - имя результата пакетной функции, по которому ищется решение
+    lower, upper - границы поиска габарита, м
+    rtol - относительная точность
+
+    Возвращает:
+    массив габаритов, м; NaN, если решения в границах нет
+    """
+    if kind not in ("duct", "elbow"):
+        raise ValueError("Подбор габарита возможен только для duct и elbow")
+    if size not in ("diameter", "height", "width"):
+        raise ValueError(f"Неизвестный габарит: {size}")
+
+    if criterion == "velocity":
+        target, flow, height, width = as_columns(
+            target, params["flow"], params.get("height"), params.get("width")
+        )
+        area = flow / 3600 / target
+        if size == "diameter":
+            return np.sqrt(4 * area / np.pi)
+        return area / (width if size == "height" else height)
+    elif criterion != "dP":
+        raise ValueError(f"Неизвестный критерий: {criterion}")
+
+    kernel = KERNELS[kind]
+    target = np.asarray(target, dtype=float)
+
+    def residual(value):
+        return kernel(**dict(params, **{size: value}))[output] - target
+
+    return bisect(residual, lower, upper, rtol=rtol)
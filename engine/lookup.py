@@ -0,0 +1,186 @@
+import concurrent.futures
+import json
+import os
+import numpy as np
+from engine import validation
+from engine.store import BATCH_PARAMS, KERNELS
+from physics.tables import interpolate_grid
+
+
+def _meta_path(path):
+    return os.path.join(path, "meta.json")
+
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.npy")
+
+
+def _grid_columns(axes, start, stop):
+    # Значения аргументов для точек сетки с плоскими номерами [start, stop)
+    shape = tuple(len(values) for values in axes.values())
+    index = np.unravel_index(np.arange(start, stop), shape)
+    return {name: np.asarray(values)[i] for (name, values), i in zip(axes.items(), index)}
+
+
+def _evaluate_chunk(path, meta, chunk):
+    # Исполнитель считает часть сетки и пишет результаты в файлы таблицы
+    size = int(np.prod([len(values) for values in meta["axes"].values()]))
+    start = chunk * meta["chunk_size"]
+    stop = min(start + meta["chunk_size"], size)
+    fixed = meta["fixed"]
+    columns = _grid_columns(meta["axes"], start, stop)
+    columns.update({name: value for name, value in fixed.items() if name not in BATCH_PARAMS})
+    batch_params = {name: value for name, value in fixed.items() if name in BATCH_PARAMS}
+
+    # Некорректные сочетания аргументов не считаются, в таблице остается NaN
+    valid = validation.validate(meta["kind"], columns, fixed.get("thermophysics", "idelchik")) == 0
+    if valid.any():
+        columns = {
+            name: values[valid] if np.ndim(values) else values for name, values in columns.items()
+        }
+        result = KERNELS[meta["kind"]](
+            **columns, **batch_params, intermediates=meta["intermediates"]
+        )
+        for name in meta["columns"]:
+            array = np.load(_column_path(path, name), mmap_mode="r+")
+            array[start:stop][valid] = result[name]
+            array.flush()
+    return chunk
+
+
+def generate_table(
+    path,
+    kind,
+    grid,
+    jobs=1,
+    chunk_size=100000,
+    intermediates=None,
+    dtype="float64",
+    **fixed,
+):
+    """
+    Рассчитывает таблицу потерь элемента на сетке параметров (для быстрых ответов
+    проектировщику по интерполяции, см. query_table()).
+    Сетка делится на части по chunk_size точек, части считаются пакетными функциями
+    в jobs процессах, результаты пишутся в файлы .npy таблицы по мере расчета.
+    Номера готовых частей сохраняются в таблице: если расчет прерван, повторный вызов
+    с теми же аргументами досчитывает только оставшиеся части.
+
+    Аргументы:
+    path - путь к папке таблицы (создается; если уже есть - расчет продолжается)
+    kind - вид элемента
+    grid - словарь {имя аргумента: возрастающие значения по оси (не менее двух)}
+    jobs - количество процессов (1 - расчет в текущем процессе)
+    chunk_size - количество точек сетки в одной части
+    intermediates - промежуточные величины пакетной функции, которые тоже
+        записываются в таблицу (например, ("zeta",))
+    dtype - тип значений таблицы ("float32" - вдвое меньше размер на диске)
+    fixed - постоянные аргументы функции расчета (числа или строки)
+
+    Возвращает:
+    таблицу, открытую на чтение (см. open_table())
+    """
+    if kind not in KERNELS:
+        raise ValueError(f"Неизвестный вид элемента: {kind}")
+    axes = {name: [float(value) for value in values] for name, values in grid.items()}
+    for name, values in axes.items():
+        if len(values) < 2 or np.any(np.diff(values) <= 0):
+            raise ValueError(f"Значения оси {name} должны возрастать, не менее двух значений")
+    size = int(np.prod([len(values) for values in axes.values()]))
+
+    # Имена столбцов таблицы - по расчету первой точки сетки
+    first = {**_grid_columns(axes, 0, 1), **fixed}
+    names = list(KERNELS[kind](**first, intermediates=intermediates))
+    meta = {
+        "kind": kind,
+        "axes": axes,
+        "fixed": fixed,
+        "intermediates": list(intermediates or []),
+        "columns": names,
+        "chunk_size": chunk_size,
+        "dtype": dtype,
+    }
+
+    if os.path.exists(_meta_path(path)):
+        with open(_meta_path(path), encoding="utf-8") as jsonfile:
+            if json.load(jsonfile) != json.loads(json.dumps(meta)):
+                raise ValueError(f"Таблица {path} рассчитана с другими аргументами")
+    else:
+        os.makedirs(path, exist_ok=True)
+        for name in names:
+            column = np.lib.format.open_memmap(
+                _column_path(path, name), mode="w+", dtype=dtype, shape=(size,)
+            )
+            column[:] = np.nan
+            column.flush()
+        np.save(_column_path(path, "done"), np.zeros(-(-size // chunk_size), dtype=bool))
+        # meta.json пишется последним: папка без него - неготовая таблица
+        with open(_meta_path(path), "w", encoding="utf-8") as jsonfile:
+            json.dump(meta, jsonfile)
+
+    done = np.load(_column_path(path, "done"), mmap_mode="r+")
+    chunks = [chunk for chunk in range(len(done)) if not done[chunk]]
+
+    def mark(chunk):
+        done[chunk] = True
+        done.flush()
+
+    if jobs <= 1:
+        for chunk in chunks:
+            mark(_evaluate_chunk(path, meta, chunk))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            futures = [executor.submit(_evaluate_chunk, path, meta, chunk) for chunk in chunks]
+            for future in concurrent.futures.as_completed(futures):
+                mark(future.result())
+    del done
+    return open_table(path)
+
+
+def open_table(path):
+    """
+    Открывает таблицу, рассчитанную generate_table(). Значения не читаются целиком:
+    столбцы отображаются в память.
+
+    Аргументы:
+    path - путь к папке таблицы
+
+    Возвращает:
+    словарь: 'kind', 'fixed', 'axes' - {имя аргумента: массив значений по оси},
+    'values' - {имя столбца: массив формы сетки}, 'complete' - рассчитаны ли все части
+    """
+    with open(_meta_path(path), encoding="utf-8") as jsonfile:
+        meta = json.load(jsonfile)
+    shape = tuple(len(values) for values in meta["axes"].values())
+    return {
+        "kind": meta["kind"],
+        "fixed": meta["fixed"],
+        "axes": {name: np.array(values) for name, values in meta["axes"].items()},
+        "values": {
+            name: np.load(_column_path(path, name), mmap_mode="r").reshape(shape)
+            for name in meta["columns"]
+        },
+        "complete": bool(np.load(_column_path(path, "done")).all()),
+    }
+
+
+def query_table(table, column, **point):
+    """
+    Значение из таблицы по полилинейной интерполяции между узлами сетки.
+
+    Аргументы:
+    table - таблица (open_table()) или путь к ее папке
+    column - имя столбца, например "dP"
+    point - значения аргументов по всем осям таблицы (числа или массивы)
+
+    Возвращает:
+    массив значений; вне диапазона таблицы и для некорректных сочетаний аргументов - NaN
+    """
+    if not isinstance(table, dict):
+        table = open_table(table)
+    if not table["complete"]:
+        raise ValueError("Таблица рассчитана не полностью, продолжите generate_table()")
+    if set(point) != set(table["axes"]):
+        raise ValueError(f"Нужны значения аргументов: {', '.join(table['axes'])}")
+    queries = [point[name] for name in table["axes"]]
+    return interpolate_grid(list(table["axes"].values()), table["values"][column], *queries)
@@ -0,0 +1,132 @@
+import inspect
+import numpy as np
+from engine.store import KERNELS, group_elements
+
+
+def _sample(rng, nominal, distribution):
+    # Выборка значений параметра вокруг номинальных (nominal - уже повторенный столбец).
+    # Разыгрываются только строки с заданным номиналом: NaN означает, что параметра
+    # у элемента нет (например, diameter у прямоугольного), такие строки не меняются
+    name = distribution[0]
+    given = np.isfinite(nominal)
+    size = int(np.count_nonzero(given))
+    if name == "normal":
+        values = nominal[given] + rng.normal(0, distribution[1], size)
+    elif name == "relative_normal":
+        values = nominal[given] * (1 + rng.normal(0, distribution[1], size))
+    elif name == "uniform":
+        values = rng.uniform(distribution[1], distribution[2], size)
+    else:
+        raise ValueError(f"Неизвестное распределение: {name}")
+    result = nominal.astype(float)
+    result[given] = values
+    return result
+
+
+# Значение _default() для параметра, которого нет у пакетной функции вида
+_ABSENT = object()
+
+
+def _default(kind, name):
+    # Значение параметра по умолчанию у пакетной функции: число, None (параметр
+    # необязательный, например diameter), Parameter.empty (обязательный параметр)
+    # или _ABSENT (параметра у вида нет)
+    parameter = inspect.signature(KERNELS[kind]).parameters.get(name)
+    return _ABSENT if parameter is None else parameter.default
+
+
+def _nominal(kind, name, chunk, size):
+    # Номинальный столбец разыгрываемого параметра: не заданные у элемента значения
+    # заменяются значением по умолчанию пакетной функции (например, roughness),
+    # а параметры без числового значения по умолчанию остаются NaN (не разыгрываются)
+    nominal = chunk.get(name, np.full(size, np.nan))
+    default = _default(kind, name)
+    if isinstance(default, (int, float)) and not isinstance(default, bool):
+        nominal = np.where(np.isnan(nominal), default, nominal)
+    return nominal
+
+
+def monte_carlo(
+    store,
+    distributions,
+    samples=1000,
+    percentiles=(5, 50, 95),
+    seed=0,
+    max_rows=1_000_000,
+    dtype="float64",
+):
+    """
+    Распространение неопределенности исходных данных на потери давления методом
+    Монте-Карло. Для каждого элемента хранилища параметры из distributions
+    разыгрываются samples раз, все реализации считаются пакетными функциями.
+    Элементы обрабатываются частями так, чтобы в одном пакете было не более max_rows
+    строк, - память ограничена независимо от размера проекта.
+    Результат воспроизводим при тех же seed и max_rows.
+
+    Аргументы:
+    store - хранилище элементов (см. engine.store)
+    distributions - {имя параметра: распределение}, распределение - кортеж:
+        ("normal", sd) - номинал + нормальное отклонение со СКО sd,
+        ("relative_normal", rel_sd) - номинал * (1 + нормальное отклонение со СКО rel_sd),
+        ("uniform", low, high) - равномерное распределение от low до high
+        Параметры, не заданные у элемента, разыгрываются вокруг значения
+        по умолчанию пакетной функции (например, roughness воздуховода); параметры,
+        которых у элемента нет (diameter у прямоугольного, angle у воздуховода),
+        не разыгрываются. Параметр, которого нет ни у одного вида элементов
+        хранилища, - ошибка ValueError.
+    samples - количество реализаций на элемент
+    percentiles - рассчитываемые процентили, %
+    seed - начальное значение генератора случайных чисел
+    max_rows - предельное количество строк в одном пакете
+    dtype - тип чисел пакетного расчета ("float32" - вдвое меньше памяти на пакет,
+        см. engine.precision.check_precision())
+
+    Возвращает:
+    словарь {id элемента: {имя: значение}}, где для каждого результата пакетной функции
+    (например, dP) есть 'dP_mean', 'dP_std' и 'dP_p<процентиль>'
+    """
+    element_ids = list(store)
+    by_kind = {}
+    for position, element_id in enumerate(element_ids):
+        by_kind.setdefault(store[element_id]["kind"], []).append(position)
+
+    for name in distributions:
+        if all(_default(kind, name) is _ABSENT for kind in by_kind):
+            raise ValueError(f"Параметра {name} нет ни у одного элемента хранилища")
+
+    chunk_elements = max(1, max_rows // samples)
+    results = {}
+    chunk_number = 0
+    for kind, positions in by_kind.items():
+        elements_params = [store[element_ids[position]]["params"] for position in positions]
+        for batch_params, indices, columns in group_elements(kind, elements_params):
+            for start in range(0, len(indices), chunk_elements):
+                # Отдельный поток случайных чисел на каждую часть
+                rng = np.random.default_rng([seed, chunk_number])
+                chunk_number += 1
+                stop = min(start + chunk_elements, len(indices))
+                chunk = {
+                    name: np.repeat(values[start:stop], samples) for name, values in columns.items()
+                }
+                for name, distribution in distributions.items():
+                    if _default(kind, name) is not _ABSENT:
+                        nominal = _nominal(kind, name, chunk, (stop - start) * samples)
+                        if np.isfinite(nominal).any():
+                            chunk[name] = _sample(rng, nominal, distribution)
+
+                values = KERNELS[kind](**chunk, **batch_params, dtype=dtype)
+                summary = {}
+                for name, column in values.items():
+                    column = column.reshape(stop - start, samples)
+                    summary[f"{name}_mean"] = column.mean(axis=1)
+                    summary[f"{name}_std"] = column.std(axis=1)
+                    for percentile, value in zip(
+                        percentiles, np.percentile(column, percentiles, axis=1)
+                    ):
+                        summary[f"{name}_p{percentile:g}"] = value
+
+                for i, index in enumerate(indices[start:stop]):
+                    element_id = element_ids[positions[index]]
+                    results[element_id] = {name: float(value[i]) for name, value in summary.items()}
+
+    return {element_id: results[element_id] for element_id in element_ids}
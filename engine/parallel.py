@@ -0,0 +1,235 @@
+import concurrent.futures
+import contextlib
+import os
+import tempfile
+import numpy as np
+from calculations.cross import cross
+from calculations.duct import duct
+from calculations.elbow import elbow
+from calculations.tee import tee
+from calculations.transition import transition
+from engine.autotune import evaluate_autotuned
+from engine.store import KERNELS, evaluate_store
+from physics.vectorized import as_columns
+
+# Скалярные функции расчета для каждого вида элемента
+SCALAR_FUNCTIONS = {
+    "duct": duct,
+    "elbow": elbow,
+    "transition": transition,
+    "tee": tee,
+    "cross": cross,
+}
+
+BACKENDS = ("batch", "scalar")
+
+TRANSPORTS = ("shared", "pickle")
+
+# Папка для столбцов, отображаемых в память: в Linux - /dev/shm (файлы в оперативной памяти)
+SHARED_DIRECTORY = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def evaluate_scalar(store, quiet=False):
+    """
+    Рассчитывает элементы хранилища по одному скалярными функциями из calculations
+    (эталонный расчет с проверками assert и печатью хода расчета).
+
+    Аргументы:
+    store - хранилище элементов
+    quiet - если True, печать скалярных функций подавляется
+
+    Возвращает:
+    словарь {id элемента: {имя результата: значение}}; для элемента с некорректными
+    данными или ошибкой расчета - {'message': текст ошибки}
+    """
+    results = {}
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        for element_id, element in store.items():
+            try:
+                value = SCALAR_FUNCTIONS[element["kind"]](**element["params"])
+            except (AssertionError, ArithmeticError, TypeError, ValueError) as error:
+                # Ошибка одного элемента (проверка assert, деление на ноль, неизвестный
+                # аргумент) не прерывает расчет остальных
+                results[element_id] = {"message": str(error) or type(error).__name__}
+                continue
+            results[element_id] = value if isinstance(value, dict) else {"dP": value}
+    return results
+
+
+def _evaluate_part(store, backend, options):
+    if backend == "scalar":
+        return evaluate_scalar(store, options.get("quiet", False))
+    return evaluate_store(store, **{k: v for k, v in options.items() if k != "quiet"})
+
+
+def split_store(store, parts):
+    """
+    Делит хранилище на parts частей подряд идущих элементов примерно равного размера
+    (порядок элементов сохраняется, соседние воздуховоды остаются рядом).
+
+    Аргументы:
+    store - хранилище элементов
+    parts - количество частей
+
+    Возвращает:
+    список хранилищ (без пустых)
+    """
+    element_ids = list(store)
+    size = -(-len(element_ids) // max(parts, 1))
+    return [
+        {element_id: store[element_id] for element_id in element_ids[start : start + size]}
+        for start in range(0, len(element_ids), max(size, 1))
+    ]
+
+
+def evaluate_parallel(store, jobs=1, backend="batch", **options):
+    """
+    Рассчитывает хранилище в jobs процессах: хранилище делится на части
+    (split_store()), каждая часть считается в отдельном процессе.
+
+    Аргументы:
+    store - хранилище элементов
+    jobs - количество процессов (1 - расчет в текущем процессе)
+    backend - "batch" (пакетные функции, engine.store.evaluate_store())
+        или "scalar" (скалярные функции, evaluate_scalar())
+    options - аргументы evaluate_store() (mode, validate, coalesce) для batch
+        или quiet для scalar
+
+    Возвращает:
+    словарь {id элемента: {имя результата: значение}} в порядке хранилища
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный способ расчета: {backend}")
+    if jobs <= 1 or len(store) < 2:
+        return _evaluate_part(store, backend, options)
+
+    results = {}
+    parts = split_store(store, jobs)
+    with concurrent.futures.ProcessPoolExecutor(len(parts)) as executor:
+        futures = [executor.submit(_evaluate_part, part, backend, options) for part in parts]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def _evaluate_shared(kind, inputs, categories, outputs, start, stop, batch_params):
+    # Исполнитель считает срез [start, stop) по отображенным в память столбцам без копирования;
+    # столбцы объектов (строки вместе с None) передаются кодами категорий
+    columns = {}
+    for name, path in inputs.items():
+        values = np.load(path, mmap_mode="r")[start:stop]
+        if name in categories:
+            values = np.asarray(categories[name], dtype=object)[values]
+        columns[name] = values
+    result = KERNELS[kind](**columns, **batch_params)
+    for name, path in outputs.items():
+        array = np.load(path, mmap_mode="r+")
+        array[start:stop] = result[name]
+        array.flush()
+
+
+def _evaluate_pickled(kind, columns, batch_params):
+    return KERNELS[kind](**columns, **batch_params)
+
+
+def _categorize(array):
+    # Столбец объектов (например, oriented со строками и None) нельзя отобразить в память:
+    # он заменяется кодами int32 и списком категорий (значения в порядке появления)
+    lookup = {}
+    codes = np.fromiter(
+        (lookup.setdefault(value, len(lookup)) for value in array.tolist()),
+        dtype=np.int32,
+        count=len(array),
+    )
+    return codes, list(lookup)
+
+
+def _share(array, directory, name):
+    # Записывает массив в файл .npy в общей папке, возвращает путь для исполнителей
+    path = os.path.join(directory, f"{name}.npy")
+    np.lib.format.open_memmap(path, mode="w+", dtype=array.dtype, shape=array.shape)[:] = array
+    return path
+
+
+def evaluate_columns(
+    kind, columns, jobs=1, transport="shared", executor=None, autotune=False, **batch_params
+):
+    """
+    Рассчитывает большой пакет однотипных элементов в нескольких процессах.
+    Строки пакета делятся на jobs срезов, каждый срез считается пакетной функцией
+    в отдельном процессе.
+    При transport="shared" входные и выходные столбцы размещаются в файлах,
+    отображаемых в память (в /dev/shm, если есть): исполнители получают только пути
+    и границы среза и работают с представлениями numpy.memmap без копирования;
+    столбцы объектов (строки вместе с None) передаются кодами категорий.
+    При transport="pickle" срезы столбцов и результаты передаются сериализацией
+    (для сравнения, см. benchmarks/transport.py).
+
+    Аргументы:
+    kind - вид элемента
+    columns - столбцы аргументов пакетной функции (числа, массивы, строки)
+    jobs - количество процессов (1 - расчет в текущем процессе)
+    transport - "shared" или "pickle"
+    executor - готовый concurrent.futures.ProcessPoolExecutor
+        (None - создается на время расчета)
+    autotune - если True, пакет считается частями, размер части и количество процессов
+        (не больше jobs) подбираются по пробным частям (engine.autotune.evaluate_autotuned());
+        transport и executor при этом не используются
+    batch_params - аргументы на весь пакет (thermophysics, calcversion, derivative)
+
+    Возвращает:
+    словарь массивов (ключи как у пакетной функции вида kind)
+    """
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Неизвестный способ передачи данных: {transport}")
+    if autotune:
+        return evaluate_autotuned(kind, columns, max_jobs=jobs, **batch_params)[0]
+    names = [name for name, value in columns.items() if value is not None]
+    columns = dict(zip(names, as_columns(*[columns[name] for name in names])))
+    size = len(columns[names[0]])
+    if jobs <= 1 or size < jobs:
+        return KERNELS[kind](**columns, **batch_params)
+
+    # Имена результатов - по расчету первой строки
+    first = KERNELS[kind](**{name: values[:1] for name, values in columns.items()}, **batch_params)
+    bounds = np.linspace(0, size, jobs + 1).astype(int)
+
+    with contextlib.ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(jobs))
+        if transport == "pickle":
+            futures = [
+                executor.submit(
+                    _evaluate_pickled,
+                    kind,
+                    {name: values[start:stop] for name, values in columns.items()},
+                    batch_params,
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            parts = [future.result() for future in futures]
+            return {name: np.concatenate([part[name] for part in parts]) for name in first}
+
+        directory = stack.enter_context(tempfile.TemporaryDirectory(dir=SHARED_DIRECTORY))
+        inputs = {}
+        categories = {}
+        for name, values in columns.items():
+            if values.dtype == object:
+                values, categories[name] = _categorize(values)
+            inputs[name] = _share(values, directory, name)
+        outputs = {
+            name: _share(np.empty(size, dtype=values.dtype), directory, f"result_{name}")
+            for name, values in first.items()
+        }
+        futures = [
+            executor.submit(
+                _evaluate_shared, kind, inputs, categories, outputs, start, stop, batch_params
+            )
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        ]
+        for future in futures:
+            future.result()
+        return {name: np.load(path) for name, path in outputs.items()}
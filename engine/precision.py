@@ -0,0 +1,67 @@
+import numpy as np
+from engine.store import KERNELS
+from physics.vectorized import as_columns
+
+# Допустимое относительное отклонение float32 от float64 по умолчанию:
+# потери давления указываются с точностью 0.01 Па, т.е. 1e-4 от 100 Па
+THRESHOLD = 1e-4
+
+
+def relative_error(values, reference):
+    """
+    Относительное отклонение values от reference. Если оба значения NaN - 0;
+    если reference = 0, а values нет - inf.
+    """
+    values = np.asarray(values, dtype=float)
+    reference = np.asarray(reference, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        error = np.abs(values - reference) / np.abs(reference)
+    # Совпадающие значения (в т.ч. нули) и NaN в обоих расчетах - без отклонения
+    same = (values == reference) | (np.isnan(values) & np.isnan(reference))
+    return np.where(same, 0, np.where(np.isnan(error), np.inf, error))
+
+
+def check_precision(kind, columns, sample_size=1000, threshold=THRESHOLD, seed=0, **batch_params):
+    """
+    Проверка точности компактного режима float32 пакетных функций: случайная выборка
+    строк пакета считается в float32 и в float64, для каждого результата
+    рассчитывается относительное отклонение. Строки, где отклонение хотя бы одного
+    результата больше threshold, отмечаются - обычно это строки, где результат близок
+    к нулю (например, КМС пути тройника около точки переключения ветвей формулы
+    dzeta_diverge()), и их следует пересчитать в float64.
+
+    Аргументы:
+    kind - вид элемента
+    columns - столбцы аргументов пакетной функции (числа, массивы, строки)
+    sample_size - размер выборки (None - проверяются все строки)
+    threshold - допустимое относительное отклонение
+    seed - начальное значение генератора случайных чисел для выборки
+    batch_params - аргументы на весь пакет (thermophysics, calcversion, derivative)
+
+    Возвращает:
+    словарь:
+    'rows' - номера проверенных строк пакета,
+    'max_error' - {имя результата: наибольшее относительное отклонение на выборке},
+    'errors' - {имя результата: относительные отклонения по проверенным строкам},
+    'flagged' - номера строк пакета с отклонением больше threshold
+    """
+    names = [name for name, value in columns.items() if value is not None]
+    columns = dict(zip(names, as_columns(*[columns[name] for name in names])))
+    size = len(columns[names[0]])
+    rows = np.arange(size)
+    if sample_size is not None and sample_size < size:
+        rows = np.sort(np.random.default_rng(seed).choice(size, sample_size, replace=False))
+    sample = {name: values[rows] for name, values in columns.items()}
+
+    exact = KERNELS[kind](**sample, **batch_params)
+    compact = KERNELS[kind](**sample, **batch_params, dtype="float32")
+    errors = {name: relative_error(compact[name], exact[name]) for name in exact}
+    flagged = np.zeros(len(rows), dtype=bool)
+    for error in errors.values():
+        flagged |= error > threshold
+    return {
+        "rows": rows,
+        "max_error": {name: float(error.max(initial=0)) for name, error in errors.items()},
+        "errors": errors,
+        "flagged": rows[flagged],
+    }
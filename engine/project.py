@@ -0,0 +1,139 @@
+import csv
+import json
+import math
+from engine.store import add_element, create_store
+
+
+# Строковые аргументы функций расчета: ячейки CSV этих столбцов не переводятся в числа
+# (calcversion "22" сравнивается как строка)
+STRING_PARAMS = ("thermophysics", "calcversion", "oriented", "flowtype")
+
+
+def _value(name, text):
+    # Значение ячейки CSV: число или строка; пустая ячейка - не задано
+    if name in STRING_PARAMS:
+        return text
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def element_spec(spec):
+    """
+    Разбирает описание элемента из файла проекта.
+
+    Аргументы:
+    spec - словарь {"id": ..., "kind": ..., аргументы},
+        или словарь {"id": ..., "kind": ..., "params": {...}}, или кортеж (id, kind, params)
+
+    Возвращает:
+    кортеж (id, kind, params)
+    """
+    if isinstance(spec, tuple):
+        return spec
+    spec = dict(spec)
+    element_id, kind = spec.pop("id"), spec.pop("kind")
+    return element_id, kind, spec.pop("params", spec)
+
+
+def iter_elements(path):
+    """
+    Последовательно читает элементы из файла проекта (форматы - как у load_project()).
+    Файл элементов .csv читается построчно, без загрузки в память целиком.
+
+    Аргументы:
+    path - путь к файлу проекта
+
+    Возвращает:
+    генератор кортежей (id, kind, params)
+    """
+    if str(path).endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as csvfile:
+            for row in csv.DictReader(csvfile):
+                params = {
+                    name: _value(name, value)
+                    for name, value in row.items()
+                    if name not in ("id", "kind") and value not in ("", None)
+                }
+                yield row["id"], row["kind"], params
+        return
+
+    with open(path, encoding="utf-8") as jsonfile:
+        data = json.load(jsonfile)
+    if isinstance(data, dict) and "elements" in data:
+        data = data["elements"]
+    if isinstance(data, dict):
+        for element_id, element in data.items():
+            yield element_id, element["kind"], element["params"]
+    else:
+        for spec in data:
+            yield element_spec(spec)
+
+
+def load_project(path):
+    """
+    Читает проект из файла в хранилище элементов (см. engine.store).
+    Поддерживаемые форматы:
+    - файл элементов .csv: строка - элемент, столбцы id, kind и аргументы функции
+      расчета (пустая ячейка - аргумент не задан);
+    - файл сети .json: хранилище {id: {"kind": ..., "params": {...}}},
+      или список элементов [{"id": ..., "kind": ..., аргументы}],
+      или объект {"elements": [...]} с таким списком.
+
+    Аргументы:
+    path - путь к файлу проекта
+
+    Возвращает:
+    хранилище элементов
+    """
+    store = create_store()
+    for element_id, kind, params in iter_elements(path):
+        add_element(store, element_id, kind, **params)
+    return store
+
+
+def json_values(payload):
+    """
+    Заменяет NaN и бесконечность на None во вложенных словарях и списках: JSON
+    их не допускает (json.dump записал бы NaN, Infinity).
+
+    Аргументы:
+    payload - значение, словарь или список
+
+    Возвращает:
+    копию payload с None вместо нечисловых значений
+    """
+    if isinstance(payload, dict):
+        return {name: json_values(value) for name, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [json_values(value) for value in payload]
+    if isinstance(payload, float) and not math.isfinite(payload):
+        return None
+    return payload
+
+
+def save_results(results, path):
+    """
+    Записывает результаты расчета хранилища в файл .json ({id: {имя: значение}},
+    NaN и бесконечность записываются как null) или .csv (строка - элемент, столбец id
+    и столбцы результатов; NaN, бесконечность и отсутствующие значения - пустые ячейки).
+
+    Аргументы:
+    results - результаты расчета, {id элемента: {имя результата: значение}}
+    path - путь к файлу результатов
+    """
+    results = json_values(results)
+    if str(path).endswith(".csv"):
+        names = []
+        for values in results.values():
+            names += [name for name in values if name not in names]
+        with open(path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, ["id"] + names)
+            writer.writeheader()
+            for element_id, values in results.items():
+                writer.writerow({"id": element_id, **values})
+        return
+
+    with open(path, "w", encoding="utf-8") as jsonfile:
+        json.dump(results, jsonfile, ensure_ascii=False, allow_nan=False, indent=1)
@@ -0,0 +1,149 @@
+import json
+import os
+import numpy as np
+from engine.store import KERNELS, group_elements
+
+# Столбцы хранилища результатов по умолчанию (кроме id)
+RESULT_COLUMNS = ("dP", "zeta", "velocity", "Re", "lambda")
+
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.npy")
+
+
+def create_result_store(path, size, columns=RESULT_COLUMNS, id_length=32):
+    """
+    Создает хранилище результатов на диске: папку с файлами .npy (по одному на столбец),
+    которые отображаются в память. Столбцы заполнены NaN, id - пустыми строками.
+    Размер на диске фиксирован заранее, оперативная память расходуется только
+    на страницы, к которым идет обращение.
+
+    Аргументы:
+    path - путь к папке хранилища (создается)
+    size - количество строк
+    columns - имена столбцов результатов, например RESULT_COLUMNS
+        или RESULT_COLUMNS + ("dP_o", "dP_p") для тройников
+    id_length - наибольшая длина id элемента, символов (запись более длинного id -
+        ошибка ValueError)
+
+    Возвращает:
+    хранилище, открытое на запись (см. open_result_store())
+    """
+    os.makedirs(path)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as jsonfile:
+        json.dump({"size": size, "columns": list(columns)}, jsonfile)
+    ids = np.lib.format.open_memmap(
+        _column_path(path, "id"), mode="w+", dtype=f"<U{id_length}", shape=(size,)
+    )
+    ids.flush()
+    for name in columns:
+        column = np.lib.format.open_memmap(
+            _column_path(path, name), mode="w+", dtype=float, shape=(size,)
+        )
+        column[:] = np.nan
+        column.flush()
+    return open_result_store(path, "r+")
+
+
+def open_result_store(path, mode="r"):
+    """
+    Открывает хранилище результатов. Данные не читаются: столбцы - массивы numpy.memmap,
+    страницы с диска подгружаются при обращении, поэтому открытие мгновенное
+    при любом размере.
+
+    Аргументы:
+    path - путь к папке хранилища
+    mode - "r" (только чтение) или "r+" (чтение и запись)
+
+    Возвращает:
+    словарь {имя столбца: массив numpy.memmap}, первый столбец - 'id'
+    """
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as jsonfile:
+        meta = json.load(jsonfile)
+    return {
+        name: np.load(_column_path(path, name), mmap_mode=mode) for name in ["id"] + meta["columns"]
+    }
+
+
+def _write_ids(results, start, ids):
+    # Записывает id элементов в строки с start; id длиннее поля хранилища не обрезаются
+    # молча (обрезанные id могли бы совпасть), а вызывают ошибку
+    ids = np.asarray(ids, dtype=str)
+    length = ids.dtype.itemsize // np.dtype("<U1").itemsize
+    id_length = results["id"].dtype.itemsize // np.dtype("<U1").itemsize
+    if length > id_length:
+        longest = max(ids.tolist(), key=len)
+        raise ValueError(
+            f"id элемента {longest!r} длиннее {id_length} символов: "
+            "увеличьте id_length в create_result_store()"
+        )
+    stop = start + len(ids)
+    results["id"][start:stop] = ids
+    return stop
+
+
+def write_batch(results, start, kind, ids, columns, **batch_params):
+    """
+    Рассчитывает пакет однотипных элементов и записывает результаты в строки
+    [start, start + длина пакета) хранилища. Пакетная функция пишет результаты
+    прямо в срезы отображенных в память столбцов (аргумент out).
+
+    Аргументы:
+    results - хранилище результатов, открытое на запись
+    start - номер первой строки
+    kind - вид элемента
+    ids - id элементов пакета (массив или список)
+    columns - столбцы аргументов пакетной функции
+    batch_params - аргументы на весь пакет (thermophysics, calcversion)
+
+    Возвращает:
+    номер строки, следующей за записанными
+
+    Исключения:
+    ValueError, если id элемента длиннее поля id хранилища
+    """
+    stop = _write_ids(results, start, ids)
+    out = {name: column[start:stop] for name, column in results.items() if name != "id"}
+    KERNELS[kind](**columns, **batch_params, out=out)
+    return stop
+
+
+def write_store(results, store, start=0):
+    """
+    Рассчитывает все элементы хранилища элементов (см. engine.store) и записывает
+    результаты в хранилище результатов начиная со строки start, в порядке элементов.
+
+    Аргументы:
+    results - хранилище результатов, открытое на запись
+    store - хранилище элементов
+    start - номер первой строки
+
+    Возвращает:
+    номер строки, следующей за записанными
+
+    Исключения:
+    ValueError, если id элемента длиннее поля id хранилища
+    """
+    element_ids = list(store)
+    stop = _write_ids(results, start, element_ids)
+    by_kind = {}
+    for position, element_id in enumerate(element_ids):
+        by_kind.setdefault(store[element_id]["kind"], []).append(position)
+    for kind, positions in by_kind.items():
+        elements_params = [store[element_ids[position]]["params"] for position in positions]
+        for batch_params, indices, columns in group_elements(kind, elements_params):
+            rows = start + np.asarray(positions)[indices]
+            out = {name: np.full(len(rows), np.nan) for name in results if name != "id"}
+            KERNELS[kind](**columns, **batch_params, out=out)
+            for name, values in out.items():
+                results[name][rows] = values
+    return stop
+
+
+def flush(results):
+    """
+    Сбрасывает записанные данные хранилища результатов на диск.
+    """
+    for column in results.values():
+        if isinstance(column, np.memmap) and column.mode != "r":
+            column.flush()
@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import collections
+import json
+import time
+import numpy as np
+from engine import validation
+from engine.project import json_values
+from engine.store import KERNELS, evaluate_elements
+
+# Сервис работает только на локальной машине
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+HTTP_STATUS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class ServiceError(Exception):
+    """
+    Ошибка обработки запроса с кодом ответа HTTP.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def create_service(window=0.002, max_batch=4096, max_queue=10000, timeout=5.0):
+    """
+    Создает состояние сервиса расчета с объединением запросов в пакеты.
+    Запросы, пришедшие в течение window секунд, считаются одним вызовом пакетной
+    функции (engine.store.evaluate_elements() с проверкой входных данных).
+
+    Аргументы:
+    window - окно сбора пакета, с
+    max_batch - наибольшее количество запросов в пакете
+    max_queue - предельная длина очереди каждого вида элемента; при переполнении
+        запрос отклоняется (HTTP 503)
+    timeout - предельное время ожидания результата одним запросом, с (HTTP 504)
+
+    Возвращает:
+    словарь состояния сервиса (передается в остальные функции модуля)
+    """
+    return {
+        "window": window,
+        "max_batch": max_batch,
+        "max_queue": max_queue,
+        "timeout": timeout,
+        "queues": {},
+        "workers": {},
+        "started": time.perf_counter(),
+        "counters": collections.Counter(),
+        "latency": collections.deque(maxlen=10000),
+    }
+
+
+def _evaluate(kind, elements_params):
+    # Расчет пакета; при ошибке пакетной функции (например, неизвестный аргумент
+    # у одного из запросов) запросы считаются по одному, чтобы ошибка не касалась остальных
+    try:
+        values = evaluate_elements(kind, elements_params, validate=True)
+        return [
+            {name: column[i].item() for name, column in values.items()}
+            for i in range(len(elements_params))
+        ]
+    except Exception as error:
+        if len(elements_params) == 1:
+            return [error]
+        return [_evaluate(kind, [params])[0] for params in elements_params]
+
+
+async def _worker(service, kind):
+    # Собирает запросы одного вида элемента в пакеты и считает их
+    loop = asyncio.get_running_loop()
+    queue = service["queues"][kind]
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + service["window"]
+        while len(batch) < service["max_batch"]:
+            if queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(queue.get_nowait())
+
+        # Запросы, которые уже не ждут результата (истекло время), не считаются
+        batch = [(params, future) for params, future in batch if not future.done()]
+        if not batch:
+            continue
+        results = await loop.run_in_executor(None, _evaluate, kind, [params for params, _ in batch])
+        service["counters"]["batches"] += 1
+        service["counters"]["batch_rows"] += len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(ServiceError(400, str(result)))
+            else:
+                future.set_result(result)
+
+
+async def calculate(service, kind, params):
+    """
+    Ставит расчет одного элемента в очередь и ожидает результат.
+
+    Аргументы:
+    service - состояние сервиса из create_service()
+    kind - вид элемента: duct, elbow, transition, tee или cross
+    params - аргументы функции расчета элемента (как у функций из calculations)
+
+    Возвращает:
+    словарь {имя результата: значение} (ключи как у пакетной функции вида kind)
+
+    Исключения:
+    ServiceError с кодом 404 (неизвестный вид), 400 (некорректные данные),
+    503 (очередь переполнена) или 504 (истекло время ожидания)
+    """
+    if kind not in KERNELS:
+        raise ServiceError(404, f"Неизвестный вид элемента: {kind}")
+    if not isinstance(params, dict):
+        raise ServiceError(400, "Аргументы элемента должны быть объектом JSON")
+    if kind not in service["queues"]:
+        service["queues"][kind] = asyncio.Queue(service["max_queue"])
+        service["workers"][kind] = asyncio.create_task(_worker(service, kind))
+
+    counters = service["counters"]
+    counters["requests"] += 1
+    started = time.perf_counter()
+    future = asyncio.get_running_loop().create_future()
+    try:
+        service["queues"][kind].put_nowait((params, future))
+    except asyncio.QueueFull:
+        counters["rejected"] += 1
+        raise ServiceError(503, "Очередь расчета переполнена")
+    try:
+        result = await asyncio.wait_for(future, service["timeout"])
+    except asyncio.TimeoutError:
+        counters["timeouts"] += 1
+        raise ServiceError(504, "Истекло время ожидания расчета")
+    except ServiceError:
+        counters["invalid"] += 1
+        raise
+
+    error = result.pop("error")
+    if error:
+        counters["invalid"] += 1
+        raise ServiceError(400, " ".join(validation.error_messages(error)))
+    counters["completed"] += 1
+    service["latency"].append(time.perf_counter() - started)
+    return result
+
+
+def metrics(service):
+    """
+    Возвращает метрики сервиса с момента запуска.
+
+    Аргументы:
+    service - состояние сервиса из create_service()
+
+    Возвращает:
+    словарь: количество запросов 'requests', выполненных 'completed', отклоненных
+    из-за переполнения очереди 'rejected', с истекшим временем 'timeouts',
+    с некорректными данными 'invalid'; количество пакетов 'batches' и средний размер
+    пакета 'mean_batch_size'; пропускная способность 'throughput', запросов/с;
+    задержка 'latency_p50', 'latency_p95', 'latency_p99', мс (по последним 10000 запросам);
+    текущая длина очередей 'queued'
+    """
+    counters = service["counters"]
+    elapsed = time.perf_counter() - service["started"]
+    result = {
+        name: counters[name]
+        for name in ("requests", "completed", "rejected", "timeouts", "invalid")
+    }
+    result["batches"] = counters["batches"]
+    result["mean_batch_size"] = counters["batch_rows"] / max(counters["batches"], 1)
+    result["throughput"] = counters["completed"] / elapsed
+    latency = np.array(service["latency"]) * 1000
+    for percentile in (50, 95, 99):
+        value = np.percentile(latency, percentile) if latency.size else 0.0
+        result[f"latency_p{percentile}"] = float(value)
+    result["queued"] = sum(queue.qsize() for queue in service["queues"].values())
+    return result
+
+
+async def _respond(writer, status, payload, keep_alive):
+    body = json.dumps(json_values(payload), ensure_ascii=False, allow_nan=False).encode()
+    head = (
+        f"HTTP/1.1 {status} {HTTP_STATUS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+
+async def _route(service, method, path, body):
+    # POST /<вид элемента> - объект аргументов или список объектов; GET /metrics
+    if path == "/metrics":
+        if method != "GET":
+            raise ServiceError(405, "Метрики запрашиваются методом GET")
+        return metrics(service)
+    if method != "POST":
+        raise ServiceError(405, "Расчет запрашивается методом POST")
+    try:
+        params = json.loads(body or b"null")
+    except ValueError:
+        raise ServiceError(400, "Тело запроса - не JSON")
+    kind = path.strip("/")
+    if isinstance(params, list):
+        return await asyncio.gather(*[calculate(service, kind, item) for item in params])
+    return await calculate(service, kind, params)
+
+
+def _parse_head(request_line, headers):
+    # Метод, путь и длина тела запроса; некорректная строка запроса или Content-Length -
+    # ServiceError 400
+    parts = request_line.decode("latin-1").split()
+    if len(parts) < 2:
+        raise ServiceError(400, "Некорректная строка запроса")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise ServiceError(400, "Некорректный заголовок Content-Length")
+    return parts[0], parts[1], length
+
+
+async def _handle_connection(service, reader, writer):
+    # Простейший HTTP/1.1 с поддержкой keep-alive
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                method, path, length = _parse_head(request_line, headers)
+            except ServiceError as error:
+                # Границы следующего запроса неизвестны: ответ 400 и закрытие соединения
+                await _respond(writer, error.status, {"message": str(error)}, False)
+                break
+            body = await reader.readexactly(length)
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                status, payload = 200, await _route(service, method, path, body)
+            except ServiceError as error:
+                status, payload = error.status, {"message": str(error)}
+            await _respond(writer, status, payload, keep_alive)
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host="127.0.0.1", port=8000):
+    """
+    Запускает HTTP-сервер расчета на локальной машине.
+    POST /duct, /elbow, /transition, /tee, /cross - тело запроса: объект JSON
+    с аргументами функции расчета (или список таких объектов), ответ - объект
+    (список объектов) с результатами, нечисловые результаты (NaN) - null;
+    GET /metrics - метрики сервиса.
+
+    Аргументы:
+    service - состояние сервиса из create_service()
+    host - адрес: только 127.0.0.1, localhost или ::1
+    port - порт (0 - любой свободный)
+
+    Возвращает:
+    asyncio.Server (фактический порт - server.sockets[0].getsockname()[1])
+    """
+    if host not in LOCAL_HOSTS:
+        raise ValueError(f"Сервис работает только на локальной машине, адрес: {host}")
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(service, reader, writer), host, port
+    )
+
+
+async def _serve(args):
+    service = create_service(args.window / 1000, args.max_batch, args.max_queue, args.timeout)
+    server = await start_server(service, args.host, args.port)
+    print(f"Сервис расчета: http://{args.host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальный сервис расчета потерь давления")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--window", type=float, default=2.0, help="окно сбора пакета, мс")
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument("--max-queue", type=int, default=10000)
+    parser.add_argument("--timeout", type=float, default=5.0, help="время ожидания, с")
+    asyncio.run(_serve(parser.parse_args()))
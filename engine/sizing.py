@@ -0,0 +1,198 @@
+import csv
+import functools
+import numpy as np
+from calculations.duct import duct_batch
+from physics.vectorized import as_columns, velocity
+
+
+def _read_column(path, name):
+    with open(path, newline="") as csvfile:
+        return [float(row[name]) for row in csv.DictReader(csvfile)]
+
+
+@functools.lru_cache(maxsize=None)
+def round_catalog():
+    """
+    Возвращает каталог стандартных диаметров круглых воздуховодов
+    (data/duct_sizes_round.csv), отсортированный по возрастанию.
+
+    Возвращает:
+    массив диаметров, м
+    """
+    return np.unique(_read_column("./data/duct_sizes_round.csv", "diameter"))
+
+
+@functools.lru_cache(maxsize=None)
+def rectangular_catalog():
+    """
+    Возвращает каталог стандартных прямоугольных сечений - все пары стандартных сторон
+    (data/duct_sizes_rectangular.csv), высота не больше ширины.
+    Сечения отсортированы по соотношению сторон (индекс для отбора по max_aspect).
+
+    Возвращает:
+    словарь массивов 'height', 'width', 'aspect' (ширина/высота), м
+    """
+    sides = np.unique(_read_column("./data/duct_sizes_rectangular.csv", "side"))
+    height, width = np.meshgrid(sides, sides, indexing="ij")
+    keep = height <= width
+    height, width = height[keep], width[keep]
+    aspect = width / height
+    order = np.lexsort((height * width, aspect))
+    return {"height": height[order], "width": width[order], "aspect": aspect[order]}
+
+
+@functools.lru_cache(maxsize=None)
+def _rectangular_by_area(max_aspect):
+    # Сечения с соотношением сторон не более max_aspect, отсортированные по площади.
+    # Благодаря сортировке каталога по соотношению сторон отбор - один бинарный поиск
+    catalog = rectangular_catalog()
+    count = np.searchsorted(catalog["aspect"], max_aspect * (1 + 1e-9), side="right")
+    height, width = catalog["height"][:count], catalog["width"][:count]
+    order = np.lexsort((width / height, height * width))
+    return height[order], width[order], (height * width)[order]
+
+
+def _select(
+    flow,
+    temperature,
+    required_area,
+    sizes_area,
+    params,
+    max_specific_loss,
+    roughness,
+    thermophysics,
+):
+    # Первое (наименьшее) сечение, проходящее по скорости, - бинарным поиском по площади;
+    # затем строки, не проходящие по удельным потерям, сдвигаются на следующий размер.
+    # Строки с max_specific_loss = NaN по потерям не проверяются
+    index = np.searchsorted(sizes_area, required_area * (1 - 1e-12), side="left")
+    if not np.all(np.isnan(max_specific_loss)):
+        active = np.flatnonzero((index < len(sizes_area)) & ~np.isnan(max_specific_loss))
+        while active.size:
+            columns = {name: values[index[active]] for name, values in params.items()}
+            loss = duct_batch(
+                flow=flow[active],
+                length=1,
+                temperature=temperature[active],
+                roughness=roughness[active],
+                thermophysics=thermophysics,
+                **columns,
+            )["dP"]
+            failed = active[loss > max_specific_loss[active]]
+            index[failed] += 1
+            active = failed[index[failed] < len(sizes_area)]
+    return index, index < len(sizes_area)
+
+
+def select_round(
+    flow,
+    temperature,
+    max_velocity=None,
+    max_specific_loss=None,
+    roughness=0.001,
+    thermophysics="idelchik",
+):
+    """
+    Подбирает для каждого участка наименьший стандартный диаметр круглого воздуховода,
+    при котором скорость не превышает max_velocity, а удельные потери на трение -
+    max_specific_loss. Считается сразу для всех участков.
+
+    Аргументы:
+    flow - расход воздуха, м^3/ч
+    temperature - температура воздуха, °C
+    max_velocity - предельная скорость, м/с (None - не проверяется)
+    max_specific_loss - предельные удельные потери, Па/м (None - не проверяются)
+    roughness - абсолютная шероховатость, м
+    thermophysics - модель термофизических свойств (idelchik или thermo)
+    Все аргументы, кроме thermophysics, - числа или массивы.
+
+    Возвращает:
+    Словарь массивов 'diameter' (м), 'velocity' (м/с), 'specific_loss' (Па/м).
+    Если в каталоге нет подходящего диаметра - NaN.
+    """
+    flow, temperature, max_velocity, max_specific_loss, roughness = as_columns(
+        flow, temperature, max_velocity, max_specific_loss, roughness
+    )
+    diameters = round_catalog()
+    required_area = np.where(np.isnan(max_velocity), 0, flow / 3600 / max_velocity)
+    index, found = _select(
+        flow,
+        temperature,
+        required_area,
+        np.pi * diameters**2 / 4,
+        {"diameter": diameters},
+        max_specific_loss,
+        roughness,
+        thermophysics,
+    )
+    diameter = np.where(found, diameters[np.minimum(index, len(diameters) - 1)], np.nan)
+    return {
+        "diameter": diameter,
+        "velocity": velocity(flow, np.nan, np.nan, diameter),
+        "specific_loss": duct_batch(
+            flow,
+            1,
+            temperature,
+            diameter=diameter,
+            roughness=roughness,
+            thermophysics=thermophysics,
+        )["dP"],
+    }
+
+
+def select_rectangular(
+    flow,
+    temperature,
+    max_velocity=None,
+    max_specific_loss=None,
+    max_aspect=4.0,
+    roughness=0.001,
+    thermophysics="idelchik",
+):
+    """
+    Подбирает для каждого участка наименьшее по площади стандартное прямоугольное сечение
+    с соотношением сторон не более max_aspect, при котором скорость не превышает
+    max_velocity, а удельные потери на трение - max_specific_loss.
+    При равной площади выбирается сечение ближе к квадратному.
+    Считается сразу для всех участков.
+
+    Аргументы:
+    как у select_round(), плюс
+    max_aspect - предельное отношение большей стороны к меньшей (одно на весь пакет)
+
+    Возвращает:
+    Словарь массивов 'height' (меньшая сторона, м), 'width' (м), 'velocity' (м/с),
+    'specific_loss' (Па/м). Если в каталоге нет подходящего сечения - NaN.
+    """
+    flow, temperature, max_velocity, max_specific_loss, roughness = as_columns(
+        flow, temperature, max_velocity, max_specific_loss, roughness
+    )
+    heights, widths, areas = _rectangular_by_area(float(max_aspect))
+    required_area = np.where(np.isnan(max_velocity), 0, flow / 3600 / max_velocity)
+    index, found = _select(
+        flow,
+        temperature,
+        required_area,
+        areas,
+        {"height": heights, "width": widths},
+        max_specific_loss,
+        roughness,
+        thermophysics,
+    )
+    index = np.minimum(index, len(areas) - 1)
+    height = np.where(found, heights[index], np.nan)
+    width = np.where(found, widths[index], np.nan)
+    return {
+        "height": height,
+        "width": width,
+        "velocity": velocity(flow, height, width, np.nan),
+        "specific_loss": duct_batch(
+            flow,
+            1,
+            temperature,
+            height=height,
+            width=width,
+            roughness=roughness,
+            thermophysics=thermophysics,
+        )["dP"],
+    }
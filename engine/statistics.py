@@ -0,0 +1,270 @@
+import collections
+import concurrent.futures
+import itertools
+import math
+import numpy as np
+from engine.project import element_spec
+from engine.store import evaluate_elements
+
+# Диапазон модулей значений, для которых гарантируется относительная точность квантилей.
+# Меньшие по модулю значения считаются нулями, большие попадают в крайний интервал
+MIN_VALUE = 1e-9
+MAX_VALUE = 1e12
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _bins(relative_accuracy):
+    # Параметры логарифмической сетки интервалов: (gamma, номер первого интервала, количество)
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    first = math.floor(math.log(MIN_VALUE, gamma))
+    count = math.ceil(math.log(MAX_VALUE, gamma)) - first + 1
+    return gamma, first, count
+
+
+def create_statistics(relative_accuracy=0.01):
+    """
+    Создает накопитель потоковой статистики одной величины: количество, минимум,
+    максимум, среднее, СКО и квантили. Значения не сохраняются: для квантилей
+    накапливаются счетчики по логарифмической сетке интервалов (как в DDSketch),
+    поэтому память постоянна при любой длине потока, а квантиль определяется
+    с относительной погрешностью не больше relative_accuracy.
+    Накопители с одинаковой relative_accuracy объединяются (merge_statistics()),
+    например результаты разных процессов.
+
+    Аргументы:
+    relative_accuracy - относительная погрешность квантилей
+
+    Возвращает:
+    накопитель (словарь)
+    """
+    count = _bins(relative_accuracy)[2]
+    return {
+        "relative_accuracy": relative_accuracy,
+        "count": 0,
+        "nan": 0,
+        "min": math.inf,
+        "max": -math.inf,
+        "mean": 0.0,
+        "m2": 0.0,
+        "zero": 0,
+        "positive": np.zeros(count, dtype=np.int64),
+        "negative": np.zeros(count, dtype=np.int64),
+    }
+
+
+def _combine(statistics, count, mean, m2):
+    # Объединение среднего и суммы квадратов отклонений двух частей (формулы Чана)
+    total = statistics["count"] + count
+    delta = mean - statistics["mean"]
+    statistics["mean"] += delta * count / total
+    statistics["m2"] += m2 + delta**2 * statistics["count"] * count / total
+    statistics["count"] = total
+
+
+def update_statistics(statistics, values):
+    """
+    Добавляет в накопитель часть значений (массив). NaN не учитываются
+    в статистике, а считаются отдельно ('nan').
+
+    Аргументы:
+    statistics - накопитель (изменяется)
+    values - массив значений
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    valid = ~np.isnan(values)
+    statistics["nan"] += int(values.size - valid.sum())
+    values = values[valid]
+    if not values.size:
+        return
+    statistics["min"] = min(statistics["min"], float(values.min()))
+    statistics["max"] = max(statistics["max"], float(values.max()))
+    mean = float(values.mean())
+    _combine(statistics, values.size, mean, float(((values - mean) ** 2).sum()))
+
+    gamma, first, count = _bins(statistics["relative_accuracy"])
+    magnitude = np.abs(values)
+    statistics["zero"] += int((magnitude < MIN_VALUE).sum())
+    for name, selected in [("positive", values >= MIN_VALUE), ("negative", values <= -MIN_VALUE)]:
+        index = np.ceil(np.log(magnitude[selected]) / math.log(gamma)).astype(np.int64) - first
+        statistics[name] += np.bincount(np.clip(index, 0, count - 1), minlength=count)
+
+
+def merge_statistics(statistics, other):
+    """
+    Добавляет в накопитель statistics данные накопителя other.
+
+    Аргументы:
+    statistics - накопитель (изменяется)
+    other - накопитель с той же относительной погрешностью
+    """
+    if statistics["relative_accuracy"] != other["relative_accuracy"]:
+        raise ValueError("Объединяются накопители с разной точностью квантилей")
+    statistics["nan"] += other["nan"]
+    if not other["count"]:
+        return
+    statistics["min"] = min(statistics["min"], other["min"])
+    statistics["max"] = max(statistics["max"], other["max"])
+    _combine(statistics, other["count"], other["mean"], other["m2"])
+    statistics["zero"] += other["zero"]
+    statistics["positive"] += other["positive"]
+    statistics["negative"] += other["negative"]
+
+
+def quantile(statistics, q):
+    """
+    Квантиль уровня q (от 0 до 1) по накопителю; NaN, если значений нет.
+    """
+    if not statistics["count"]:
+        return math.nan
+    gamma, first, count = _bins(statistics["relative_accuracy"])
+    # Интервалы по возрастанию значений: отрицательные, нули, положительные
+    counts = np.concatenate(
+        [statistics["negative"][::-1], [statistics["zero"]], statistics["positive"]]
+    )
+    position = int(np.searchsorted(np.cumsum(counts), q * (statistics["count"] - 1), "right"))
+    if position == count:
+        value = 0.0
+    else:
+        index = position - count - 1 if position > count else count - 1 - position
+        # Оценка - середина интервала (gamma^(i-1), gamma^i] в смысле относительной погрешности
+        value = 2 * gamma ** (index + first) / (gamma + 1)
+        value = value if position > count else -value
+    return min(max(value, statistics["min"]), statistics["max"])
+
+
+def summarize(statistics, quantiles=QUANTILES):
+    """
+    Сводка накопителя.
+
+    Аргументы:
+    statistics - накопитель
+    quantiles - уровни квантилей (от 0 до 1)
+
+    Возвращает:
+    словарь: 'count', 'nan', 'min', 'max', 'mean', 'std' и 'p<уровень в %>'
+    (например, 'p95'); для пустого накопителя - NaN
+    """
+    empty = not statistics["count"]
+    summary = {
+        "count": statistics["count"],
+        "nan": statistics["nan"],
+        "min": math.nan if empty else statistics["min"],
+        "max": math.nan if empty else statistics["max"],
+        "mean": math.nan if empty else statistics["mean"],
+        "std": math.nan if empty else math.sqrt(statistics["m2"] / statistics["count"]),
+    }
+    for q in quantiles:
+        summary[f"p{q * 100:g}"] = quantile(statistics, q)
+    return summary
+
+
+def update_groups(groups, key, columns, names=None, relative_accuracy=0.01):
+    """
+    Добавляет часть результатов пакетного расчета в статистику группы.
+
+    Аргументы:
+    groups - словарь {ключ группы: {имя величины: накопитель}} (изменяется)
+    key - ключ группы (например, вид элемента)
+    columns - столбцы результатов {имя: массив}
+    names - имена величин для статистики (None - все столбцы)
+    relative_accuracy - относительная погрешность квантилей для новых накопителей
+    """
+    group = groups.setdefault(key, {})
+    for name, values in columns.items():
+        if names is None or name in names:
+            if name not in group:
+                group[name] = create_statistics(relative_accuracy)
+            update_statistics(group[name], values)
+
+
+def merge_groups(groups, other):
+    """
+    Добавляет в статистику групп groups статистику групп other (например,
+    полученную в другом процессе).
+    """
+    for key, group in other.items():
+        for name, statistics in group.items():
+            target = groups.setdefault(key, {})
+            if name not in target:
+                target[name] = create_statistics(statistics["relative_accuracy"])
+            merge_statistics(target[name], statistics)
+
+
+def summarize_groups(groups, quantiles=QUANTILES):
+    """
+    Сводка статистики групп: {ключ группы: {имя величины: сводка (см. summarize())}}.
+    """
+    return {
+        key: {name: summarize(statistics, quantiles) for name, statistics in group.items()}
+        for key, group in groups.items()
+    }
+
+
+def _chunk_statistics(chunk, group, names, relative_accuracy):
+    # Расчет одной части элементов и статистика ее результатов по группам
+    by_key = {}
+    for element_id, kind, params in chunk:
+        key = kind if group is None else group(element_id, kind, params)
+        by_key.setdefault((key, kind), []).append(params)
+    groups = {}
+    for (key, kind), elements_params in by_key.items():
+        columns = evaluate_elements(
+            kind, elements_params, validate=True, intermediates=("velocity",)
+        )
+        del columns["error"]
+        update_groups(groups, key, columns, names, relative_accuracy)
+    return groups
+
+
+def stream_statistics(
+    elements, chunk_size=10000, group=None, names=None, jobs=1, relative_accuracy=0.01
+):
+    """
+    Потоковая статистика результатов расчета большого набора элементов по группам.
+    Элементы считаются частями по chunk_size пакетными функциями (с проверкой
+    входных данных, у некорректных элементов результаты NaN), результаты части сразу
+    добавляются в накопители и не сохраняются - память не зависит от количества
+    элементов. При jobs > 1 части считаются в нескольких процессах, накопители
+    процессов объединяются.
+
+    Аргументы:
+    elements - итерируемый объект описаний элементов: кортежей (id, kind, params)
+        или словарей (см. engine.project.element_spec())
+    chunk_size - количество элементов в одной части
+    group - функция group(id, kind, params), возвращающая ключ группы элемента
+        (None - группа по виду элемента); для jobs > 1 - функция уровня модуля
+    names - имена величин для статистики, например ("dP", "velocity")
+        (None - все результаты пакетных функций и скорость 'velocity')
+    jobs - количество процессов
+    relative_accuracy - относительная погрешность квантилей
+
+    Возвращает:
+    словарь {ключ группы: {имя величины: накопитель}}, сводка - summarize_groups()
+
+    Исключения:
+    ValueError, если chunk_size не положительный
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер части должен быть положительным")
+    elements = iter(elements)
+    chunks = iter(
+        lambda: [element_spec(spec) for spec in itertools.islice(elements, chunk_size)], []
+    )
+    groups = {}
+    if jobs <= 1:
+        for chunk in chunks:
+            merge_groups(groups, _chunk_statistics(chunk, group, names, relative_accuracy))
+        return groups
+
+    with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+        # Не больше двух частей на процесс одновременно - чтение не опережает расчет
+        pending = collections.deque()
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is not None:
+                pending.append(
+                    executor.submit(_chunk_statistics, chunk, group, names, relative_accuracy)
+                )
+            while pending and (chunk is None or len(pending) >= 2 * jobs):
+                merge_groups(groups, pending.popleft().result())
+    return groups
@@ -0,0 +1,265 @@
+import numpy as np
+from physics.vectorized import as_columns
+from engine import validation
+from engine.coalesce import coalesce_ducts, split_results
+from calculations.cross import cross_batch
+from calculations.duct import duct_batch
+from calculations.elbow import elbow_batch
+from calculations.tee import tee_batch
+from calculations.transition import transition_batch
+
+# Пакетные функции расчета для каждого вида элемента
+KERNELS = {
+    "duct": duct_batch,
+    "elbow": elbow_batch,
+    "transition": transition_batch,
+    "tee": tee_batch,
+    "cross": cross_batch,
+}
+
+# Параметры расхода каждого вида элемента. Первый из них - главный расход элемента
+# (для тройника и крестовины это суммарный расход flow_c)
+FLOW_PARAMS = {
+    "duct": ("flow",),
+    "elbow": ("flow",),
+    "transition": ("flow",),
+    "tee": ("flow_c", "flow_o", "flow_p"),
+    "cross": ("flow_c", "flow_o1", "flow_o2", "flow_p"),
+}
+
+# Параметры, которые задаются одним значением на весь пакет (не векторизуются)
+BATCH_PARAMS = ("thermophysics", "calcversion")
+
+
+def create_store():
+    """
+    Создает пустое хранилище элементов.
+    Хранилище - словарь {id элемента: элемент}, элемент - словарь с ключами
+    'kind' (вид элемента, один из KERNELS) и 'params' (аргументы функции расчета,
+    как у скалярных функций из calculations).
+
+    Возвращает:
+    пустое хранилище
+    """
+    return {}
+
+
+def add_element(store, element_id, kind, **params):
+    """
+    Добавляет элемент в хранилище (или заменяет элемент с тем же id).
+
+    Аргументы:
+    store - хранилище элементов
+    element_id - идентификатор элемента
+    kind - вид элемента: duct, elbow, transition, tee или cross
+    params - аргументы функции расчета элемента
+
+    Возвращает:
+    добавленный элемент
+    """
+    if kind not in KERNELS:
+        raise ValueError(f"Неизвестный вид элемента: {kind}")
+    store[element_id] = {"kind": kind, "params": params}
+    return store[element_id]
+
+
+def main_flow(kind, params):
+    """
+    Возвращает главный расход элемента: flow для воздуховода, отвода и перехода,
+    суммарный расход flow_c для тройника и крестовины (если он не задан,
+    он считается как сумма остальных).
+
+    Аргументы:
+    kind - вид элемента
+    params - аргументы функции расчета элемента (числа или столбцы пакета)
+
+    Возвращает:
+    расход, м^3/ч (число для скалярных аргументов, иначе массив)
+    """
+    values = [params.get(name) for name in FLOW_PARAMS[kind]]
+    flows = as_columns(*values)
+    result = flows[0]
+    if len(flows) > 1:
+        result = np.where(np.isnan(result), np.nansum(flows[1:], axis=0), result)
+    if all(np.ndim(value) == 0 for value in values):
+        return float(result[0])
+    return result
+
+
+def scaled_params(kind, params, flow):
+    """
+    Возвращает аргументы элемента, в которых все заданные расходы пропорционально
+    пересчитаны так, чтобы главный расход был равен flow.
+    Для тройника и крестовины соотношение расходов по патрубкам сохраняется.
+
+    Аргументы:
+    kind - вид элемента
+    params - аргументы функции расчета элемента (числа или столбцы пакета)
+    flow - новый главный расход, м^3/ч (число или массив)
+
+    Возвращает:
+    новый словарь аргументов
+    """
+    factor = np.asarray(flow, dtype=float) / main_flow(kind, params)
+    result = dict(params)
+    for name in FLOW_PARAMS[kind]:
+        if params.get(name) is not None:
+            value = params[name]
+            result[name] = (value if np.ndim(value) == 0 else as_columns(value)[0]) * factor
+    return result
+
+
+def group_elements(kind, elements_params):
+    """
+    Разбивает список однотипных элементов на пакеты с одинаковыми thermophysics/calcversion
+    и собирает для каждого пакета столбцы аргументов.
+
+    Аргументы:
+    kind - вид элемента
+    elements_params - список словарей аргументов функции расчета
+
+    Возвращает:
+    список кортежей (аргументы на весь пакет, индексы элементов, столбцы аргументов)
+    """
+    groups = {}
+    for i, params in enumerate(elements_params):
+        key = tuple(params.get(name) for name in BATCH_PARAMS)
+        groups.setdefault(key, []).append(i)
+
+    result = []
+    for key, indices in groups.items():
+        names = sorted({name for i in indices for name in elements_params[i]} - set(BATCH_PARAMS))
+        columns = {
+            name: as_columns([elements_params[i].get(name) for i in indices])[0] for name in names
+        }
+        batch_params = {name: value for name, value in zip(BATCH_PARAMS, key) if value is not None}
+        if "calcversion" in batch_params and kind in ("duct", "tee", "cross"):
+            # У этих элементов расчет не зависит от версии
+            del batch_params["calcversion"]
+        result.append((batch_params, np.array(indices), columns))
+    return result
+
+
+def evaluate_elements(kind, elements_params, derivative=False, validate=False, intermediates=None):
+    """
+    Рассчитывает список однотипных элементов пакетной функцией.
+    Элементы с разными thermophysics/calcversion считаются отдельными пакетами,
+    результаты возвращаются в исходном порядке.
+
+    Аргументы:
+    kind - вид элемента
+    elements_params - список словарей аргументов функции расчета
+    derivative - рассчитывать ли производные по расходам
+    validate - если True, входные данные проверяются (engine.validation.validate()),
+        считаются только корректные строки, у некорректных результаты NaN
+    intermediates - имена промежуточных величин пакетной функции, которые нужно
+        вернуть вместе с результатом (например, ("Re", "lambda"))
+
+    Возвращает:
+    словарь массивов (ключи как у пакетной функции вида kind);
+    при validate=True дополнительно 'error' - коды ошибок строк (0 - ошибок нет)
+    """
+    result = {}
+    if validate:
+        result["error"] = np.zeros(len(elements_params), dtype=np.int64)
+    for batch_params, indices, columns in group_elements(kind, elements_params):
+        if validate:
+            errors = validation.validate(
+                kind, columns, batch_params.get("thermophysics", "idelchik")
+            )
+            result["error"][indices] = errors
+            valid = errors == 0
+            indices = indices[valid]
+            columns = {name: values[valid] for name, values in columns.items()}
+            if not indices.size:
+                continue
+        group_result = KERNELS[kind](
+            **columns, **batch_params, derivative=derivative, intermediates=intermediates
+        )
+        for name, values in group_result.items():
+            if name not in result:
+                result[name] = np.full(len(elements_params), np.nan)
+            result[name][indices] = values
+    return result
+
+
+def _collect(results, element_ids, values):
+    # Раскладка столбцов пакета по элементам: {id: {имя результата: число}};
+    # столбцы переводятся в списки целиком, а не по одному значению
+    names = list(values)
+    rows = zip(*(values[name].tolist() for name in names))
+    for element_id, row in zip(element_ids, rows):
+        results[element_id] = dict(zip(names, row))
+
+
+def evaluate_store(store, mode="exact", validate=False, coalesce=False, intermediates=None):
+    """
+    Рассчитывает все элементы хранилища, группируя их по видам в пакеты.
+
+    Аргументы:
+    store - хранилище элементов
+    mode - режим расчета:
+        "exact" - по полным формулам (пакетные функции calculations),
+        "characteristic" - по аппроксимирующим характеристикам dP = K·Q^n
+        (см. engine.characteristic.fit_store()); элементы без характеристики
+        считаются по полным формулам
+    validate - если True, входные данные проверяются, у некорректных элементов
+        результаты NaN, а код ошибки - в результате 'error' (см. engine.validation)
+    coalesce - если True, идущие подряд одинаковые воздуховоды считаются одним
+        элементом, а потери раскладываются обратно по длинам (см. engine.coalesce)
+    intermediates - промежуточные величины, которые нужно вернуть вместе с результатом:
+        словарь {вид элемента: имена величин}, например {"elbow": ("Re", "k_re")}
+        (при coalesce zeta объединенных воздуховодов раскладывается по длинам,
+        как потери, остальные величины от длины не зависят)
+
+    Возвращает:
+    словарь {id элемента: {имя результата: значение}}
+    """
+    if mode not in ("exact", "characteristic"):
+        raise ValueError(f"Неизвестный режим расчета: {mode}")
+
+    # Импорт здесь, т.к. модуль характеристик сам использует хранилище
+    from engine.characteristic import evaluate_characteristics
+
+    if coalesce:
+        coalesced, runs = coalesce_ducts(store)
+        results = split_results(
+            evaluate_store(coalesced, mode, validate, intermediates=intermediates), runs
+        )
+        return {element_id: results[element_id] for element_id in store}
+
+    results = {}
+    by_kind = {}
+    by_characteristic = {}
+    for element_id, element in store.items():
+        if mode == "characteristic" and "characteristic" in element:
+            # Характеристики одного вида с одинаковым количеством участков - один пакет
+            key = (element["kind"], len(element["characteristic"]["breakpoints"]))
+            by_characteristic.setdefault(key, []).append(element_id)
+        else:
+            by_kind.setdefault(element["kind"], []).append(element_id)
+
+    for (kind, _), element_ids in by_characteristic.items():
+        elements_params = [store[element_id]["params"] for element_id in element_ids]
+        flows = main_flow(
+            kind,
+            {
+                name: as_columns([params.get(name) for params in elements_params])[0]
+                for name in FLOW_PARAMS[kind]
+            },
+        )
+        values = evaluate_characteristics(
+            [store[element_id]["characteristic"] for element_id in element_ids], flows
+        )
+        _collect(results, element_ids, values)
+
+    for kind, element_ids in by_kind.items():
+        values = evaluate_elements(
+            kind,
+            [store[element_id]["params"] for element_id in element_ids],
+            validate=validate,
+            intermediates=(intermediates or {}).get(kind),
+        )
+        _collect(results, element_ids, values)
+
+    return {element_id: results[element_id] for element_id in store}
@@ -0,0 +1,38 @@
+import itertools
+from engine.project import element_spec
+from engine.store import add_element, create_store, evaluate_store
+
+
+def stream_results(elements, chunk_size=10000, **options):
+    """
+    Потоковый расчет: элементы читаются из итератора частями по chunk_size,
+    каждая часть считается пакетными функциями (engine.store.evaluate_store()),
+    результаты выдаются по одному в порядке входа. В памяти одновременно находится
+    не больше одной части, поэтому длина входа не ограничена.
+
+    Аргументы:
+    elements - итерируемый объект описаний элементов: кортежей (id, kind, params)
+        или словарей {"id": ..., "kind": ..., аргументы} (см. engine.project.element_spec())
+    chunk_size - количество элементов в одной части
+    options - аргументы evaluate_store() (mode, validate, coalesce)
+
+    Возвращает:
+    генератор кортежей (id элемента, {имя результата: значение})
+
+    Исключения:
+    ValueError, если chunk_size не положительный (при первом обращении к генератору)
+    """
+    if chunk_size <= 0:
+        raise ValueError("Размер части должен быть положительным")
+    elements = iter(elements)
+    while True:
+        chunk = [element_spec(spec) for spec in itertools.islice(elements, chunk_size)]
+        if not chunk:
+            return
+        # Ключи хранилища - номера в части, чтобы повторяющиеся id не смешивались
+        store = create_store()
+        for position, (_, kind, params) in enumerate(chunk):
+            add_element(store, position, kind, **params)
+        results = evaluate_store(store, **options)
+        for position, (element_id, _, _) in enumerate(chunk):
+            yield element_id, results[position]
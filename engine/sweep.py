@@ -0,0 +1,174 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from engine.checkpoint import chunk_path, mark_completed, open_checkpoint, write_atomic
+from engine.statistics import update_groups
+from engine.store import KERNELS
+from physics import vectorized
+
+# Что можно считать на сетке: свойства воздуха (аргумент t) и потери в элементах
+SWEEP_TARGETS = {
+    "density_mendeleev": vectorized.density_mendeleev,
+    "density_thermo": vectorized.density_thermo,
+    "kinematic_viscosity_idelchik": vectorized.kinematic_viscosity_idelchik,
+    "kinematic_viscosity_thermo": vectorized.kinematic_viscosity_thermo,
+    **KERNELS,
+}
+
+# Файлы, от которых зависят результаты расчета (версия кода для ключа кэша)
+CODE_FILES = ("./calculations/*.py", "./physics/*.py", "./data/*.csv")
+
+CACHE_DIRECTORY = "./.cache/sweep"
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """
+    Возвращает версию расчетного кода - хэш содержимого модулей calculations, physics
+    и файлов данных. Любое изменение формул или данных меняет версию, и кэш
+    расчетов на сетке становится недействительным.
+    """
+    digest = hashlib.sha256()
+    for pattern in CODE_FILES:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, "rb") as file:
+                digest.update(path.encode() + file.read())
+    return digest.hexdigest()[:16]
+
+
+def _evaluate(target, columns, fixed):
+    values = SWEEP_TARGETS[target](**columns, **fixed)
+    if not isinstance(values, dict):
+        values = {"value": values}
+    return {name: np.asarray(value) for name, value in values.items()}
+
+
+def _save(path, values):
+    def write(temporary):
+        with open(temporary, "wb") as file:
+            np.savez(file, **values)
+
+    write_atomic(path, write)
+
+
+def _parts_directory(path):
+    return path[: -len(".npz")] + ".parts"
+
+
+def _evaluate_parts(target, columns, fixed, chunk_size, path):
+    # Расчет частями по chunk_size точек; при заданном пути кэша path части пишутся
+    # с контрольными точками в папку <path без .npz>.parts. Выдает результаты частей по порядку
+    size = len(next(iter(columns.values())))
+    parts, completed = None, set()
+    if path is not None:
+        parts = _parts_directory(path)
+        completed = open_checkpoint(
+            parts, {"cache": os.path.basename(path), "chunk_size": chunk_size}
+        )
+    for index, start in enumerate(range(0, size, chunk_size)):
+        if index in completed:
+            with np.load(chunk_path(parts, index, "npz")) as chunk:
+                yield {name: chunk[name] for name in chunk.files}
+            continue
+        chunk = {name: values[start : start + chunk_size] for name, values in columns.items()}
+        values = _evaluate(target, chunk, fixed)
+        if parts is not None:
+            _save(chunk_path(parts, index, "npz"), values)
+            mark_completed(parts, index)
+        yield values
+
+
+def sweep(
+    target,
+    grid,
+    linked=None,
+    cache_directory=CACHE_DIRECTORY,
+    chunk_size=None,
+    statistics=None,
+    **fixed,
+):
+    """
+    Векторизованный расчет свойства воздуха или потерь в элементе на сетке параметров.
+    Все точки сетки считаются одним вызовом пакетной функции (или частями, см. chunk_size).
+    Результат сохраняется на диск (.npz) с ключом из цели, сетки, постоянных аргументов
+    и версии кода (code_version()), повторный расчет той же сетки читается из кэша.
+
+    Аргументы:
+    target - имя из SWEEP_TARGETS: свойство воздуха (density_thermo и т.д., аргумент t)
+        или вид элемента (duct, elbow, transition, tee, cross)
+    grid - словарь {имя аргумента: одномерный массив значений}; сетка - все сочетания
+    linked - аргументы, пропорциональные аргументу сетки: {имя: (имя аргумента сетки,
+        множитель)}, например расход ответвления тройника {"flow_o": ("flow_c", 1 / 3)}
+    cache_directory - папка кэша (None - без кэша)
+    chunk_size - если задан (и кэш включен), точки сетки считаются частями по chunk_size
+        с контрольными точками (см. engine.checkpoint): прерванный расчет при повторном
+        вызове продолжается с первой неготовой части
+    statistics - словарь статистики групп (см. engine.statistics.update_groups()): если
+        задан, результаты каждой части добавляются в статистику группы target, а массивы
+        результатов на всей сетке не собираются и не записываются в кэш (части считаются
+        по chunk_size и без кэша; папка частей удаляется после расчета)
+    fixed - постоянные аргументы функции (числа или строки)
+
+    Возвращает:
+    словарь {имя результата: массив формы (len(значения 1), len(значения 2), ...)};
+    для свойств воздуха результат называется 'value'; со statistics - statistics
+    """
+    if target not in SWEEP_TARGETS:
+        raise ValueError(f"Неизвестная величина для расчета на сетке: {target}")
+    axes = {name: np.asarray(values) for name, values in grid.items()}
+
+    path = None
+    if cache_directory is not None:
+        key = json.dumps(
+            {
+                "target": target,
+                "grid": {name: values.tolist() for name, values in axes.items()},
+                "linked": linked,
+                "fixed": fixed,
+                "version": code_version(),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(key.encode()).hexdigest()[:24]
+        path = os.path.join(cache_directory, f"{target}-{digest}.npz")
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                result = {name: cached[name] for name in cached.files}
+            if statistics is None:
+                return result
+            update_groups(statistics, target, result)
+            return statistics
+
+    shape = tuple(len(values) for values in axes.values())
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+    columns = {name: values.ravel() for name, values in zip(axes, mesh)}
+    for name, (base, factor) in (linked or {}).items():
+        columns[name] = columns[base] * factor
+
+    if statistics is not None:
+        if chunk_size is None:
+            update_groups(statistics, target, _evaluate(target, columns, fixed))
+        else:
+            for values in _evaluate_parts(target, columns, fixed, chunk_size, path):
+                update_groups(statistics, target, values)
+            if path is not None:
+                shutil.rmtree(_parts_directory(path))
+        return statistics
+
+    if chunk_size is None or path is None:
+        values = _evaluate(target, columns, fixed)
+    else:
+        chunks = list(_evaluate_parts(target, columns, fixed, chunk_size, path))
+        values = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+    result = {name: np.asarray(value).reshape(shape) for name, value in values.items()}
+
+    if path is not None:
+        _save(path, result)
+        if chunk_size is not None:
+            shutil.rmtree(_parts_directory(path))
+    return result
@@ -0,0 +1,320 @@
+import argparse
+import bisect
+import collections
+import itertools
+import json
+import sys
+import numpy as np
+from engine.sizing import rectangular_catalog, round_catalog, select_rectangular, select_round
+
+# Вид системы -> flowtype тройников и крестовин
+SYSTEMS = {"supply": "diverge", "exhaust": "converge"}
+
+# Углы отводов и их вероятности
+ELBOW_ANGLES = (90, 60, 45, 30)
+ELBOW_ANGLE_WEIGHTS = (0.55, 0.15, 0.2, 0.1)
+
+# Углы ответвлений тройников и крестовин
+BRANCH_ANGLES = (90, 45)
+
+# Диапазон расходов концевых участков по умолчанию, м^3/ч
+TERMINAL_FLOW = (100.0, 1000.0)
+
+
+def _pick(rng, values, weights=None):
+    # Случайное значение из values с вероятностями weights (None - равновероятно);
+    # одно число генератора вместо rng.choice(), который для одного значения медленный
+    if weights is None:
+        return values[int(rng.random() * len(values))]
+    return values[bisect.bisect(list(itertools.accumulate(weights[:-1])), rng.random())]
+
+
+def _pieces(rng, elbow_share):
+    # Элементы участка между узлами: 1-3 воздуховода, после каждого - отвод
+    # с вероятностью elbow_share
+    pieces = []
+    for _ in range(rng.integers(1, 4)):
+        pieces.append("duct")
+        if rng.random() < elbow_share:
+            pieces.append("elbow")
+    return pieces
+
+
+def _topology(rng, elements, depth, branching, elbow_share, transition_share):
+    # Деревья участков: каждый участок (цепочка воздуховодов и отводов) заканчивается
+    # узлом - тройником (проход и одно ответвление) или крестовиной (проход и два
+    # ответвления) - или концевым участком. Деревья строятся в ширину, пока не
+    # набрано нужное количество элементов; затем начинается следующая система
+    average = 2 + 2 * elbow_share + transition_share
+    segments = []
+    count = 0
+    system = 0
+    while count < elements:
+        queue = collections.deque([(-1, None, 0)])
+        while queue:
+            parent, port, level = queue.popleft()
+            index = len(segments)
+            segment = {
+                "system": system,
+                "parent": parent,
+                "port": port,
+                "pieces": _pieces(rng, elbow_share),
+                # Сужение переходом после тройника, а не в самом тройнике - только на проходе
+                "transition": port == "p" and rng.random() < transition_share,
+                "children": [],
+            }
+            segments.append(segment)
+            count += len(segment["pieces"]) + segment["transition"]
+            if parent >= 0:
+                segments[parent]["children"].append(index)
+            sides = 2 if rng.random() < branching - 1 else 1
+            # Узел - если не достигнута глубина и хватит элементов на уже начатые участки
+            if level < depth and count + (len(queue) + sides + 2) * average <= elements:
+                count += 1
+                ports = ["o"] if sides == 1 else ["o1", "o2"]
+                queue.extend((index, child_port, level + 1) for child_port in ["p"] + ports)
+        system += 1
+    return segments, system
+
+
+def _sections(rng, segments, flows, round_share, max_velocity, temperature):
+    # Сечения участков: форма (круглая или прямоугольная) одна на магистраль - участок
+    # с его продолжениями по проходу; размер - наименьший стандартный по скорости
+    runs = np.empty(len(segments), dtype=np.int64)
+    count = 0
+    for index, segment in enumerate(segments):
+        if segment["port"] == "p":
+            runs[index] = runs[segment["parent"]]
+        else:
+            runs[index] = count
+            count += 1
+    is_round = (rng.random(count) < round_share)[runs]
+
+    diameter = np.full(len(segments), np.nan)
+    height = np.full(len(segments), np.nan)
+    width = np.full(len(segments), np.nan)
+    diameter[is_round] = select_round(flows[is_round], temperature, max_velocity)["diameter"]
+    rectangular = select_rectangular(flows[~is_round], temperature, max_velocity)
+    height[~is_round], width[~is_round] = rectangular["height"], rectangular["width"]
+    if np.any(np.isnan(np.where(is_round, diameter, height))):
+        raise ValueError(
+            "Расход участка больше, чем пропускает наибольшее сечение каталога: "
+            "уменьшите depth, terminal_flow (или не задавайте его) или увеличьте max_velocity"
+        )
+    return [
+        (None, None, float(d)) if r else (float(h), float(w), None)
+        for r, d, h, w in zip(is_round, diameter, height, width)
+    ]
+
+
+def _capacity(max_velocity):
+    # Наибольший расход, который пропускают и круглое, и прямоугольное сечение каталога, м^3/ч
+    round_area = np.pi * round_catalog()[-1] ** 2 / 4
+    catalog = rectangular_catalog()
+    rectangular_area = (catalog["height"] * catalog["width"]).max()
+    return min(round_area, rectangular_area) * max_velocity * 3600
+
+
+def _geometry(section, suffix=""):
+    # Аргументы сечения элемента: пара height/width или diameter (с суффиксом патрубка)
+    height, width, diameter = section
+    if diameter is not None:
+        return {f"diameter{suffix}": diameter}
+    return {f"height{suffix}": height, f"width{suffix}": width}
+
+
+def generate_network(
+    elements=1000,
+    depth=4,
+    branching=1.3,
+    system="supply",
+    elbow_share=0.5,
+    transition_share=0.3,
+    round_share=0.7,
+    terminal_flow=None,
+    max_velocity=6.0,
+    temperature=20.0,
+    seed=0,
+):
+    """
+    Создает синтетическую вентиляционную сеть для проверки масштабирования:
+    набор древовидных систем (приточных или вытяжных), каждая от вентилятора до
+    концевых участков. Участок сети - цепочка воздуховодов и отводов, заканчивающаяся
+    тройником или крестовиной, от которых отходят проход и ответвления. Расходы
+    концевых участков случайные, расходы остальных - сумма ниже по дереву; сечения
+    подбираются из каталога по скорости (engine.sizing), поэтому все элементы
+    проходят проверку входных данных (engine.validation). Генерация детерминирована:
+    при одинаковых аргументах сеть одинакова.
+
+    Аргументы:
+    elements - примерное количество элементов (систем столько, сколько нужно)
+    depth - наибольшее количество узлов на пути от вентилятора до концевого участка
+    branching - среднее количество ответвлений в узле, от 1 (только тройники)
+        до 2 (только крестовины)
+    system - "supply" (приток, flowtype="diverge") или "exhaust" (вытяжка, "converge")
+    elbow_share - вероятность отвода после каждого воздуховода
+    transition_share - доля проходов, где сечение уменьшается переходом после узла,
+        а не в самом узле
+    round_share - доля магистралей и ответвлений круглого сечения
+    terminal_flow - диапазон расходов концевых участков, м^3/ч; None - TERMINAL_FLOW,
+        а если расход в начале системы больше, чем пропускает наибольшее сечение
+        каталога (глубокие деревья), расходы этой системы уменьшаются в одно и то же
+        число раз; заданный диапазон не изменяется (при переполнении каталога -
+        ValueError)
+    max_velocity - предельная скорость для подбора сечений, м/с
+    temperature - температура воздуха, °C
+    seed - начальное значение генератора случайных чисел
+
+    Возвращает:
+    словарь:
+    'elements' - список элементов [{"id": ..., "kind": ..., аргументы}] в порядке
+        от вентиляторов (формат файла сети, см. engine.project.load_project()),
+    'links' - {id элемента: [id элемента выше по дереву (ближе к вентилятору)
+        или None, патрубок узла "p", "o", "o1", "o2" или None]},
+    'systems' - количество систем
+    """
+    if system not in SYSTEMS:
+        raise ValueError(f"Неизвестный вид системы: {system}")
+    if not 1 <= branching <= 2:
+        raise ValueError("branching должен быть от 1 до 2")
+    for share in (elbow_share, transition_share, round_share):
+        if not 0 <= share <= 1:
+            raise ValueError("Доли элементов должны быть от 0 до 1")
+    rng = np.random.default_rng(seed)
+    segments, systems = _topology(rng, elements, depth, branching, elbow_share, transition_share)
+
+    # Расходы: концевые - случайные, остальные - сумма по дочерним участкам
+    flows = np.where(
+        [not segment["children"] for segment in segments],
+        rng.uniform(*(terminal_flow or TERMINAL_FLOW), len(segments)),
+        0.0,
+    )
+    for index in range(len(segments) - 1, 0, -1):
+        parent = segments[index]["parent"]
+        if parent >= 0:
+            flows[parent] += flows[index]
+    if terminal_flow is None:
+        # Расход в начале системы (наибольший в ней) должно пропускать сечение каталога:
+        # расходы переполненной системы уменьшаются в одно и то же число раз
+        system_of = np.array([segment["system"] for segment in segments])
+        roots = np.array([segment["parent"] < 0 for segment in segments])
+        scale = np.minimum(_capacity(max_velocity) / flows[roots], 1.0)
+        flows *= scale[system_of]
+    sections = _sections(rng, segments, flows, round_share, max_velocity, temperature)
+    flows = flows.tolist()
+
+    def start_section(index):
+        # Сечение в начале участка: при сужении переходом - сечение узла выше по дереву
+        segment = segments[index]
+        if segment["transition"] and sections[index] != sections[segment["parent"]]:
+            return sections[segment["parent"]]
+        return sections[index]
+
+    result = []
+    links = {}
+    junctions = {}
+
+    def add(kind, params, upstream, port=None):
+        element_id = f"E{len(result)}"
+        result.append({"id": element_id, "kind": kind, **params, "temperature": temperature})
+        links[element_id] = [upstream, port]
+        return element_id
+
+    for index, segment in enumerate(segments):
+        flow = flows[index]
+        section = sections[index]
+        upstream, port = junctions.get(segment["parent"]), segment["port"]
+        if start_section(index) != section:
+            # Переход от сечения узла к сечению участка (по ходу среды)
+            first, second = start_section(index), section
+            if system == "exhaust":
+                first, second = second, first
+            params = {"flow": flow, "length": round(float(rng.uniform(0.2, 0.5)), 3)}
+            params.update(_geometry(first, "1"), **_geometry(second, "2"))
+            upstream, port = add("transition", params, upstream, port), None
+        for piece in segment["pieces"]:
+            params = {"flow": flow, **_geometry(section)}
+            if piece == "duct":
+                params["length"] = round(float(rng.uniform(1, 6)), 2)
+            else:
+                height, width, diameter = section
+                oriented = None if diameter is not None else _pick(rng, ("horiz", "vert"))
+                side = diameter or (width if oriented == "horiz" else height)
+                params["angle"] = _pick(rng, ELBOW_ANGLES, ELBOW_ANGLE_WEIGHTS)
+                params["r0"] = round(float(rng.uniform(0.5, 2)) * side, 3)
+                if oriented is not None:
+                    params["oriented"] = oriented
+            upstream, port = add(piece, params, upstream, port), None
+
+        if segment["children"]:
+            # Узел: тройник (проход и ответвление) или крестовина (проход и два ответвления)
+            params = {"flowtype": SYSTEMS[system], **_geometry(section, "_c")}
+            for child in segment["children"]:
+                child_port = segments[child]["port"]
+                params[f"flow_{child_port}"] = flows[child]
+                params.update(_geometry(start_section(child), f"_{child_port}"))
+            angles = [_pick(rng, BRANCH_ANGLES) for _ in segment["children"]]
+            if len(segment["children"]) == 2:
+                kind, params["angle"] = "tee", angles[0]
+            else:
+                kind, params["angle_o1"], params["angle_o2"] = "cross", angles[0], angles[1]
+            junctions[index] = add(kind, params, upstream)
+
+    return {"elements": result, "links": links, "systems": systems}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.synthetic",
+        description="Синтетическая вентиляционная сеть для проверки масштабирования",
+    )
+    parser.add_argument("output", help="файл сети .json")
+    parser.add_argument("-n", "--elements", type=int, default=1000, help="количество элементов")
+    parser.add_argument("--depth", type=int, default=4, help="наибольшая глубина дерева")
+    parser.add_argument("--branching", type=float, default=1.3, help="ответвлений в узле (1-2)")
+    parser.add_argument("--system", choices=list(SYSTEMS), default="supply")
+    parser.add_argument("--elbow-share", type=float, default=0.5)
+    parser.add_argument("--transition-share", type=float, default=0.3)
+    parser.add_argument("--round-share", type=float, default=0.7)
+    parser.add_argument(
+        "--terminal-flow",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=None,
+        help="диапазон расходов концевых участков, м^3/ч (по умолчанию 100-1000 "
+        "с уменьшением для глубоких деревьев)",
+    )
+    parser.add_argument("--max-velocity", type=float, default=6.0, help="м/с")
+    parser.add_argument("--temperature", type=float, default=20.0, help="°C")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки: python -m engine.synthetic сеть.json -n 100000
+    (файл читается engine.project.load_project() и python -m engine.cli)
+    """
+    args = parse_args(argv)
+    network = generate_network(
+        args.elements,
+        args.depth,
+        args.branching,
+        args.system,
+        args.elbow_share,
+        args.transition_share,
+        args.round_share,
+        args.terminal_flow,
+        args.max_velocity,
+        args.temperature,
+        args.seed,
+    )
+    with open(args.output, "w", encoding="utf-8") as jsonfile:
+        json.dump(network, jsonfile, ensure_ascii=False)
+    print(f"{args.output}: элементов {len(network['elements'])}, систем {network['systems']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
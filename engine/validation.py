@@ -0,0 +1,157 @@
+import numpy as np
+from physics.vectorized import as_columns, idelchik_temperature_valid
+
+# Коды ошибок входных данных пакетного расчета. Коды - битовые флаги,
+# у одной строки может быть несколько ошибок сразу (код - их сумма)
+GEOMETRY_BOTH = 1
+GEOMETRY_MISSING = 2
+GEOMETRY_INVALID = 4
+ORIENTATION_INVALID = 8
+FLOWS_INVALID = 16
+FLOWTYPE_INVALID = 32
+ANGLE_INVALID = 64
+TEMPERATURE_OUT_OF_RANGE = 128
+PARAMETER_INVALID = 256
+
+ERROR_MESSAGES = {
+    GEOMETRY_BOTH: "Необходимо указать одно из двух: пару height/width или diameter.",
+    GEOMETRY_MISSING: "Не указана ни пара height/width, ни diameter.",
+    GEOMETRY_INVALID: "Неправильно указаны геометрические характеристики",
+    ORIENTATION_INVALID: "Неправильно указана ориентация отвода",
+    FLOWS_INVALID: "Расходы заданы не верно",
+    FLOWTYPE_INVALID: "flowtype должен быть одним из двух допустимых значений: converge или diverge.",
+    ANGLE_INVALID: "Нужно задавать углы",
+    TEMPERATURE_OUT_OF_RANGE: "Значение температуры слишком далеко от данных",
+    PARAMETER_INVALID: "Неправильно задан расход, длина или радиус",
+}
+
+# Габариты сечений каждого вида элемента: (height, width, diameter)
+SECTIONS = {
+    "duct": [("height", "width", "diameter")],
+    "elbow": [("height", "width", "diameter")],
+    "transition": [("height1", "width1", "diameter1"), ("height2", "width2", "diameter2")],
+    "tee": [("height_" + x, "width_" + x, "diameter_" + x) for x in ("c", "o", "p")],
+    "cross": [("height_" + x, "width_" + x, "diameter_" + x) for x in ("c", "o1", "o2", "p")],
+}
+
+# Параметры, которые должны быть заданы и положительны
+POSITIVE_PARAMS = {
+    "duct": ("flow", "length"),
+    "elbow": ("flow", "r0", "angle"),
+    "transition": ("flow", "length"),
+    "tee": (),
+    "cross": (),
+}
+
+
+def _labels(values, size):
+    # Строковый столбец (flowtype, oriented); незаданные значения - "None" или "nan"
+    if values is None:
+        return np.full(size, "None")
+    return np.broadcast_to(np.asarray(values).astype(str), (size,))
+
+
+def _positive(values):
+    # Задано и больше нуля (как проверка «if value» в скалярных функциях)
+    with np.errstate(invalid="ignore"):
+        return values > 0
+
+
+def validate(kind, columns, thermophysics="idelchik"):
+    """
+    Векторизованная проверка входных данных пакетного расчета - аналог проверок assert
+    в скалярных функциях, но без остановки расчета: для каждой строки возвращается
+    код ошибки. Выполняется один раз на пакет.
+
+    Аргументы:
+    kind - вид элемента: duct, elbow, transition, tee или cross
+    columns - аргументы пакетной функции (столбцы или числа), кроме thermophysics/calcversion
+    thermophysics - модель термофизических свойств (для idelchik проверяется
+        предел экстраполяции вязкости по температуре)
+
+    Возвращает:
+    массив кодов ошибок (int), 0 - строка корректна
+    """
+    size = len(as_columns(*columns.values())[0]) if columns else 0
+
+    def column(name):
+        return as_columns(columns.get(name), np.empty(size))[0]
+
+    errors = np.zeros(size, dtype=np.int64)
+
+    for height_name, width_name, diameter_name in SECTIONS[kind]:
+        height, width, diameter = column(height_name), column(width_name), column(diameter_name)
+        rectangular = _positive(height) & _positive(width)
+        given = ~np.isnan(height) | ~np.isnan(width)
+        errors |= np.where(given & ~np.isnan(diameter), GEOMETRY_BOTH, 0)
+        errors |= np.where(
+            (np.isnan(height) | np.isnan(width)) & np.isnan(diameter), GEOMETRY_MISSING, 0
+        )
+        errors |= np.where(~rectangular & ~_positive(diameter), GEOMETRY_INVALID, 0)
+
+    for name in POSITIVE_PARAMS[kind]:
+        errors |= np.where(_positive(column(name)), 0, PARAMETER_INVALID)
+
+    if kind == "elbow":
+        oriented = _labels(columns.get("oriented"), size)
+        oriented_missing = np.isin(oriented, ["None", "nan"])
+        valid = np.isin(oriented, ["horiz", "vert"]) | (
+            oriented_missing & ~np.isnan(column("diameter"))
+        )
+        errors |= np.where(valid, 0, ORIENTATION_INVALID)
+
+    if kind in ("tee", "cross"):
+        flowtype = _labels(columns.get("flowtype"), size)
+        errors |= np.where(np.isin(flowtype, ["converge", "diverge"]), 0, FLOWTYPE_INVALID)
+
+        branches = ["o", "p"] if kind == "tee" else ["o1", "o2", "p"]
+        flows = {name: column("flow_" + name) for name in ["c"] + branches}
+        given = sum(_positive(value).astype(int) for value in flows.values())
+        # Недостающий расход по балансу тоже должен быть положительным
+        missing = flows["c"] - np.nansum([flows[name] for name in branches], axis=0)
+        missing = np.where(np.isnan(flows["c"]), 1, missing)
+        errors |= np.where((given == len(flows) - 1) & (missing > 0), 0, FLOWS_INVALID)
+
+        angles = ["angle"] if kind == "tee" else ["angle_o1", "angle_o2"]
+        for name in angles:
+            errors |= np.where(_positive(column(name)), 0, ANGLE_INVALID)
+
+    if thermophysics == "idelchik":
+        temperature_valid = idelchik_temperature_valid(column("temperature"))
+        errors |= np.where(temperature_valid, 0, TEMPERATURE_OUT_OF_RANGE)
+    else:
+        errors |= np.where(np.isnan(column("temperature")), PARAMETER_INVALID, 0)
+
+    return errors
+
+
+def error_messages(code):
+    """
+    Расшифровывает код ошибки из validate().
+
+    Аргументы:
+    code - код ошибки строки
+
+    Возвращает:
+    список сообщений (пустой, если ошибок нет)
+    """
+    return [message for flag, message in ERROR_MESSAGES.items() if int(code) & flag]
+
+
+def error_summary(errors):
+    """
+    Сводка ошибок пакета: сколько строк содержит каждую ошибку.
+
+    Аргументы:
+    errors - массив кодов ошибок из validate()
+
+    Возвращает:
+    словарь {сообщение: количество строк}; пустой, если ошибок нет
+    """
+    errors = np.asarray(errors)
+    summary = {}
+    for flag, message in ERROR_MESSAGES.items():
+        count = int(np.count_nonzero(errors & flag))
+        if count:
+            summary[message] = count
+    return summary
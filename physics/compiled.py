@@ -0,0 +1,319 @@
+import math
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    # numba не установлен: пакетные функции считают по NumPy
+    numba = None
+
+# Доступен ли ускоренный расчет скомпилированными циклами
+AVAILABLE = numba is not None
+
+
+def _compile(function):
+    # error_model="numpy": деление на ноль и некорректные аргументы дают inf/NaN,
+    # как в NumPy, а не исключение; скомпилированный код кэшируется на диске
+    if numba is None:
+        return function
+    return numba.njit(error_model="numpy", cache=True)(function)
+
+
+def enabled(jit, dtype, out=None, intermediates=None):
+    """
+    Проверяет, можно ли выполнить пакетный расчет скомпилированным циклом.
+    Цикл считает только потери (и производную) в float64; запись в out,
+    промежуточные величины и компактный режим float32 считаются по NumPy.
+
+    Аргументы:
+    jit - запрошен ли ускоренный расчет
+    dtype - тип чисел расчета (numpy.dtype)
+    out - словарь массивов для записи результатов или None
+    intermediates - имена промежуточных величин или None
+
+    Возвращает:
+    True, если расчет выполняется скомпилированным циклом
+    """
+    return bool(jit) and AVAILABLE and dtype == np.float64 and out is None and not intermediates
+
+
+@_compile
+def _section(height, width, diameter):
+    # Гидравлический диаметр и площадь сечения; если диаметр не задан (NaN),
+    # сечение прямоугольное
+    if math.isnan(diameter):
+        return 2 * height * width / (height + width), height * width
+    return diameter, math.pi * diameter**2 / 4
+
+
+@_compile
+def _friction(re, d_hyd, roughness, dre, derivative):
+    # Коэффициент сопротивления трения и его производная по расходу (через Re)
+    base = roughness / d_hyd + 68 / re
+    lmbd = 0.11 * base**0.25
+    if not derivative:
+        return lmbd, 0.0
+    return lmbd, -0.11 * 0.25 * 68 / re**2 * base**-0.75 * dre
+
+
+@_compile
+def _minimum(a, b):
+    # Наименьшее из двух, NaN сохраняется (как numpy.minimum)
+    if math.isnan(a) or math.isnan(b):
+        return math.nan
+    return a if a < b else b
+
+
+@_compile
+def _duct_loop(flow, length, height, width, diameter, roughness, nu, rho, derivative, dP, ddP):
+    for i in range(flow.size):
+        d_hyd, area = _section(height[i], width[i], diameter[i])
+        dv = 1 / 3600 / area
+        v = flow[i] * dv
+        re = v * d_hyd / nu[i]
+        lmbd, dlmbd = _friction(re, d_hyd, roughness[i], d_hyd / nu[i] * dv, derivative)
+        p_dyn = 0.5 * rho[i] * v**2
+        dP[i] = p_dyn * lmbd * length[i] / d_hyd
+        if derivative:
+            ddP[i] = (dlmbd * p_dyn + lmbd * rho[i] * v * dv) * length[i] / d_hyd
+
+
+@_compile
+def _elbow_loop(
+    flow,
+    angle,
+    r0,
+    horiz,
+    height,
+    width,
+    diameter,
+    roughness,
+    nu,
+    rho,
+    version22,
+    derivative,
+    dP,
+    ddP,
+):
+    for i in range(flow.size):
+        d_hyd, area = _section(height[i], width[i], diameter[i])
+        dv = 1 / 3600 / area
+        v = flow[i] * dv
+        re = v * d_hyd / nu[i]
+        dre = d_hyd / nu[i] * dv
+        lmbd, dlmbd = _friction(re, d_hyd, roughness[i], dre, derivative)
+        p_dyn = 0.5 * rho[i] * v**2
+
+        is_round = not math.isnan(diameter[i])
+        if is_round:
+            r0b0 = r0[i] / diameter[i]
+        else:
+            r0b0 = r0[i] / width[i] if horiz[i] else r0[i] / height[i]
+        a0b0 = height[i] / width[i] if horiz[i] else width[i] / height[i]
+
+        if version22:
+            k_delta = 1.0
+            k_re = 1.0
+            dk_re = 0.0
+        else:
+            k_delta = 1.0 if re < 40000 else (1.5 if r0b0 <= 0.55 else 2.0)
+            k_re = 1.3 - 0.29 * np.log(re * 1e-5)
+            dk_re = -0.29 * dre / re
+
+        if angle[i] < 70:
+            A1 = 0.9 * math.sin(math.radians(angle[i]))
+        elif angle[i] > 100:
+            A1 = 0.7 + 0.35 * angle[i] / 90
+        else:
+            A1 = 1.0
+        B1 = 0.21 * (r0b0**-2.5 if r0b0 <= 1 else r0b0**-0.5)
+        if is_round:
+            C1 = 1.0
+        elif height[i] / width[i] <= 4:
+            C1 = 0.85 + 0.125 / a0b0
+        else:
+            C1 = 1.115 - 0.84 / a0b0
+
+        dzeta_local = A1 * B1 * C1
+        dzeta = k_delta * k_re * dzeta_local + 0.0175 * angle[i] * lmbd * r0[i] / d_hyd
+        dP[i] = dzeta * p_dyn
+        if derivative:
+            ddzeta = k_delta * dk_re * dzeta_local + 0.0175 * angle[i] * dlmbd * r0[i] / d_hyd
+            ddP[i] = ddzeta * p_dyn + dzeta * rho[i] * v * dv
+
+
+@_compile
+def _transition_loop(
+    flow,
+    diameter1,
+    height1,
+    width1,
+    diameter2,
+    height2,
+    width2,
+    length,
+    roughness,
+    nu,
+    rho,
+    version22,
+    derivative,
+    dP,
+    ddP,
+):
+    for i in range(flow.size):
+        # Наибольшая дельта между заданными габаритами сечений (незаданные - NaN - пропускаются)
+        delta = 0.0
+        for dim1 in (height1[i], width1[i], diameter1[i]):
+            for dim2 in (height2[i], width2[i], diameter2[i]):
+                current = abs(dim2 - dim1)
+                if current > delta:
+                    delta = current
+        alfa05 = math.atan(delta / 2 / length[i])
+
+        d_hyd1, s1 = _section(height1[i], width1[i], diameter1[i])
+        d_hyd2, s2 = _section(height2[i], width2[i], diameter2[i])
+        n_ratio = s1 / s2 if s1 > s2 else s2 / s1
+
+        if s2 >= s1:
+            dzeta_transition = 3.2 * math.tan(alfa05) ** 1.25 * (1 - 1 / n_ratio) ** 2
+        elif version22:
+            dzeta_transition = 0.0
+        else:
+            alpha = alfa05 * 2
+            dzeta_transition = (
+                -0.0125 * n_ratio**4
+                + 0.0224 * n_ratio**3
+                - 0.00723 * n_ratio**2
+                + 0.00444 * n_ratio
+                - 0.00745
+            ) * (alpha**3 + 2 * math.pi * alpha**2 - 10 * alpha)
+
+        d_hyd = _minimum(d_hyd1, d_hyd2)
+        dv = 1 / 3600 / (s2 if version22 else s1)
+        v = flow[i] * dv
+        re = v * d_hyd / nu[i]
+        lmbd, dlmbd = _friction(re, d_hyd, roughness[i], d_hyd / nu[i] * dv, derivative)
+        friction_geometry = (1 - 1 / n_ratio**2) / (8 * math.sin(alfa05))
+        dzeta = lmbd * friction_geometry + dzeta_transition
+        p_dyn = 0.5 * rho[i] * v**2
+        dP[i] = dzeta * p_dyn
+        if derivative:
+            ddP[i] = dlmbd * friction_geometry * p_dyn + dzeta * rho[i] * v * dv
+
+
+def _result(size, derivative):
+    # Массивы результатов: потери и производная (при derivative=False - пустой массив-заглушка)
+    return np.empty(size), np.empty(size if derivative else 0)
+
+
+def _pack(dP, ddP, derivative):
+    return {"dP": dP, "ddP_dflow": ddP} if derivative else {"dP": dP}
+
+
+def duct_losses(flow, length, height, width, diameter, roughness, nu, rho, derivative=False):
+    """
+    Потери давления в воздуховодах одним скомпилированным циклом: гидравлический
+    диаметр, скорость, Re, λ, динамическое давление и потери считаются для каждой
+    строки без промежуточных массивов. Формулы как в calculations.duct.duct_batch().
+
+    Аргументы:
+    столбцы float64 одинаковой длины (см. duct_batch()), плюс
+    nu - кинематическая вязкость, м^2/с
+    rho - плотность, кг/м^3
+    derivative - рассчитывать ли производную потерь по расходу
+
+    Возвращает:
+    словарь массивов 'dP' и (при derivative=True) 'ddP_dflow'
+    """
+    dP, ddP = _result(flow.size, derivative)
+    _duct_loop(flow, length, height, width, diameter, roughness, nu, rho, derivative, dP, ddP)
+    return _pack(dP, ddP, derivative)
+
+
+def elbow_losses(
+    flow, angle, r0, horiz, height, width, diameter, roughness, nu, rho, calcversion, derivative
+):
+    """
+    Потери давления в отводах одним скомпилированным циклом (см. duct_losses()),
+    включая коэффициенты k_delta, k_re, A1, B1, C1.
+    Формулы как в calculations.elbow.elbow_batch().
+
+    Аргументы:
+    столбцы float64 одинаковой длины (см. elbow_batch()), плюс
+    horiz - массив bool, True - горизонтальный поворот (oriented="horiz")
+    nu - кинематическая вязкость, м^2/с
+    rho - плотность, кг/м^3
+    calcversion - версия расчета ("22" или None)
+    derivative - рассчитывать ли производную потерь по расходу
+
+    Возвращает:
+    словарь массивов 'dP' и (при derivative=True) 'ddP_dflow'
+    """
+    dP, ddP = _result(flow.size, derivative)
+    _elbow_loop(
+        flow,
+        angle,
+        r0,
+        horiz,
+        height,
+        width,
+        diameter,
+        roughness,
+        nu,
+        rho,
+        calcversion == "22",
+        derivative,
+        dP,
+        ddP,
+    )
+    return _pack(dP, ddP, derivative)
+
+
+def transition_losses(
+    flow,
+    diameter1,
+    height1,
+    width1,
+    diameter2,
+    height2,
+    width2,
+    length,
+    roughness,
+    nu,
+    rho,
+    calcversion,
+    derivative,
+):
+    """
+    Потери давления в переходах одним скомпилированным циклом (см. duct_losses()).
+    Формулы как в calculations.transition.transition_batch().
+
+    Аргументы:
+    столбцы float64 одинаковой длины (см. transition_batch()), плюс
+    nu - кинематическая вязкость, м^2/с
+    rho - плотность, кг/м^3
+    calcversion - версия расчета ("22" или None)
+    derivative - рассчитывать ли производную потерь по расходу
+
+    Возвращает:
+    словарь массивов 'dP' и (при derivative=True) 'ddP_dflow'
+    """
+    dP, ddP = _result(flow.size, derivative)
+    _transition_loop(
+        flow,
+        diameter1,
+        height1,
+        width1,
+        diameter2,
+        height2,
+        width2,
+        length,
+        roughness,
+        nu,
+        rho,
+        calcversion == "22",
+        derivative,
+        dP,
+        ddP,
+    )
+    return _pack(dP, ddP, derivative)
@@ -34,6 +34,30 @@ def friction_factor(reynolds_number, hydraulic_diameter, roughness):
     return result
 
 
+def friction_factor_derivative(reynolds_number, hydraulic_diameter, roughness):
+    """
+    Рассчитывает производную коэффициента сопротивления трения (friction_factor())
+    по критерию Рейнольдса.
+
+    Аргументы:
+    reynolds_number - критерий Рейнольдса
+    hydraulic_diameter - гидравлический диаметр, м
+    roughness - абсолютная эквивалентная шероховатость поверхности воздуховода, мм
+
+    Возвращает:
+    d(lambda)/d(Re)
+    """
+    result = (
+        -0.11
+        * 0.25
+        * 68
+        / reynolds_number**2
+        * (roughness / hydraulic_diameter + 68 / reynolds_number) ** -0.75
+    )
+    print(f"Производная коэффициента трения по Re: {result:.3e}")
+    return result
+
+
 # Функция для расчета динамического давления
 def dynamic_pressure(density, velocity):
     """
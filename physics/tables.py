@@ -0,0 +1,116 @@
+import csv
+import functools
+import itertools
+import numpy as np
+
+# Реестр таблиц коэффициентов: имя -> путь к файлу и имена осей (столбцов аргументов).
+# Остальные столбцы файла - значения. Для двух осей файл содержит полную сетку:
+# строка на каждое сочетание значений осей. Таблицы добавляются register_table()
+TABLES = {}
+
+
+def register_table(name, path, axes):
+    """
+    Добавляет таблицу коэффициентов в реестр (или заменяет таблицу с тем же именем).
+
+    Аргументы:
+    name - имя таблицы
+    path - путь к файлу csv
+    axes - имена столбцов-аргументов (одна или две оси)
+    """
+    TABLES[name] = {"path": path, "axes": tuple(axes)}
+    load_table.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(name):
+    """
+    Загружает таблицу коэффициентов из реестра в массивы. Таблица читается
+    с диска один раз, дальше используется загруженная копия.
+
+    Аргументы:
+    name - имя таблицы в реестре TABLES
+
+    Возвращает:
+    словарь: 'axes' - список отсортированных значений по каждой оси,
+    'values' - {имя столбца: массив значений на сетке осей}
+    """
+    if name not in TABLES:
+        raise ValueError(f"Неизвестная таблица коэффициентов: {name}")
+    axes_names = TABLES[name]["axes"]
+    with open(TABLES[name]["path"], newline="") as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    columns = {key: np.array([float(row[key]) for row in rows]) for key in rows[0]}
+
+    axes = [np.unique(columns[axis]) for axis in axes_names]
+    shape = tuple(len(axis) for axis in axes)
+    if len(rows) != np.prod(shape):
+        raise ValueError(f"Таблица {name} не является полной сеткой по осям {axes_names}")
+    # Строки могут идти в любом порядке: раскладываем значения по индексам осей
+    index = tuple(
+        np.searchsorted(axis, columns[axis_name]) for axis, axis_name in zip(axes, axes_names)
+    )
+    values = {}
+    for key in columns:
+        if key not in axes_names:
+            values[key] = np.empty(shape)
+            values[key][index] = columns[key]
+    return {"axes": axes, "values": values}
+
+
+def interpolate(name, column, *queries):
+    """
+    Линейная (для одной оси) или билинейная (для двух осей) интерполяция
+    по таблице коэффициентов для массивов запросов.
+    Разрыв функции задается двумя узлами с близкими значениями аргумента.
+
+    Аргументы:
+    name - имя таблицы в реестре TABLES
+    column - имя столбца значений
+    queries - значения аргументов, по одному на каждую ось (числа или массивы)
+
+    Возвращает:
+    массив значений; вне диапазона таблицы - NaN
+    """
+    table = load_table(name)
+    return interpolate_grid(table["axes"], table["values"][column], *queries)
+
+
+def interpolate_grid(axes, values, *queries):
+    """
+    Полилинейная интерполяция значений, заданных на прямоугольной сетке,
+    для массивов запросов.
+
+    Аргументы:
+    axes - список возрастающих значений по каждой оси (не менее двух на ось)
+    values - массив значений формы (len(axes[0]), len(axes[1]), ...)
+    queries - значения аргументов, по одному на каждую ось (числа или массивы)
+
+    Возвращает:
+    массив значений (float32, если все запросы float32, иначе float64);
+    вне диапазона сетки - NaN
+    """
+    dtype = np.result_type(*[np.asarray(query) for query in queries], np.float32)
+    if len(axes) == 1:
+        # Одна ось - np.interp (в C, без промежуточных массивов индексов и весов)
+        query = np.asarray(queries[0], dtype=float)
+        result = np.interp(query, axes[0], values, left=np.nan, right=np.nan)
+        return np.asarray(result).astype(dtype, copy=False)
+    queries = np.broadcast_arrays(*[np.asarray(query, dtype=float) for query in queries])
+
+    indices, weights = [], []
+    outside = np.zeros(queries[0].shape, dtype=bool)
+    for axis, query in zip(axes, queries):
+        with np.errstate(invalid="ignore"):
+            outside |= ~((query >= axis[0]) & (query <= axis[-1]))
+        i = np.clip(np.searchsorted(axis, query, side="right") - 1, 0, len(axis) - 2)
+        indices.append(i)
+        weights.append((query - axis[i]) / (axis[i + 1] - axis[i]))
+
+    result = np.zeros(queries[0].shape)
+    for corner in itertools.product((0, 1), repeat=len(axes)):
+        weight = np.ones(queries[0].shape)
+        for shift, t in zip(corner, weights):
+            weight = weight * (t if shift else 1 - t)
+        result += weight * values[tuple(i + shift for i, shift in zip(indices, corner))]
+    return np.where(outside, np.nan, result).astype(dtype, copy=False)
@@ -0,0 +1,330 @@
+import csv
+import functools
+import numpy as np
+from thermo.chemical import Mixture
+
+
+# Типы чисел пакетного расчета: float64 (по умолчанию) и компактный float32
+DTYPES = ("float64", "float32")
+
+
+def float_dtype(dtype):
+    """
+    Проверяет тип чисел пакетного расчета и возвращает его как numpy.dtype.
+
+    Аргументы:
+    dtype - "float64" или "float32" (или соответствующий тип numpy)
+    """
+    dtype = np.dtype(dtype)
+    if dtype.name not in DTYPES:
+        raise ValueError(f"Неподдерживаемый тип чисел пакетного расчета: {dtype.name}")
+    return dtype
+
+
+def as_columns(*values, dtype=float):
+    """
+    Приводит аргументы пакетного расчета к массивам numpy одинаковой длины.
+    Скаляры растягиваются на весь пакет, None превращается в NaN
+    (т.е. «параметр не задан»). Нечисловые аргументы (flowtype, oriented)
+    остаются массивами строк.
+
+    Аргументы:
+    values - скаляры, списки или массивы
+    dtype - тип числовых столбцов
+
+    Возвращает:
+    список одномерных массивов одинаковой длины
+    """
+    arrays = []
+    for value in values:
+        try:
+            array = np.asarray(np.nan if value is None else value, dtype=dtype)
+        except (TypeError, ValueError):
+            array = np.asarray(value)
+        arrays.append(np.atleast_1d(array))
+    return [np.ascontiguousarray(array) for array in np.broadcast_arrays(*arrays)]
+
+
+def section_area(height, width, diameter):
+    """
+    Рассчитывает площадь сечения воздуховода.
+    Для строк, где задан diameter, сечение круглое, иначе прямоугольное.
+
+    Аргументы:
+    height - высота воздуховода, м
+    width - ширина воздуховода, м
+    diameter - диаметр воздуховода, м
+
+    Возвращает:
+    площадь сечения, м^2
+    """
+    return np.where(np.isnan(diameter), height * width, np.pi * diameter**2 / 4)
+
+
+def velocity(flow, height, width, diameter):
+    """
+    Рассчитывает скорость в воздуховоде (аналог hydraulic.velocity()).
+
+    Аргументы:
+    flow - расход воздуха, м^3/ч
+    height - высота воздуховода, м
+    width - ширина воздуховода, м
+    diameter - диаметр воздуховода, м
+
+    Возвращает:
+    скорость, м/c
+    """
+    return flow / 3600 / section_area(height, width, diameter)
+
+
+def hydraulic_diameter(height, width, diameter):
+    """
+    Рассчитывает гидравлический диаметр воздуховода (аналог hydraulic.hydraulic_diameter()).
+
+    Аргументы:
+    height - высота воздуховода, м
+    width - ширина воздуховода, м
+    diameter - диаметр воздуховода, м
+
+    Возвращает:
+    гидравлический диаметр, м
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(np.isnan(diameter), 2 * height * width / (height + width), diameter)
+
+
+def reynolds_number(velocity, diameter, kinematic_viscosity):
+    """
+    Рассчитывает критерий Рейнольдса (аналог hydraulic.reynolds_number()).
+    """
+    return velocity * diameter / kinematic_viscosity
+
+
+def friction_factor(reynolds_number, hydraulic_diameter, roughness):
+    """
+    Рассчитывает коэффициент сопротивления трения (аналог hydraulic.friction_factor()).
+    """
+    return 0.11 * (roughness / hydraulic_diameter + 68 / reynolds_number) ** 0.25
+
+
+def friction_factor_derivative(reynolds_number, hydraulic_diameter, roughness):
+    """
+    Рассчитывает производную коэффициента сопротивления трения по критерию Рейнольдса.
+
+    Возвращает:
+    d(lambda)/d(Re)
+    """
+    return (
+        -0.11
+        * 0.25
+        * 68
+        / reynolds_number**2
+        * (roughness / hydraulic_diameter + 68 / reynolds_number) ** -0.75
+    )
+
+
+def dynamic_pressure(density, velocity):
+    """
+    Рассчитывает динамическое давление (аналог hydraulic.dynamic_pressure()).
+    """
+    return 0.5 * density * velocity**2
+
+
+@functools.lru_cache(maxsize=None)
+def _kinematic_viscosity_table():
+    # Таблица читается один раз на процесс, а не при каждом вызове
+    with open("./data/kinematic_viscosity.csv", newline="") as csvfile:
+        reader = csv.DictReader(csvfile)
+        rows = sorted((float(row["t"]), float(row["kinematic_viscosity"])) for row in reader)
+    temperature_values = np.array([row[0] for row in rows])
+    physical_values = np.array([row[1] for row in rows])
+    return temperature_values, physical_values
+
+
+def idelchik_temperature_valid(t):
+    """
+    Проверяет, что температура не слишком далеко от табличных данных Идельчик
+    (предел экстраполяции как в thermophysical.kinematic_viscosity_idelchik()).
+
+    Аргументы:
+    t - температура воздуха, °C (массив)
+
+    Возвращает:
+    массив bool, True - температура допустима
+    """
+    # Настройка, насколько далеко можно экстраполировать от данных
+    extrapolation_max_factor = 3.0
+
+    t = np.asarray(t, dtype=float)
+    temperature_values, _ = _kinematic_viscosity_table()
+    closest_range_min = temperature_values[1] - temperature_values[0]
+    closest_range_max = temperature_values[-1] - temperature_values[-2]
+    lower = temperature_values[0] - closest_range_min * extrapolation_max_factor
+    upper = temperature_values[-1] + closest_range_max * extrapolation_max_factor
+    return (t >= lower) & (t <= upper)
+
+
+def kinematic_viscosity_idelchik(t):
+    """
+    Рассчитывает кинематическую вязкость воздуха интерполяцией по таблице Идельчик
+    (аналог thermophysical.kinematic_viscosity_idelchik()).
+    Для температур дальше допустимого предела экстраполяции (см. idelchik_temperature_valid())
+    возвращается NaN, а не ошибка, чтобы одна строка не останавливала весь пакет.
+
+    Аргументы:
+    t - температура воздуха, °C (массив)
+
+    Возвращает:
+    кинематическая вязкость воздуха, м^2/с
+    """
+    t = np.asarray(t, dtype=float)
+    temperature_values, physical_values = _kinematic_viscosity_table()
+
+    below = t < temperature_values[0]
+    above = t > temperature_values[-1]
+    slope_below_min = (physical_values[1] - physical_values[0]) / (
+        temperature_values[1] - temperature_values[0]
+    )
+    slope_below_max = (physical_values[-1] - physical_values[-2]) / (
+        temperature_values[-1] - temperature_values[-2]
+    )
+    result = np.interp(t, temperature_values, physical_values)
+    result = np.where(
+        below, physical_values[0] - slope_below_min * (temperature_values[0] - t), result
+    )
+    result = np.where(
+        above, physical_values[-1] + slope_below_max * (t - temperature_values[-1]), result
+    )
+    return np.where(idelchik_temperature_valid(t), result, np.nan)
+
+
+def density_mendeleev(t):
+    """
+    Рассчитывает плотность воздуха по уравнению Менделеева-Клапейрона
+    (аналог thermophysical.density_mendeleev()).
+
+    Аргументы:
+    t - температура воздуха, °C (массив)
+
+    Возвращает:
+    плотность воздуха, кг/м^3
+    """
+    pressure = 101325  # Па (1 атм)
+    R_constant = 8.314  # Дж/(моль·К)
+    M_air = 0.02898  # кг/моль
+    return pressure * M_air / (R_constant * (np.asarray(t, dtype=float) + 273.15))
+
+
+@functools.lru_cache(maxsize=4096)
+def _thermo_air(t):
+    # Свойства воздуха по thermo для одной температуры: (кинематическая вязкость, плотность).
+    # Создание Mixture дорогое, а итерационные расчеты запрашивают одни и те же температуры
+    air = Mixture("air", T=t + 273.15, P=101325)
+    return air.mu / air.rho, air.rho
+
+
+def _thermo_property(t, index):
+    # thermo не векторизован, поэтому считаем только уникальные температуры.
+    # В реальных пакетах их обычно единицы, а элементов - тысячи.
+    t = np.asarray(t, dtype=float)
+    unique_t, inverse = np.unique(t, return_inverse=True)
+    values = np.array([_thermo_air(float(value))[index] for value in unique_t])
+    return values[inverse].reshape(t.shape)
+
+
+def kinematic_viscosity_thermo(t):
+    """
+    Возвращает кинематическую вязкость воздуха по thermo
+    (аналог thermophysical.kinematic_viscosity_thermo()).
+
+    Аргументы:
+    t - температура воздуха, °C (массив)
+
+    Возвращает:
+    кинематическая вязкость воздуха, м^2/с
+    """
+    return _thermo_property(t, 0)
+
+
+def density_thermo(t):
+    """
+    Возвращает плотность воздуха по thermo (аналог thermophysical.density_thermo()).
+
+    Аргументы:
+    t - температура воздуха, °C (массив)
+
+    Возвращает:
+    плотность воздуха, кг/м^3
+    """
+    return _thermo_property(t, 1)
+
+
+def thermophysics_functions(thermophysics, dtype=float):
+    """
+    Возвращает пару функций (кинематическая вязкость, плотность) для модели
+    термофизических свойств.
+
+    Аргументы:
+    thermophysics - модель термофизических свойств (idelchik или thermo)
+    dtype - тип чисел результатов функций (свойства считаются в float64
+        и приводятся к нему)
+    """
+    if thermophysics == "idelchik":
+        functions = kinematic_viscosity_idelchik, density_mendeleev
+    elif thermophysics == "thermo":
+        functions = kinematic_viscosity_thermo, density_thermo
+    else:
+        raise ValueError("Неизвестный вид термофизических данных")
+    if np.dtype(dtype) == np.float64:
+        return functions
+    return tuple(
+        functools.partial(lambda function, t: function(t).astype(dtype), function)
+        for function in functions
+    )
+
+
+def _evaluated(value):
+    # Значение из словаря величин пакетной функции: массив или функция, вычисляющая его
+    return value() if callable(value) else value
+
+
+def write_out(out, values):
+    """
+    Записывает результаты пакетного расчета в заранее выделенные массивы
+    (например, срезы хранилища результатов, отображенного в память).
+
+    Аргументы:
+    out - словарь {имя: массив длины пакета} или None; записываются только имена,
+        которые есть в values, остальные массивы не изменяются
+    values - словарь {имя: массив или функция без аргументов, возвращающая массив};
+        функция вызывается, только если такое имя есть в out
+    """
+    if out is None:
+        return
+    for name, array in out.items():
+        if name in values:
+            array[...] = _evaluated(values[name])
+
+
+def capture(intermediates, values, dtype=float):
+    """
+    Отбирает запрошенные промежуточные величины пакетного расчета в столбцы результата.
+    Величины, которые не запрошены, не вычисляются и память под них не выделяется.
+
+    Аргументы:
+    intermediates - имена запрошенных величин или None
+    values - словарь {имя: массив или функция без аргументов, возвращающая массив}
+    dtype - тип чисел столбцов
+
+    Возвращает:
+    словарь {имя: массив dtype} (пустой, если ничего не запрошено)
+    """
+    if not intermediates:
+        return {}
+    unknown = [name for name in intermediates if name not in values]
+    if unknown:
+        raise ValueError(
+            f"Неизвестные промежуточные величины: {', '.join(unknown)}. "
+            f"Доступны: {', '.join(values)}"
+        )
+    return {name: np.asarray(_evaluated(values[name]), dtype=dtype) for name in intermediates}
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+import numpy as np
+from engine.autotune import PROBE_START, choose_settings, evaluate_autotuned
+from engine.store import KERNELS
+
+
+class TestAutotune(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        size = 50000
+        self.columns = {
+            "temperature": rng.uniform(-30, 40, size),
+            "angle": 90,
+            "flowtype": np.where(rng.random(size) < 0.5, "diverge", "converge"),
+            "flow_o": rng.uniform(100, 1000, size),
+            "flow_p": rng.uniform(100, 1000, size),
+            "diameter_c": 0.315,
+            "diameter_o": 0.2,
+            "diameter_p": 0.25,
+        }
+        self.expected = KERNELS["tee"](**self.columns)
+
+    def test_evaluate(self):
+        """
+        Расчет с подбором параметров совпадает с расчетом одним вызовом,
+        выбранные параметры пишутся в журнал и возвращаются
+        """
+        with self.assertLogs("engine.autotune", "INFO") as logs:
+            result, settings = evaluate_autotuned("tee", self.columns)
+        self.assertIn(f"chunk_size={settings['chunk_size']}", logs.output[0])
+        self.assertEqual([size for size, _ in settings["probes"]], [1024, 4096, 16384])
+        self.assertGreater(settings["row_bytes"], 0)
+        for name, values in self.expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_rows_evaluated_once(self):
+        """
+        Пробы не повторяют расчет: каждая строка считается один раз, плюс
+        прогревочный вызов на одной строке
+        """
+        rows = []
+        kernel = KERNELS["tee"]
+
+        def counting(**params):
+            rows.append(len(params["flow_o"]))
+            return kernel(**params)
+
+        with mock.patch.dict(KERNELS, {"tee": counting}):
+            result, _ = evaluate_autotuned("tee", self.columns, max_jobs=1)
+        self.assertEqual(rows[0], 1)
+        self.assertEqual(sum(rows), len(self.columns["flow_o"]) + 1)
+        np.testing.assert_array_equal(result["dP_o"], self.expected["dP_o"])
+
+    def test_settings(self):
+        """
+        С готовыми параметрами пробы не выполняются; расчет в нескольких процессах
+        дает тот же результат
+        """
+        with self.assertNoLogs("engine.autotune", "INFO"):
+            result, settings = evaluate_autotuned(
+                "tee", self.columns, settings={"chunk_size": 7000, "jobs": 2}
+            )
+        self.assertEqual(settings, {"chunk_size": 7000, "jobs": 2})
+        for name, values in self.expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_choose_settings(self):
+        """
+        Размер части - по доле постоянных затрат, с ограничением памяти;
+        процессы - только для долгого расчета
+        """
+        # t0 = 1 мс, t1 = 1 мкс: часть 20000 строк (t0 - 5% времени части)
+        probes = [(size, 1e-3 + size * 1e-6) for size in (1024, 4096, 16384)]
+        settings = choose_settings(probes, 100, 10**5, max_jobs=4)
+        self.assertEqual(settings["chunk_size"], 20000)
+        self.assertEqual(settings["jobs"], 1)
+        self.assertAlmostEqual(settings["row_time"], 1e-6)
+
+        settings = choose_settings(probes, 100, 10**7, max_jobs=4)
+        self.assertEqual(settings["jobs"], 4)
+        settings = choose_settings(probes, 1000, 10**7, max_jobs=4, memory_limit=10**7)
+        self.assertEqual(settings["chunk_size"], 2500)
+
+        # Без постоянных затрат - наименьшая часть
+        probes = [(size, size * 1e-6) for size in (1024, 4096, 16384)]
+        self.assertEqual(choose_settings(probes, 100, 10**5)["chunk_size"], PROBE_START)
+
+
+if __name__ == "__main__":
+    unittest.main()
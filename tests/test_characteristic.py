@@ -0,0 +1,107 @@
+import unittest
+import numpy as np
+from calculations.duct import duct_batch
+from engine.characteristic import (
+    fit_characteristic,
+    evaluate_characteristic,
+    evaluate_characteristics,
+    fit_store,
+)
+from engine.store import create_store, add_element, evaluate_store
+
+
+class TestCharacteristic(unittest.TestCase):
+    def test_fit_duct(self):
+        """
+        Аппроксимация воздуховода: показатель степени близок к 1.75-2,
+        заявленная погрешность подтверждается в случайных точках диапазона
+        """
+        params = dict(flow=600, length=1.37, temperature=0, diameter=0.16)
+        characteristic = fit_characteristic("duct", params, 100, 2000, segments=4)
+        self.assertLess(characteristic["max_error"], 0.01)
+        for n in characteristic["outputs"]["dP"]["n"]:
+            self.assertTrue(1.7 < n < 2.0)
+
+        flows = np.random.default_rng(0).uniform(100, 2000, 50)
+        exact = duct_batch(**dict(params, flow=flows))["dP"]
+        approx = evaluate_characteristic(characteristic, flows)["dP"]
+        self.assertLess(np.max(np.abs(approx / exact - 1)), characteristic["max_error"] * 1.5)
+
+    def test_fit_tee(self):
+        """
+        При сохранении соотношения расходов потери в тройнике строго пропорциональны Q^2
+        """
+        params = dict(
+            temperature=0,
+            angle=90,
+            flowtype="converge",
+            flow_p=600,
+            flow_o=300,
+            diameter_c=0.160,
+            diameter_o=0.160,
+            diameter_p=0.160,
+        )
+        characteristic = fit_characteristic("tee", params, 450, 1800, segments=2)
+        self.assertLess(characteristic["max_error"], 1e-9)
+        self.assertAlmostEqual(characteristic["outputs"]["dP_o"]["n"][0], 2.0)
+        self.assertAlmostEqual(evaluate_characteristic(characteristic, 900)["dP_p"][0], 52.44, 1)
+
+    def test_store_characteristic_mode(self):
+        """
+        Характеристики сохраняются в хранилище и используются в быстром режиме расчета
+        """
+        store = create_store()
+        add_element(store, "D1", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(
+            store, "E1", "elbow", flow=600, temperature=0, angle=90, r0=0.185, diameter=0.16
+        )
+        max_error = fit_store(store)
+        self.assertIn("characteristic", store["E1"])
+        self.assertLess(max_error, 0.01)
+
+        exact = evaluate_store(store)
+        fast = evaluate_store(store, mode="characteristic")
+        for element_id in store:
+            self.assertAlmostEqual(
+                fast[element_id]["dP"] / exact[element_id]["dP"], 1, delta=max_error
+            )
+
+    def test_evaluate_characteristics(self):
+        """
+        Пакетный расчет по многим характеристикам совпадает с расчетом по каждой,
+        в т.ч. на границах участков и за пределами диапазона аппроксимации
+        """
+        characteristics = [
+            fit_characteristic(
+                "duct", dict(flow=1, length=1, temperature=0, diameter=diameter), 100, 2000
+            )
+            for diameter in (0.1, 0.16, 0.2, 0.25)
+        ]
+        flows = [50, characteristics[1]["breakpoints"][2], 700, 5000]
+        result = evaluate_characteristics(characteristics, flows, derivative=True)
+        for i, characteristic in enumerate(characteristics):
+            expected = evaluate_characteristic(characteristic, flows[i], derivative=True)
+            for name in ("dP", "ddP_dflow"):
+                self.assertAlmostEqual(result[name][i], expected[name][0])
+
+    def test_fit_store_skips_unfit(self):
+        """
+        Элемент, потери которого нельзя аппроксимировать (нулевые при нулевой длине),
+        пропускается с записью причины и в быстром режиме считается по полным формулам
+        """
+        store = create_store()
+        add_element(store, "D1", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(store, "D0", "duct", flow=600, length=0, temperature=0, diameter=0.16)
+        max_error = fit_store(store)
+        self.assertLess(max_error, 0.01)
+        self.assertIn("characteristic", store["D1"])
+        self.assertNotIn("characteristic", store["D0"])
+        self.assertIn("characteristic_error", store["D0"])
+
+        fast = evaluate_store(store, mode="characteristic")
+        self.assertEqual(fast["D0"]["dP"], 0)
+        self.assertAlmostEqual(fast["D1"]["dP"], evaluate_store(store)["D1"]["dP"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from engine import autotune, sweep as sweep_module
+from engine.checkpoint import chunk_path, evaluate_checkpointed
+from engine.cli import main
+from engine.statistics import summarize_groups
+from engine.store import add_element, create_store, evaluate_store
+
+
+def interrupted(elements, count):
+    # Итератор, который обрывается исключением после count элементов (имитация сбоя)
+    for i, element in enumerate(elements):
+        if i == count:
+            raise MemoryError
+        yield element
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.directory.name, "run")
+        self.elements = []
+        for i in range(10):
+            self.elements.append(
+                (
+                    f"D{i}",
+                    "duct",
+                    {"flow": 100 + 50 * i, "length": 2, "temperature": 20, "diameter": 0.16},
+                )
+            )
+            self.elements.append(
+                (
+                    f"E{i}",
+                    "elbow",
+                    {
+                        "flow": 100 + 50 * i,
+                        "temperature": 20,
+                        "angle": 90,
+                        "r0": 0.2,
+                        "diameter": 0.16,
+                    },
+                )
+            )
+        store = create_store()
+        for element_id, kind, params in self.elements:
+            add_element(store, element_id, kind, **params)
+        self.expected = evaluate_store(store, validate=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_complete(self):
+        """
+        Расчет частями с контрольными точками совпадает с расчетом хранилища
+        """
+        results = evaluate_checkpointed(self.elements, self.checkpoint, chunk_size=3, validate=True)
+        self.assertEqual(results, self.expected)
+        self.assertEqual(list(results), list(self.expected))
+        with self.assertRaises(ValueError):
+            evaluate_checkpointed(self.elements, self.checkpoint, chunk_size=0)
+
+    def test_resume(self):
+        """
+        После сбоя готовые части читаются с диска, досчитываются только остальные;
+        итог совпадает с расчетом без сбоя
+        """
+        with self.assertRaises(MemoryError):
+            evaluate_checkpointed(
+                interrupted(self.elements, 8), self.checkpoint, chunk_size=3, validate=True
+            )
+        with open(os.path.join(self.checkpoint, "checkpoint.json")) as jsonfile:
+            self.assertEqual(json.load(jsonfile)["completed"], [0, 1])
+
+        # Готовая часть не пересчитывается: метка в ее файле попадает в итог
+        path = chunk_path(self.checkpoint, 0, "json")
+        with open(path) as jsonfile:
+            chunk = json.load(jsonfile)
+        chunk[0][1]["mark"] = 1
+        with open(path, "w") as jsonfile:
+            json.dump(chunk, jsonfile)
+
+        results = evaluate_checkpointed(self.elements, self.checkpoint, chunk_size=3, validate=True)
+        self.assertEqual(results.pop("D0").pop("mark"), 1)
+        self.expected.pop("D0")
+        self.assertEqual(results, self.expected)
+
+        with self.assertRaises(ValueError):
+            evaluate_checkpointed(self.elements, self.checkpoint, chunk_size=4, validate=True)
+
+    def test_auto_chunk_size(self):
+        """
+        chunk_size="auto": пробные части, затем выбранный размер; при продолжении
+        после сбоя используются сохраненные замеры, итог совпадает с расчетом хранилища
+        """
+        with mock.patch.multiple(autotune, PROBE_START=2, PROBE_GROWTH=2, PROBE_CHUNKS=2):
+            with self.assertRaises(MemoryError):
+                evaluate_checkpointed(
+                    interrupted(self.elements, 12), self.checkpoint, "auto", validate=True
+                )
+            with open(os.path.join(self.checkpoint, "autotune.json")) as jsonfile:
+                tuning = json.load(jsonfile)
+            self.assertGreater(tuning["row_bytes"], 0)
+            self.assertEqual([size for size, _ in tuning["probes"].values()], [2, 4])
+            results = evaluate_checkpointed(self.elements, self.checkpoint, "auto", validate=True)
+            with open(os.path.join(self.checkpoint, "autotune.json")) as jsonfile:
+                self.assertEqual(json.load(jsonfile), tuning)
+        self.assertEqual(results, self.expected)
+        self.assertEqual(list(results), list(self.expected))
+
+    def test_statistics(self):
+        """
+        Статистика по частям вместо результатов, включая готовые части с диска
+        """
+        with self.assertRaises(MemoryError):
+            evaluate_checkpointed(
+                interrupted(self.elements, 8), self.checkpoint, chunk_size=3, validate=True
+            )
+        statistics = evaluate_checkpointed(
+            self.elements, self.checkpoint, chunk_size=3, statistics={}, validate=True
+        )
+        summary = summarize_groups(statistics)
+        self.assertEqual(set(summary), {"duct", "elbow"})
+        self.assertNotIn("error", summary["duct"])
+        dP = [self.expected[f"E{i}"]["dP"] for i in range(10)]
+        self.assertEqual(summary["elbow"]["dP"]["count"], 10)
+        self.assertAlmostEqual(summary["elbow"]["dP"]["mean"], np.mean(dP))
+        self.assertEqual(summary["elbow"]["dP"]["max"], max(dP))
+
+    def test_sweep_resume(self):
+        """
+        Расчет на сетке частями: после сбоя досчитываются только неготовые части,
+        результат совпадает с расчетом одним вызовом
+        """
+        grid = {"flow": np.linspace(100, 2000, 10), "diameter": np.array([0.16, 0.2])}
+        fixed = dict(length=1.0, temperature=20)
+        expected = sweep_module.sweep("duct", grid, cache_directory=None, **fixed)
+
+        kernel = sweep_module.SWEEP_TARGETS["duct"]
+        calls = []
+
+        def failing(**columns):
+            calls.append(len(columns["flow"]))
+            if len(calls) == 3:
+                raise MemoryError
+            return kernel(**columns)
+
+        with mock.patch.dict(sweep_module.SWEEP_TARGETS, {"duct": failing}):
+            with self.assertRaises(MemoryError):
+                sweep_module.sweep(
+                    "duct", grid, cache_directory=self.directory.name, chunk_size=6, **fixed
+                )
+            calls.clear()
+            result = sweep_module.sweep(
+                "duct", grid, cache_directory=self.directory.name, chunk_size=6, **fixed
+            )
+        # Всего 4 части по 6 точек (последняя - 2), две были готовы до сбоя
+        self.assertEqual(calls, [6, 2])
+        np.testing.assert_array_equal(result["dP"], expected["dP"])
+        # Остается только файл кэша, части удалены
+        files = os.listdir(self.directory.name)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith(".npz"))
+
+    def test_cli(self):
+        """
+        Командная строка с --checkpoint: результат как без контрольных точек,
+        папка контрольной точки удаляется после записи результатов
+        """
+        project = os.path.join(self.directory.name, "project.json")
+        with open(project, "w") as jsonfile:
+            json.dump([{"id": i, "kind": k, **p} for i, k, p in self.elements], jsonfile)
+        with contextlib.redirect_stdout(io.StringIO()):
+            main([project, "--checkpoint", "--chunk-size", "4", "-q"])
+        with open(os.path.join(self.directory.name, "project.results.json")) as jsonfile:
+            results = json.load(jsonfile)
+        self.assertEqual(results, json.loads(json.dumps(self.expected)))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory.name, "project.results.json.checkpoint"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
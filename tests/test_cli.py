@@ -0,0 +1,147 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from engine.cli import main
+from engine.parallel import evaluate_parallel
+from engine.project import load_project, save_results
+from engine.store import evaluate_store
+
+ELEMENTS_CSV = """id,kind,flow,length,temperature,diameter,height,width,angle,r0,oriented
+D1,duct,600,1.37,0,0.16,,,,,
+D2,duct,1000,1.0,-25,,0.3,0.3,,,
+E1,elbow,600,,0,0.16,,,90,0.185,
+E2,elbow,1000,,-25,,0.3,0.3,90,0.25,vert
+"""
+
+NETWORK = {
+    "T1": {
+        "kind": "tee",
+        "params": {
+            "temperature": 0,
+            "angle": 90,
+            "flowtype": "diverge",
+            "flow_p": 600,
+            "flow_o": 300,
+            "diameter_c": 0.16,
+            "diameter_o": 0.16,
+            "diameter_p": 0.16,
+        },
+    },
+    "D1": {
+        "kind": "duct",
+        "params": {"flow": 600, "length": 2.0, "temperature": 0, "diameter": 0.16},
+    },
+    "D2": {
+        "kind": "duct",
+        "params": {"flow": 600, "length": 2.0, "temperature": 0, "diameter": 0.16},
+    },
+}
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.elements = os.path.join(self.directory.name, "elements.csv")
+        self.network = os.path.join(self.directory.name, "network.json")
+        with open(self.elements, "w") as csvfile:
+            csvfile.write(ELEMENTS_CSV)
+        with open(self.network, "w") as jsonfile:
+            json.dump(NETWORK, jsonfile)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_project(self):
+        """
+        Чтение файла элементов (csv) и файла сети (json)
+        """
+        store = load_project(self.elements)
+        self.assertEqual(list(store), ["D1", "D2", "E1", "E2"])
+        self.assertEqual(store["E2"]["params"]["oriented"], "vert")
+        self.assertNotIn("diameter", store["E2"]["params"])
+        self.assertEqual(load_project(self.network), NETWORK)
+
+    def test_parallel_and_backends(self):
+        """
+        Расчет в нескольких процессах и скалярными функциями совпадает с пакетным расчетом
+        """
+        store = load_project(self.elements)
+        expected = evaluate_store(store)
+        parallel = evaluate_parallel(store, jobs=2)
+        self.assertEqual(parallel, expected)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            scalar = evaluate_parallel(store, jobs=2, backend="scalar", quiet=True)
+        self.assertEqual(output.getvalue(), "")
+        for element_id in store:
+            self.assertAlmostEqual(scalar[element_id]["dP"], expected[element_id]["dP"])
+
+    def test_main(self):
+        """
+        Командная строка: результаты записываются рядом с проектами, печатается сводка
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = main([self.elements, self.network, "--jobs", "2", "--coalesce", "-q"])
+        self.assertEqual(code, 0)
+        self.assertIn("Итого: проектов: 2, элементов: 7", output.getvalue())
+        with open(os.path.join(self.directory.name, "network.results.json")) as jsonfile:
+            results = json.load(jsonfile)
+        self.assertEqual(list(results), ["T1", "D1", "D2"])
+        self.assertAlmostEqual(results["D1"]["dP"], results["D2"]["dP"])
+
+    def test_calcversion_csv(self):
+        """
+        Строковые аргументы из csv (calcversion "22") остаются строками, расчет идет
+        на обоих способах расчета
+        """
+        path = os.path.join(self.directory.name, "calcversion.csv")
+        with open(path, "w") as csvfile:
+            csvfile.write(
+                "id,kind,flow,temperature,diameter,angle,r0,calcversion\n"
+                "E1,elbow,600,0,0.16,90,0.185,22\n"
+            )
+        store = load_project(path)
+        self.assertEqual(store["E1"]["params"]["calcversion"], "22")
+        for backend in ("batch", "scalar"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                code = main([path, "--backend", backend, "-q"])
+            self.assertEqual(code, 0)
+
+    def test_scalar_errors(self):
+        """
+        Ошибка расчета одного элемента скалярной функцией (деление на ноль при нулевом
+        расходе) записывается как ошибка элемента и не прерывает расчет остальных
+        """
+        store = load_project(self.elements)
+        store["D2"]["params"]["flow"] = 0
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = evaluate_parallel(store, backend="scalar", quiet=True)
+        self.assertIn("message", results["D2"])
+        self.assertIn("dP", results["D1"])
+        self.assertIn("dP", results["E2"])
+
+    def test_save_results_csv(self):
+        """
+        Запись результатов в csv, NaN и отсутствующие значения - пустые ячейки
+        """
+        path = os.path.join(self.directory.name, "results.csv")
+        save_results({"A": {"dP": 1.5}, "B": {"dP_o": 2.0, "dP_p": float("nan")}}, path)
+        with open(path) as csvfile:
+            self.assertEqual(csvfile.read().split(), ["id,dP,dP_o,dP_p", "A,1.5,,", "B,,2.0,"])
+
+    def test_save_results_json(self):
+        """
+        Запись результатов в json: NaN и бесконечность - null
+        """
+        path = os.path.join(self.directory.name, "results.json")
+        save_results({"A": {"dP": float("nan"), "zeta": float("-inf"), "v": 2.0}}, path)
+        with open(path) as jsonfile:
+            self.assertEqual(json.load(jsonfile), {"A": {"dP": None, "zeta": None, "v": 2.0}})
+
+
+if __name__ == "__main__":
+    unittest.main()
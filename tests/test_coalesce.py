@@ -0,0 +1,62 @@
+import unittest
+from engine.coalesce import coalesce_ducts
+from engine.store import create_store, add_element, evaluate_store
+
+
+def example_store():
+    # Прямой участок, разбитый на куски, отвод, затем еще два участка с другим расходом
+    store = create_store()
+    for i, length in enumerate([0.5, 1.2, 2.0]):
+        add_element(store, f"D{i}", "duct", flow=600, length=length, temperature=0, diameter=0.16)
+    add_element(store, "E1", "elbow", flow=600, temperature=0, angle=90, r0=0.185, diameter=0.16)
+    for i, length in enumerate([1.0, 3.0], start=3):
+        add_element(store, f"D{i}", "duct", flow=400, length=length, temperature=0, diameter=0.16)
+    add_element(store, "D5", "duct", flow=400, length=1.0, temperature=0, diameter=0.125)
+    return store
+
+
+class TestCoalesce(unittest.TestCase):
+    def test_coalesce_ducts(self):
+        """
+        Объединяются только идущие подряд одинаковые воздуховоды
+        """
+        coalesced, runs = coalesce_ducts(example_store())
+        self.assertEqual(list(coalesced), ["D0", "E1", "D3", "D5"])
+        self.assertAlmostEqual(coalesced["D0"]["params"]["length"], 3.7)
+        self.assertAlmostEqual(coalesced["D3"]["params"]["length"], 4.0)
+        self.assertEqual([element_id for element_id, _ in runs["D0"]], ["D0", "D1", "D2"])
+        self.assertNotIn("D5", runs)
+
+    def test_evaluate_store_coalesce(self):
+        """
+        Результаты с объединением совпадают с поэлементным расчетом
+        """
+        store = example_store()
+        store["D2"]["params"]["length"] = -1
+        exact = evaluate_store(store, validate=True)
+        coalesced = evaluate_store(store, validate=True, coalesce=True)
+        self.assertEqual(list(coalesced), list(store))
+        for element_id in store:
+            for name, value in exact[element_id].items():
+                if value == value:
+                    self.assertAlmostEqual(coalesced[element_id][name], value)
+        # Некорректный элемент не объединяется с соседями
+        self.assertNotEqual(coalesced["D2"]["error"], 0)
+        self.assertEqual(coalesced["D1"]["error"], 0)
+
+    def test_coalesce_intermediates(self):
+        """
+        Промежуточные величины объединенных воздуховодов совпадают с поэлементным
+        расчетом: zeta раскладывается по длинам, Re копируется
+        """
+        store = example_store()
+        intermediates = {"duct": ("zeta", "Re")}
+        exact = evaluate_store(store, intermediates=intermediates)
+        coalesced = evaluate_store(store, coalesce=True, intermediates=intermediates)
+        for element_id in ("D0", "D1", "D2", "D3", "D4"):
+            for name in ("zeta", "Re"):
+                self.assertAlmostEqual(coalesced[element_id][name], exact[element_id][name])
+
+
+if __name__ == "__main__":
+    unittest.main()
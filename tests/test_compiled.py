@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+import numpy as np
+from engine.store import KERNELS
+from physics import compiled
+
+rng = np.random.default_rng(0)
+SIZE = 2000
+
+# Пакеты с круглыми и прямоугольными сечениями, расширениями и сужениями
+PARAMS = {
+    "duct": dict(
+        flow=rng.uniform(50, 5000, SIZE),
+        length=rng.uniform(0.5, 10, SIZE),
+        temperature=rng.uniform(-30, 40, SIZE),
+        diameter=np.where(rng.random(SIZE) < 0.5, 0.2, np.nan),
+        height=0.3,
+        width=0.4,
+    ),
+    "elbow": dict(
+        flow=rng.uniform(50, 5000, SIZE),
+        temperature=rng.uniform(-30, 40, SIZE),
+        angle=rng.uniform(0, 180, SIZE),
+        r0=rng.uniform(0.01, 1, SIZE),
+        oriented=np.where(rng.random(SIZE) < 0.5, "horiz", "vert"),
+        height=rng.uniform(0.1, 1, SIZE),
+        width=rng.uniform(0.05, 0.5, SIZE),
+    ),
+    "transition": dict(
+        flow=rng.uniform(50, 5000, SIZE),
+        temperature=20,
+        diameter1=rng.uniform(0.1, 0.5, SIZE),
+        height2=rng.uniform(0.1, 0.5, SIZE),
+        width2=rng.uniform(0.1, 0.5, SIZE),
+        length=rng.uniform(0.05, 1, SIZE),
+    ),
+}
+
+
+class TestCompiled(unittest.TestCase):
+    @unittest.skipUnless(compiled.AVAILABLE, "numba не установлен")
+    def test_jit(self):
+        """
+        Скомпилированный цикл дает те же потери и производные, что и расчет по NumPy
+        """
+        for kind, params in PARAMS.items():
+            versions = [{}] if kind == "duct" else [{}, {"calcversion": "22"}]
+            for version in versions:
+                expected = KERNELS[kind](**params, **version, derivative=True)
+                result = KERNELS[kind](**params, **version, derivative=True, jit=True)
+                self.assertEqual(set(result), set(expected))
+                for name in expected:
+                    np.testing.assert_allclose(result[name], expected[name], rtol=1e-9)
+
+    def test_fallback(self):
+        """
+        Без numba, а также с промежуточными величинами, float32 или записью в out
+        расчет идет по NumPy
+        """
+        params = PARAMS["elbow"]
+        expected = KERNELS["elbow"](**params)
+        with mock.patch.object(compiled, "AVAILABLE", False):
+            np.testing.assert_array_equal(
+                KERNELS["elbow"](**params, jit=True)["dP"], expected["dP"]
+            )
+        result = KERNELS["elbow"](**params, jit=True, intermediates=("k_re",))
+        np.testing.assert_array_equal(result["dP"], expected["dP"])
+        self.assertIn("k_re", result)
+        result = KERNELS["duct"](**PARAMS["duct"], jit=True, dtype="float32")
+        self.assertEqual(result["dP"].dtype, np.float32)
+        self.assertFalse(compiled.enabled(True, np.dtype("float64"), out={"dP": np.empty(1)}))
+        self.assertFalse(compiled.enabled(False, np.dtype("float64")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from calculations.cross import cross
+from calculations.cross import cross, cross_batch
 
 
 class TestCross(unittest.TestCase):
@@ -159,6 +159,39 @@ class TestCross(unittest.TestCase):
         self.assertAlmostEqual(result["dP_o1"], 11.866, places=2)
         self.assertAlmostEqual(result["dP_o2"], 11.866, places=2)
 
+    def test_cross_derivative(self):
+        """
+        Проверка аналитических производных dP по flow_o1, flow_o2 и flow_p конечной разностью
+        и совпадения пакетного расчета со скалярным
+        """
+        params = dict(
+            temperature=0,
+            diameter_c=0.2,
+            diameter_o1=0.16,
+            diameter_o2=0.125,
+            diameter_p=0.2,
+            angle_o1=90,
+            angle_o2=60,
+        )
+        flows = {"o1": 300, "o2": 200, "p": 400}
+        for flowtype in ["converge", "diverge"]:
+            kwargs = {f"flow_{name}": value for name, value in flows.items()}
+            result = cross(flowtype=flowtype, derivative=True, **kwargs, **params)
+            batch = cross_batch(flowtype=flowtype, derivative=True, **kwargs, **params)
+            for name in flows:
+                plus = dict(kwargs, **{f"flow_{name}": flows[name] + 0.01})
+                minus = dict(kwargs, **{f"flow_{name}": flows[name] - 0.01})
+                result_plus = cross(flowtype=flowtype, **plus, **params)
+                result_minus = cross(flowtype=flowtype, **minus, **params)
+                for path in flows:
+                    key = f"ddP_{path}_dflow_{name}"
+                    finite_difference = (
+                        result_plus[f"dP_{path}"] - result_minus[f"dP_{path}"]
+                    ) / 0.02
+                    self.assertAlmostEqual(result[key], finite_difference, places=6)
+                    self.assertAlmostEqual(batch[key][0], result[key])
+                    self.assertAlmostEqual(batch[f"dP_{path}"][0], result[f"dP_{path}"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from calculations.duct import duct
+import numpy as np
+from calculations.duct import duct, duct_batch
 
 
 class TestDuct(unittest.TestCase):
@@ -55,6 +56,50 @@ class TestDuct(unittest.TestCase):
             """Проверка выдачи assert если указан только диаметр и высота"""
             duct(flow=600, length=1.37, temperature=0, diameter=0.16, height=0.3)
 
+    def test_duct_derivative(self):
+        """
+        Проверка аналитической производной dP по расходу конечной разностью
+        """
+        params = dict(length=1.37, temperature=0, diameter=0.16, roughness=0.001)
+        result, derivative = duct(flow=600, derivative=True, **params)
+        finite_difference = (duct(flow=600.01, **params) - duct(flow=599.99, **params)) / 0.02
+        self.assertAlmostEqual(result, duct(flow=600, **params))
+        self.assertAlmostEqual(derivative, finite_difference, places=6)
+
+    def test_duct_batch(self):
+        """
+        Проверка, что пакетный расчет совпадает со скалярным (круглые и прямоугольные вперемешку),
+        а производная в пакете - с конечной разностью
+        """
+        result = duct_batch(
+            flow=[600, 1000],
+            length=[1.37, 1.0],
+            temperature=[0, -25],
+            height=[None, 0.3],
+            width=[None, 0.3],
+            diameter=[0.16, None],
+            derivative=True,
+        )
+        self.assertAlmostEqual(
+            result["dP"][0], duct(flow=600, length=1.37, temperature=0, diameter=0.16)
+        )
+        self.assertAlmostEqual(
+            result["dP"][1], duct(flow=1000, length=1.0, temperature=-25, height=0.3, width=0.3)
+        )
+        flows = np.array([600.0, 1000.0])
+        params = dict(
+            length=[1.37, 1.0],
+            temperature=[0, -25],
+            height=[np.nan, 0.3],
+            width=[np.nan, 0.3],
+            diameter=[0.16, np.nan],
+        )
+        finite_difference = (
+            duct_batch(flow=flows + 0.01, **params)["dP"]
+            - duct_batch(flow=flows - 0.01, **params)["dP"]
+        ) / 0.02
+        np.testing.assert_allclose(result["ddP_dflow"], finite_difference, rtol=1e-6)
+
 
 if __name__ == "__main__":
     unittest.main()
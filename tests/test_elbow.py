@@ -1,5 +1,6 @@
 import unittest
-from calculations.elbow import elbow
+import numpy as np
+from calculations.elbow import elbow, elbow_batch
 
 
 class Testelbow(unittest.TestCase):
@@ -196,6 +197,83 @@ class Testelbow(unittest.TestCase):
                 thermophysics="thermo",
             )
 
+    def test_elbow_derivative(self):
+        """
+        Проверка аналитической производной dP по расходу конечной разностью
+        (с учетом k_re и по версии 22)
+        """
+        for calcversion in [None, "22"]:
+            params = dict(
+                temperature=-25,
+                angle=90,
+                r0=0.25,
+                height=0.3,
+                width=0.6,
+                oriented="horiz",
+                calcversion=calcversion,
+            )
+            result, derivative = elbow(flow=1000, derivative=True, **params)
+            finite_difference = (
+                elbow(flow=1000.01, **params) - elbow(flow=999.99, **params)
+            ) / 0.02
+            self.assertAlmostEqual(result, elbow(flow=1000, **params))
+            self.assertAlmostEqual(derivative, finite_difference, places=6)
+
+    def test_elbow_batch(self):
+        """
+        Проверка, что пакетный расчет совпадает со скалярным для разных веток формул
+        """
+        cases = [
+            dict(flow=600, temperature=0, angle=90, r0=0.185, diameter=0.16),
+            dict(
+                flow=1000,
+                temperature=-25,
+                angle=45,
+                r0=0.25,
+                height=0.3,
+                width=0.6,
+                oriented="vert",
+            ),
+            dict(
+                flow=1000,
+                temperature=-25,
+                angle=120,
+                r0=0.5,
+                height=0.3,
+                width=0.6,
+                oriented="horiz",
+            ),
+        ]
+        columns = {
+            key: [case.get(key) for case in cases]
+            for key in ["flow", "temperature", "angle", "r0", "height", "width", "diameter"]
+        }
+        result = elbow_batch(
+            oriented=[case.get("oriented") for case in cases], derivative=True, **columns
+        )
+        for i, case in enumerate(cases):
+            dP, derivative = elbow(derivative=True, **case)
+            self.assertAlmostEqual(result["dP"][i], dP)
+            self.assertAlmostEqual(result["ddP_dflow"][i], derivative)
+
+    def test_elbow_batch_intermediates(self):
+        """
+        Промежуточные величины возвращаются только по запросу и согласованы с результатом
+        """
+        params = dict(flow=[600, 1200], temperature=0, angle=90, r0=0.185, diameter=0.16)
+        self.assertEqual(list(elbow_batch(**params)), ["dP"])
+        names = ("Re", "lambda", "k_delta", "k_re", "A1", "B1", "C1", "r0b0", "zeta", "p_dyn")
+        result = elbow_batch(intermediates=names, **params)
+        self.assertEqual(list(result), ["dP", *names])
+        np.testing.assert_allclose(result["k_re"], 1.3 - 0.29 * np.log(result["Re"] * 10**-5))
+        np.testing.assert_allclose(result["r0b0"], 0.185 / 0.16)
+        zeta = result["k_delta"] * result["k_re"] * result["A1"] * result["B1"] * result["C1"]
+        zeta += 0.0175 * 90 * result["lambda"] * 0.185 / 0.16
+        np.testing.assert_allclose(result["zeta"], zeta)
+        np.testing.assert_allclose(result["zeta"] * result["p_dyn"], result["dP"])
+        with self.assertRaises(ValueError):
+            elbow_batch(intermediates=("alfa05",), **params)
+
 
 if __name__ == "__main__":
     unittest.main()
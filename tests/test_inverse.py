@@ -0,0 +1,83 @@
+import unittest
+import numpy as np
+from calculations.duct import duct, duct_batch
+from calculations.elbow import elbow
+from calculations.tee import tee_batch
+from engine.inverse import bisect, solve_flow, solve_size
+
+
+class TestInverse(unittest.TestCase):
+    def test_bisect(self):
+        """
+        Векторизованный поиск корней; неокруженный корень дает NaN
+        """
+        roots = bisect(lambda x: x**2 - np.array([4.0, 9.0, 100.0]), 1, [5, 5, 5])
+        np.testing.assert_allclose(roots[:2], [2, 3], rtol=1e-7)
+        self.assertTrue(np.isnan(roots[2]))
+
+    def test_solve_flow_specific_loss(self):
+        """
+        Расход, дающий 1 Па/м в воздуховодах разного диаметра, по обоим источникам
+        теплофизических свойств
+        """
+        for thermophysics in ["idelchik", "thermo"]:
+            params = dict(
+                length=1,
+                temperature=20,
+                diameter=[0.1, 0.16, 0.25],
+                thermophysics=thermophysics,
+            )
+            flows = solve_flow("duct", params, target=1.0)
+            np.testing.assert_allclose(duct_batch(flow=flows, **params)["dP"], 1.0, rtol=1e-6)
+        self.assertAlmostEqual(
+            duct(flow=flows[1], length=1, temperature=20, diameter=0.16, thermophysics="thermo"),
+            1.0,
+            places=5,
+        )
+
+    def test_solve_flow_velocity(self):
+        """
+        Расход по заданной скорости
+        """
+        flows = solve_flow("duct", dict(height=0.3, width=0.6), target=5, criterion="velocity")
+        self.assertAlmostEqual(flows[0], 5 * 3600 * 0.18)
+
+    def test_solve_flow_tee(self):
+        """
+        Суммарный расход тройника по заданным потерям на отвод
+        """
+        params = dict(
+            temperature=0,
+            angle=90,
+            flowtype="diverge",
+            flow_p=600,
+            flow_o=300,
+            diameter_c=0.160,
+            diameter_o=0.160,
+            diameter_p=0.160,
+        )
+        flow_c = solve_flow("tee", params, target=50, output="dP_o")
+        result = tee_batch(**dict(params, flow_p=flow_c * 2 / 3, flow_o=flow_c / 3))
+        self.assertAlmostEqual(result["dP_o"][0], 50, places=5)
+
+    def test_solve_size_elbow(self):
+        """
+        Диаметр отвода, при котором потери не превышают 10 Па
+        """
+        params = dict(flow=600, temperature=0, angle=90, r0=0.185)
+        diameter = solve_size("elbow", params, target=10)[0]
+        self.assertTrue(0.16 < diameter < 0.25)
+        self.assertAlmostEqual(elbow(diameter=diameter, **params), 10, places=5)
+
+    def test_solve_size_velocity(self):
+        """
+        Ширина прямоугольного воздуховода при заданной высоте по скорости
+        """
+        width = solve_size(
+            "duct", dict(flow=3600, height=0.5), target=4, size="width", criterion="velocity"
+        )
+        self.assertAlmostEqual(width[0], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from calculations.elbow import elbow_batch
+from calculations.tee import tee_batch
+from engine.lookup import generate_table, open_table, query_table
+
+
+class TestLookup(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "elbow")
+        self.grid = {
+            "flow": np.linspace(800, 3000, 45),
+            "diameter": np.linspace(0.16, 0.315, 32),
+            "angle": np.linspace(30, 60, 7),
+        }
+        self.fixed = {"temperature": 20, "r0": 0.4}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def expected(self, flow, diameter, angle):
+        return elbow_batch(
+            flow, self.fixed["temperature"], angle, self.fixed["r0"], diameter=diameter
+        )
+
+    def test_nodes_and_interpolation(self):
+        """
+        В узлах сетки таблица совпадает с пакетной функцией, между узлами -
+        интерполяция с небольшим отклонением (в области без разрывов коэффициентов);
+        расчет в нескольких процессах
+        """
+        table = generate_table(self.path, "elbow", self.grid, jobs=2, chunk_size=5000, **self.fixed)
+        self.assertTrue(table["complete"])
+        flow, diameter, angle = np.meshgrid(*self.grid.values(), indexing="ij")
+        np.testing.assert_allclose(
+            table["values"]["dP"], self.expected(flow, diameter, angle)["dP"].reshape(flow.shape)
+        )
+
+        rng = np.random.default_rng(1)
+        flow = rng.uniform(800, 3000, 200)
+        diameter = rng.uniform(0.16, 0.315, 200)
+        angle = rng.uniform(30, 60, 200)
+        result = query_table(self.path, "dP", flow=flow, diameter=diameter, angle=angle)
+        np.testing.assert_allclose(result, self.expected(flow, diameter, angle)["dP"], rtol=0.02)
+        self.assertTrue(np.isnan(query_table(table, "dP", flow=5000, diameter=0.2, angle=45)))
+
+    def test_resume(self):
+        """
+        Прерванный расчет продолжается: досчитываются только неготовые части
+        """
+        generate_table(self.path, "elbow", self.grid, chunk_size=50, **self.fixed)
+        complete = open_table(self.path)["values"]["dP"].copy()
+        # Имитация прерывания: вторая и последняя части не рассчитаны
+        done = np.load(os.path.join(self.path, "done.npy"))
+        done[[1, -1]] = False
+        np.save(os.path.join(self.path, "done.npy"), done)
+        column = np.load(os.path.join(self.path, "dP.npy"), mmap_mode="r+")
+        column[50:100] = np.nan
+        column[-10:] = np.nan
+        column.flush()
+        del column
+        with self.assertRaises(ValueError):
+            query_table(self.path, "dP", flow=1000, diameter=0.2, angle=90)
+
+        table = generate_table(self.path, "elbow", self.grid, chunk_size=50, **self.fixed)
+        self.assertTrue(table["complete"])
+        np.testing.assert_array_equal(table["values"]["dP"], complete)
+
+        with self.assertRaises(ValueError):
+            generate_table(self.path, "elbow", self.grid, chunk_size=50, temperature=40, r0=0.4)
+
+    def test_tee_invalid_points(self):
+        """
+        Таблица тройника с промежуточной величиной; сочетания, где расход ответвления
+        не меньше суммарного, не считаются (NaN); float32
+        """
+        grid = {"flow_c": np.linspace(300, 2000, 6), "flow_o": np.linspace(100, 1100, 6)}
+        fixed = dict(
+            temperature=20,
+            angle=90,
+            flowtype="diverge",
+            diameter_c=0.315,
+            diameter_o=0.2,
+            diameter_p=0.315,
+        )
+        table = generate_table(
+            self.path, "tee", grid, intermediates=("zeta_o",), dtype="float32", **fixed
+        )
+        self.assertEqual(table["values"]["dP_o"].dtype, np.float32)
+        flow_c, flow_o = np.meshgrid(*grid.values(), indexing="ij")
+        valid = flow_o < flow_c
+        expected = tee_batch(
+            flow_c=flow_c[valid], flow_o=flow_o[valid], intermediates=("zeta_o",), **fixed
+        )
+        np.testing.assert_allclose(table["values"]["dP_o"][valid], expected["dP_o"], rtol=1e-6)
+        np.testing.assert_allclose(table["values"]["zeta_o"][valid], expected["zeta_o"], rtol=1e-6)
+        self.assertTrue(np.isnan(table["values"]["dP_o"][~valid]).all())
+
+    def test_invalid_grid(self):
+        with self.assertRaises(ValueError):
+            generate_table(self.path, "elbow", {"flow": [1000.0]}, **self.fixed)
+        with self.assertRaises(ValueError):
+            generate_table(self.path, "damper", {"flow": [1000.0, 2000.0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
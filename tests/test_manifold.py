@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from calculations.manifold import manifold
+from calculations.tee import tee
+
+
+class TestManifold(unittest.TestCase):
+    def test_manifold_diverge_equals_tees(self):
+        """
+        Распределитель совпадает с цепочкой тройников (приточная система),
+        магистраль сужается, ответвления разные по габаритам
+        """
+        flows_o = [300, 200, 400, 250]
+        diameters_main = [0.315, 0.28, 0.25, 0.2, 0.16]
+        result = manifold(
+            temperature=0,
+            flowtype="diverge",
+            flows_o=flows_o,
+            angles=90,
+            diameters_main=diameters_main,
+            diameters_o=[0.16, 0.125, None, 0.16],
+            heights_o=[None, None, 0.2, None],
+            widths_o=[None, None, 0.3, None],
+            flow_through=100,
+        )
+        np.testing.assert_allclose(result["flow_main"], [1250, 950, 750, 350, 100])
+        sections_o = [
+            dict(diameter_o=0.16),
+            dict(diameter_o=0.125),
+            dict(height_o=0.2, width_o=0.3),
+            dict(diameter_o=0.16),
+        ]
+        for i, (flow_o, section_o) in enumerate(zip(flows_o, sections_o)):
+            expected = tee(
+                temperature=0,
+                angle=90,
+                flowtype="diverge",
+                flow_c=result["flow_main"][i],
+                flow_o=flow_o,
+                diameter_c=diameters_main[i],
+                diameter_p=diameters_main[i + 1],
+                **section_o,
+            )
+            self.assertAlmostEqual(result["dP_o"][i], expected["dP_o"])
+            self.assertAlmostEqual(result["dP_p"][i], expected["dP_p"])
+
+    def test_manifold_converge_equals_tees(self):
+        """
+        Коллектор совпадает с цепочкой тройников (вытяжная система), прямоугольная магистраль
+        """
+        flows_o = [500, 500, 1000]
+        result = manifold(
+            temperature=-25,
+            flowtype="converge",
+            flows_o=flows_o,
+            angles=[90, 45, 90],
+            heights_main=0.3,
+            widths_main=[0.3, 0.3, 0.4, 0.6],
+            heights_o=0.3,
+            widths_o=0.3,
+            flow_through=500,
+        )
+        np.testing.assert_allclose(result["flow_main"], [500, 1000, 1500, 2500])
+        for i, (flow_o, angle) in enumerate(zip(flows_o, [90, 45, 90])):
+            expected = tee(
+                temperature=-25,
+                angle=angle,
+                flowtype="converge",
+                flow_p=result["flow_main"][i],
+                flow_o=flow_o,
+                height_c=0.3,
+                width_c=[0.3, 0.3, 0.4, 0.6][i + 1],
+                height_p=0.3,
+                width_p=[0.3, 0.3, 0.4, 0.6][i],
+                height_o=0.3,
+                width_o=0.3,
+            )
+            self.assertAlmostEqual(result["dP_o"][i], expected["dP_o"])
+            self.assertAlmostEqual(result["dP_p"][i], expected["dP_p"])
+
+    def test_manifold_assert(self):
+        """
+        Проверка проверок: неверное количество участков магистрали
+        """
+        with self.assertRaises(AssertionError):
+            manifold(
+                temperature=0,
+                flowtype="diverge",
+                flows_o=[300, 300],
+                angles=90,
+                diameters_main=[0.2, 0.16],
+                diameters_o=0.16,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from engine.montecarlo import monte_carlo
+from engine.store import create_store, add_element, evaluate_store
+
+
+def example_store():
+    store = create_store()
+    for i in range(5):
+        add_element(
+            store, f"D{i}", "duct", flow=600 + 100 * i, length=1.37, temperature=0, diameter=0.16
+        )
+    add_element(store, "E1", "elbow", flow=600, temperature=0, angle=90, r0=0.185, diameter=0.16)
+    add_element(
+        store,
+        "E2",
+        "elbow",
+        flow=1000,
+        temperature=-25,
+        angle=90,
+        r0=0.25,
+        oriented="vert",
+        height=0.3,
+        width=0.3,
+    )
+    return store
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_percentiles(self):
+        """
+        Процентили упорядочены, медиана близка к номинальному расчету
+        """
+        store = example_store()
+        distributions = {
+            "roughness": ("uniform", 0.0009, 0.0011),
+            "temperature": ("normal", 1),
+            "diameter": ("relative_normal", 0.005),
+        }
+        result = monte_carlo(store, distributions, samples=2000)
+        nominal = evaluate_store(store)
+        for element_id in store:
+            values = result[element_id]
+            self.assertTrue(values["dP_p5"] < values["dP_p50"] < values["dP_p95"])
+            self.assertAlmostEqual(values["dP_p50"] / nominal[element_id]["dP"], 1, delta=0.02)
+        # Для прямоугольного отвода diameter не разыгрывается
+        self.assertLess(result["E2"]["dP_std"], result["E1"]["dP_std"])
+
+    def test_seed_and_chunks(self):
+        """
+        Результат воспроизводим при том же seed; разбиение на части работает
+        при ограничении строк меньше размера проекта
+        """
+        store = example_store()
+        distributions = {"temperature": ("normal", 5)}
+        first = monte_carlo(store, distributions, samples=100, seed=7, max_rows=200)
+        second = monte_carlo(store, distributions, samples=100, seed=7, max_rows=200)
+        self.assertEqual(first, second)
+        other = monte_carlo(store, distributions, samples=100, seed=8, max_rows=200)
+        self.assertNotEqual(first["D0"]["dP_mean"], other["D0"]["dP_mean"])
+
+    def test_missing_diameter(self):
+        """
+        Равномерное распределение diameter не меняет прямоугольные воздуховоды
+        в одном пакете с круглыми
+        """
+        store = create_store()
+        add_element(store, "R", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(store, "S", "duct", flow=600, length=1.37, temperature=0, height=0.2, width=0.3)
+        result = monte_carlo(store, {"diameter": ("uniform", 0.15, 0.17)}, samples=500)
+        nominal = evaluate_store(store)
+        self.assertGreater(result["R"]["dP_std"], 0)
+        self.assertAlmostEqual(result["S"]["dP_std"], 0)
+        self.assertAlmostEqual(result["S"]["dP_p50"], nominal["S"]["dP"])
+
+    def test_default_parameter(self):
+        """
+        Параметр, не заданный у элемента, разыгрывается вокруг значения по умолчанию
+        пакетной функции, параметр, которого нет у вида, не разыгрывается;
+        параметр, которого нет ни у одного элемента, - ошибка
+        """
+        store = example_store()
+        result = monte_carlo(store, {"roughness": ("uniform", 0.0001, 0.0002)}, samples=200)
+        nominal = evaluate_store(store)
+        self.assertLess(result["D0"]["dP_p95"], nominal["D0"]["dP"])
+        self.assertGreater(result["D0"]["dP_std"], 0)
+        # У отвода длины нет, она разыгрывается только у воздуховодов
+        result = monte_carlo(store, {"length": ("relative_normal", 0.1)}, samples=200)
+        self.assertGreater(result["D0"]["dP_std"], 0)
+        self.assertAlmostEqual(result["E1"]["dP_std"], 0)
+        with self.assertRaises(ValueError):
+            monte_carlo(store, {"rougness": ("normal", 0.0001)}, samples=10)
+
+    def test_unknown_distribution(self):
+        with self.assertRaises(ValueError):
+            monte_carlo(example_store(), {"temperature": ("lognormal", 1)}, samples=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+from calculations.duct import duct_batch
+from calculations.elbow import elbow_batch
+from calculations.tee import tee_batch
+from engine.parallel import evaluate_columns
+
+
+class TestParallel(unittest.TestCase):
+    def test_evaluate_columns(self):
+        """
+        Расчет пакета в нескольких процессах (общая память и сериализация)
+        совпадает с расчетом в одном процессе, в т.ч. строковые столбцы, столбцы
+        объектов (oriented со строками и None) и NaN
+        """
+        rng = np.random.default_rng(0)
+        size = 1001
+        duct_columns = {
+            "flow": rng.uniform(100, 2000, size),
+            "length": 1.0,
+            "temperature": rng.uniform(-30, 40, size),
+            "diameter": np.where(rng.random(size) < 0.1, np.nan, 0.16),
+        }
+        tee_columns = {
+            "temperature": 0,
+            "angle": 90,
+            "flowtype": np.where(rng.random(size) < 0.5, "diverge", "converge"),
+            "flow_o": rng.uniform(100, 500, size),
+            "flow_p": rng.uniform(100, 500, size),
+            "diameter_c": 0.2,
+            "diameter_o": 0.16,
+            "diameter_p": 0.2,
+        }
+        is_round = rng.random(size) < 0.3
+        elbow_columns = {
+            "flow": rng.uniform(100, 2000, size),
+            "temperature": 0,
+            "angle": 90,
+            "r0": 0.2,
+            "oriented": np.where(is_round, None, np.where(rng.random(size) < 0.5, "horiz", "vert")),
+            "diameter": np.where(is_round, 0.16, np.nan),
+            "height": 0.2,
+            "width": 0.3,
+        }
+        self.assertEqual(elbow_columns["oriented"].dtype, object)
+        for kind, kernel, columns in [
+            ("duct", duct_batch, duct_columns),
+            ("tee", tee_batch, tee_columns),
+            ("elbow", elbow_batch, elbow_columns),
+        ]:
+            expected = kernel(**columns)
+            for transport in ("shared", "pickle"):
+                result = evaluate_columns(kind, columns, jobs=3, transport=transport)
+                self.assertEqual(set(result), set(expected))
+                for name in expected:
+                    np.testing.assert_allclose(result[name], expected[name])
+
+    def test_autotune(self):
+        """
+        Расчет с подбором размера части и количества процессов совпадает
+        с расчетом одним вызовом
+        """
+        rng = np.random.default_rng(0)
+        columns = {
+            "flow": rng.uniform(100, 2000, 30000),
+            "length": 1.0,
+            "temperature": rng.uniform(-30, 40, 30000),
+            "diameter": 0.16,
+        }
+        with self.assertLogs("engine.autotune", "INFO"):
+            result = evaluate_columns("duct", columns, jobs=2, autotune=True)
+        np.testing.assert_array_equal(result["dP"], duct_batch(**columns)["dP"])
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            evaluate_columns("duct", {"flow": [1, 2]}, jobs=2, transport="socket")
+
+
+if __name__ == "__main__":
+    unittest.main()
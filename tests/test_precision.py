@@ -0,0 +1,115 @@
+import unittest
+import numpy as np
+from calculations.duct import duct_batch
+from engine.precision import check_precision, relative_error
+from engine.store import KERNELS
+
+PARAMS = {
+    "duct": dict(flow=[300.0, 900.0], length=2, temperature=20, diameter=0.2),
+    "elbow": dict(
+        flow=[300.0, 900.0],
+        temperature=20,
+        angle=90,
+        r0=0.25,
+        height=0.3,
+        width=0.2,
+        oriented="horiz",
+    ),
+    "transition": dict(
+        flow=[300.0, 900.0], temperature=20, diameter1=0.2, diameter2=0.3, length=0.3
+    ),
+    "tee": dict(
+        flow_c=[800.0, 900.0],
+        flow_o=300,
+        temperature=20,
+        angle=90,
+        flowtype=["diverge", "converge"],
+        diameter_c=0.3,
+        diameter_o=0.2,
+        diameter_p=0.3,
+    ),
+    "cross": dict(
+        flow_c=[800.0, 900.0],
+        flow_o1=300,
+        flow_o2=200,
+        temperature=20,
+        angle_o1=90,
+        angle_o2=60,
+        flowtype=["diverge", "converge"],
+        diameter_c=0.3,
+        diameter_o1=0.2,
+        diameter_o2=0.16,
+        diameter_p=0.3,
+    ),
+}
+
+
+class TestPrecision(unittest.TestCase):
+    def test_float32_kernels(self):
+        """
+        Все пакетные функции в режиме float32 возвращают float32 (в т.ч. производные
+        и промежуточные величины), результат близок к float64
+        """
+        for kind, params in PARAMS.items():
+            for thermophysics in ("idelchik", "thermo"):
+                exact = KERNELS[kind](**params, thermophysics=thermophysics, derivative=True)
+                compact = KERNELS[kind](
+                    **params,
+                    thermophysics=thermophysics,
+                    derivative=True,
+                    dtype="float32",
+                    intermediates=("density",),
+                )
+                self.assertEqual(compact["density"].dtype, np.float32)
+                for name in exact:
+                    self.assertEqual(compact[name].dtype, np.float32, (kind, name))
+                    if name.startswith("dP"):
+                        np.testing.assert_allclose(compact[name], exact[name], rtol=1e-5)
+        with self.assertRaises(ValueError):
+            duct_batch(**PARAMS["duct"], dtype="float16")
+
+    def test_check_precision(self):
+        """
+        Проверка на выборке отмечает строки тройника, где потери на проходе близки к нулю
+        (скорость прохода около скорости в сборном рукаве - переключение ветвей
+        dzeta_diverge()), и не отмечает воздуховоды
+        """
+        flow_p = 1000 - np.geomspace(1e-3, 100, 101)
+        report = check_precision(
+            "tee",
+            dict(
+                temperature=20,
+                angle=90,
+                flowtype="diverge",
+                flow_c=1000,
+                flow_p=flow_p,
+                diameter_c=0.315,
+                diameter_o=0.2,
+                diameter_p=0.315,
+            ),
+            sample_size=None,
+        )
+        self.assertEqual(len(report["rows"]), 101)
+        self.assertTrue(len(report["flagged"]) > 0)
+        self.assertTrue(np.all(flow_p[report["flagged"]] > 990))
+        self.assertGreater(report["max_error"]["dP_p"], 1e-4)
+
+        rng = np.random.default_rng(0)
+        report = check_precision(
+            "duct",
+            dict(flow=rng.uniform(50, 5000, 10000), length=2, temperature=20, diameter=0.2),
+            sample_size=500,
+        )
+        self.assertEqual(len(report["rows"]), 500)
+        self.assertEqual(len(report["flagged"]), 0)
+        self.assertLess(report["max_error"]["dP"], 1e-5)
+
+    def test_relative_error(self):
+        np.testing.assert_array_equal(
+            relative_error([1.0, np.nan, 0.0, 1.0, np.nan], [2.0, np.nan, 0.0, 0.0, 1.0]),
+            [0.5, 0, 0, np.inf, np.inf],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
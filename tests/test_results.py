@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from calculations.duct import duct_batch
+from engine.results import (
+    RESULT_COLUMNS,
+    create_result_store,
+    flush,
+    open_result_store,
+    write_batch,
+    write_store,
+)
+from engine.store import create_store, add_element, evaluate_store
+from physics import vectorized
+
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_batch(self):
+        """
+        Пакеты записываются частями прямо в хранилище, после повторного открытия
+        столбцы совпадают с расчетом пакетной функцией
+        """
+        size = 1000
+        flow = np.linspace(100, 2000, size)
+        columns = {"flow": flow, "length": 2.0, "temperature": 20, "diameter": 0.2}
+        results = create_result_store(self.path, size)
+        start = 0
+        for chunk in np.array_split(np.arange(size), 3):
+            chunk_columns = dict(columns, flow=flow[chunk])
+            start = write_batch(results, start, "duct", [f"D{i}" for i in chunk], chunk_columns)
+        flush(results)
+        del results
+
+        results = open_result_store(self.path)
+        self.assertEqual(list(results), ["id"] + list(RESULT_COLUMNS))
+        self.assertIsInstance(results["dP"], np.memmap)
+        self.assertEqual(results["id"][size - 1], f"D{size - 1}")
+        np.testing.assert_allclose(results["dP"], duct_batch(**columns)["dP"])
+        velocity = vectorized.velocity(flow, np.nan, np.nan, 0.2)
+        np.testing.assert_allclose(results["velocity"], velocity)
+        p_dyn = vectorized.dynamic_pressure(vectorized.density_mendeleev(20), velocity)
+        np.testing.assert_allclose(results["zeta"] * p_dyn, results["dP"])
+        np.testing.assert_allclose(results["zeta"], results["lambda"] * 2.0 / 0.2)
+
+    def test_long_id(self):
+        """
+        id длиннее поля хранилища не обрезается, а вызывает ошибку
+        """
+        results = create_result_store(self.path, 2, id_length=8)
+        columns = {"flow": 600, "length": 1.0, "temperature": 20, "diameter": 0.2}
+        self.assertEqual(write_batch(results, 0, "duct", ["12345678"], columns), 1)
+        with self.assertRaises(ValueError):
+            write_batch(results, 1, "duct", ["123456789"], columns)
+
+    def test_write_store(self):
+        """
+        Запись хранилища элементов разных видов; у тройника - свои столбцы
+        """
+        store = create_store()
+        add_element(store, "D1", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(
+            store,
+            "T1",
+            "tee",
+            temperature=0,
+            angle=90,
+            flowtype="diverge",
+            flow_p=600,
+            flow_o=300,
+            diameter_c=0.16,
+            diameter_o=0.16,
+            diameter_p=0.16,
+        )
+        add_element(
+            store, "E1", "elbow", flow=600, temperature=0, angle=90, r0=0.185, diameter=0.16
+        )
+        results = create_result_store(self.path, 3, RESULT_COLUMNS + ("dP_o", "dP_p"))
+        self.assertEqual(write_store(results, store), 3)
+        expected = evaluate_store(store)
+        self.assertEqual(list(results["id"]), ["D1", "T1", "E1"])
+        self.assertAlmostEqual(results["dP"][0], expected["D1"]["dP"])
+        self.assertAlmostEqual(results["dP"][2], expected["E1"]["dP"])
+        self.assertAlmostEqual(results["dP_o"][1], expected["T1"]["dP_o"])
+        self.assertTrue(np.isnan(results["dP"][1]))
+        self.assertTrue(np.isnan(results["Re"][1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
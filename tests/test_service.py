@@ -0,0 +1,145 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+import numpy as np
+from calculations.elbow import elbow
+from calculations.tee import tee
+from engine.service import ServiceError, calculate, create_service, metrics, start_server
+
+ELBOW = {"flow": 600, "temperature": 0, "angle": 90, "r0": 0.185, "diameter": 0.16}
+TEE = {
+    "temperature": 0,
+    "angle": 90,
+    "flowtype": "diverge",
+    "flow_p": 600,
+    "flow_o": 300,
+    "diameter_c": 0.160,
+    "diameter_o": 0.160,
+    "diameter_p": 0.160,
+}
+
+
+async def http_request(port, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    return await raw_request(
+        port,
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body,
+    )
+
+
+async def raw_request(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    async def test_micro_batching(self):
+        """
+        Одновременные запросы объединяются в пакеты, результаты совпадают со скалярным расчетом
+        """
+        service = create_service(window=0.01)
+        flows = [300 + 10 * i for i in range(100)]
+        results = await asyncio.gather(
+            *[calculate(service, "elbow", dict(ELBOW, flow=flow)) for flow in flows]
+        )
+        for flow, result in zip(flows, results):
+            self.assertAlmostEqual(result["dP"], elbow(**dict(ELBOW, flow=flow)))
+        values = metrics(service)
+        self.assertEqual(values["completed"], 100)
+        self.assertLess(values["batches"], 10)
+        self.assertGreater(values["mean_batch_size"], 10)
+
+    async def test_invalid_request(self):
+        """
+        Некорректный запрос отклоняется, не затрагивая остальные запросы пакета
+        """
+        service = create_service(window=0.01)
+        results = await asyncio.gather(
+            calculate(service, "elbow", ELBOW),
+            calculate(service, "elbow", dict(ELBOW, height=0.2, width=0.2)),
+            calculate(service, "elbow", dict(ELBOW, unknown=1)),
+            return_exceptions=True,
+        )
+        self.assertAlmostEqual(results[0]["dP"], elbow(**ELBOW))
+        self.assertEqual(results[1].status, 400)
+        self.assertEqual(results[2].status, 400)
+        self.assertEqual(metrics(service)["invalid"], 2)
+
+    async def test_queue_full_and_timeout(self):
+        """
+        Переполнение очереди (503) и истечение времени ожидания (504)
+        """
+        service = create_service(window=0.05, max_queue=1, timeout=0.001)
+        results = await asyncio.gather(
+            calculate(service, "duct", {"flow": 600, "length": 1, "temperature": 0}),
+            calculate(service, "duct", {"flow": 600, "length": 1, "temperature": 0}),
+            return_exceptions=True,
+        )
+        self.assertEqual(sorted(error.status for error in results), [503, 504])
+        with self.assertRaises(ServiceError):
+            await calculate(service, "damper", {})
+
+    async def test_http(self):
+        """
+        Расчет и метрики через HTTP на локальной машине
+        """
+        service = create_service()
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        status, result = await http_request(port, "POST", "/tee", TEE)
+        self.assertEqual(status, 200)
+        self.assertAlmostEqual(result["dP_o"], tee(**TEE)["dP_o"])
+        status, results = await http_request(port, "POST", "/elbow", [ELBOW, ELBOW])
+        self.assertEqual(len(results), 2)
+        status, _ = await http_request(port, "POST", "/damper", {})
+        self.assertEqual(status, 404)
+        status, values = await http_request(port, "GET", "/metrics")
+        self.assertEqual(values["completed"], 3)
+        server.close()
+        await server.wait_closed()
+        with self.assertRaises(ValueError):
+            await start_server(service, host="0.0.0.0")
+
+    async def test_http_nan(self):
+        """
+        Нечисловой результат в ответе HTTP - null (ответ остается корректным JSON)
+        """
+        service = create_service()
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        values = {"dP": np.array([np.nan]), "zeta": np.array([np.inf]), "error": np.array([0])}
+        with mock.patch("engine.service.evaluate_elements", return_value=values):
+            status, result = await http_request(port, "POST", "/elbow", ELBOW)
+        self.assertEqual(status, 200)
+        self.assertEqual(result, {"dP": None, "zeta": None})
+        server.close()
+        await server.wait_closed()
+
+    async def test_http_malformed(self):
+        """
+        Некорректная строка запроса или Content-Length - ответ 400, а не разрыв соединения
+        """
+        service = create_service()
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        for data in (
+            b"POST /duct HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+            b"POST /duct HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+            b"GARBAGE\r\n\r\n",
+        ):
+            status, result = await raw_request(port, data)
+            self.assertEqual(status, 400)
+            self.assertIn("message", result)
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    unittest.main()
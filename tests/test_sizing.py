@@ -0,0 +1,63 @@
+import unittest
+import numpy as np
+from engine.sizing import round_catalog, rectangular_catalog, select_round, select_rectangular
+
+
+class TestSizing(unittest.TestCase):
+    def test_catalogs(self):
+        """
+        Каталоги отсортированы, в прямоугольном высота не больше ширины
+        """
+        diameters = round_catalog()
+        self.assertTrue(np.all(np.diff(diameters) > 0))
+        catalog = rectangular_catalog()
+        self.assertTrue(np.all(catalog["height"] <= catalog["width"]))
+        self.assertTrue(np.all(np.diff(catalog["aspect"]) >= 0))
+
+    def test_select_round_velocity(self):
+        """
+        Подбор по скорости: выбранный диаметр проходит, а предыдущий в каталоге - нет
+        """
+        flows = np.array([100, 600, 1000, 5000, 20000])
+        result = select_round(flows, 20, max_velocity=5)
+        self.assertTrue(np.all(result["velocity"] <= 5))
+        diameters = round_catalog()
+        index = np.searchsorted(diameters, result["diameter"])
+        smaller = diameters[np.maximum(index - 1, 0)]
+        velocity_smaller = flows / 3600 / (np.pi * smaller**2 / 4)
+        self.assertTrue(np.all((velocity_smaller > 5) | (index == 0)))
+        self.assertAlmostEqual(result["diameter"][1], 0.225)
+
+    def test_select_round_specific_loss(self):
+        """
+        Подбор по удельным потерям и по обоим критериям сразу
+        """
+        result = select_round([600, 600], 20, max_velocity=[None, 3], max_specific_loss=1)
+        self.assertTrue(np.all(result["specific_loss"] <= 1))
+        self.assertTrue(result["velocity"][1] <= 3)
+        self.assertTrue(result["diameter"][1] >= result["diameter"][0])
+
+    def test_select_round_not_found(self):
+        """
+        Если в каталоге нет подходящего диаметра, возвращается NaN
+        """
+        result = select_round(1e7, 20, max_velocity=1)
+        self.assertTrue(np.isnan(result["diameter"][0]))
+
+    def test_select_rectangular(self):
+        """
+        Подбор прямоугольных сечений с ограничением соотношения сторон
+        """
+        flows = np.random.default_rng(1).uniform(200, 30000, 1000)
+        result = select_rectangular(flows, 20, max_velocity=6, max_specific_loss=1.5, max_aspect=2)
+        self.assertTrue(np.all(result["velocity"] <= 6))
+        self.assertTrue(np.all(result["specific_loss"] <= 1.5))
+        self.assertTrue(np.all(result["width"] / result["height"] <= 2))
+
+        result = select_rectangular(1000, 20, max_velocity=4, max_aspect=1)
+        self.assertAlmostEqual(result["height"][0], 0.3)
+        self.assertAlmostEqual(result["width"][0], 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import numpy as np
+from engine.statistics import (
+    create_statistics,
+    merge_statistics,
+    stream_statistics,
+    summarize,
+    summarize_groups,
+    update_statistics,
+)
+from engine.store import add_element, create_store, evaluate_store
+
+
+def elements(count):
+    # Поток разнотипных элементов, каждый десятый воздуховод - с некорректным диаметром
+    for i in range(count):
+        diameter = -1 if i % 10 == 0 else 0.16
+        yield f"D{i}", "duct", {
+            "flow": 300 + i,
+            "length": 2,
+            "temperature": 0,
+            "diameter": diameter,
+        }
+        yield f"E{i}", "elbow", {
+            "flow": 300 + i,
+            "temperature": 0,
+            "angle": 90,
+            "r0": 0.185,
+            "diameter": 0.2,
+        }
+
+
+def by_zone(element_id, kind, params):
+    # Группа - вид элемента и зона по расходу
+    return kind, "high" if params["flow"] >= 400 else "low"
+
+
+class TestStatistics(unittest.TestCase):
+    def test_summary(self):
+        """
+        Сводка по частям: количество, минимум, максимум, среднее и СКО точные,
+        квантили - с заданной относительной погрешностью; NaN считаются отдельно
+        """
+        rng = np.random.default_rng(0)
+        values = np.concatenate(
+            [rng.lognormal(2, 1.5, 50000), -rng.lognormal(0, 1, 5000), np.zeros(50)]
+        )
+        rng.shuffle(values)
+        statistics = create_statistics(relative_accuracy=0.01)
+        for part in np.array_split(values, 7):
+            update_statistics(statistics, part)
+        update_statistics(statistics, [np.nan, np.nan])
+        summary = summarize(statistics, (0.01, 0.5, 0.95, 0.99))
+        self.assertEqual(summary["count"], values.size)
+        self.assertEqual(summary["nan"], 2)
+        self.assertEqual(summary["min"], values.min())
+        self.assertEqual(summary["max"], values.max())
+        self.assertAlmostEqual(summary["mean"], values.mean())
+        self.assertAlmostEqual(summary["std"], values.std())
+        for q in (0.01, 0.5, 0.95, 0.99):
+            expected = np.quantile(values, q, method="lower")
+            self.assertLessEqual(abs(summary[f"p{q * 100:g}"] - expected), 0.01 * abs(expected))
+
+    def test_merge(self):
+        """
+        Объединение накопителей частей дает ту же статистику, что и один накопитель
+        """
+        rng = np.random.default_rng(1)
+        values = rng.uniform(-10, 100, 10000)
+        whole = create_statistics()
+        update_statistics(whole, values)
+        first, second = create_statistics(), create_statistics()
+        update_statistics(first, values[:3000])
+        update_statistics(second, values[3000:])
+        merge_statistics(first, second)
+        merged, expected = summarize(first), summarize(whole)
+        for name in expected:
+            self.assertAlmostEqual(merged[name], expected[name])
+        np.testing.assert_array_equal(first["positive"], whole["positive"])
+        with self.assertRaises(ValueError):
+            merge_statistics(first, create_statistics(relative_accuracy=0.02))
+
+    def test_stream_statistics(self):
+        """
+        Потоковая статистика по видам элементов совпадает со статистикой по всем
+        результатам расчета хранилища; в нескольких процессах - то же
+        """
+        store = create_store()
+        for element_id, kind, params in elements(200):
+            add_element(store, element_id, kind, **params)
+        results = evaluate_store(store, validate=True, intermediates={"duct": ("velocity",)})
+
+        groups = stream_statistics(elements(200), chunk_size=64, names=("dP", "velocity"))
+        summary = summarize_groups(groups)
+        self.assertEqual(set(summary), {"duct", "elbow"})
+        dP = np.array([results[f"D{i}"]["dP"] for i in range(200)])
+        self.assertEqual(summary["duct"]["dP"]["count"], 180)
+        self.assertEqual(summary["duct"]["dP"]["nan"], 20)
+        self.assertAlmostEqual(summary["duct"]["dP"]["mean"], np.nanmean(dP))
+        self.assertEqual(summary["duct"]["dP"]["max"], np.nanmax(dP))
+        velocity = np.array([results[f"D{i}"]["velocity"] for i in range(200)])
+        self.assertAlmostEqual(summary["duct"]["velocity"]["mean"], np.nanmean(velocity))
+
+        parallel = summarize_groups(
+            stream_statistics(elements(200), chunk_size=64, names=("dP", "velocity"), jobs=2)
+        )
+        for kind in summary:
+            for name in summary[kind]:
+                for key, value in summary[kind][name].items():
+                    self.assertAlmostEqual(parallel[kind][name][key], value)
+
+        zones = summarize_groups(stream_statistics(elements(200), group=by_zone, names=("dP",)))
+        self.assertEqual(zones[("elbow", "high")]["dP"]["count"], 100)
+        self.assertEqual(zones[("elbow", "low")]["dP"]["count"], 100)
+        with self.assertRaises(ValueError):
+            stream_statistics(elements(10), chunk_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
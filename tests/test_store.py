@@ -0,0 +1,63 @@
+import unittest
+from calculations.duct import duct
+from calculations.tee import tee
+from engine.store import create_store, add_element, evaluate_store, scaled_params
+
+
+class TestStore(unittest.TestCase):
+    def test_evaluate_store(self):
+        """
+        Проверка, что расчет хранилища пакетами совпадает с поэлементным расчетом,
+        в т.ч. при разных thermophysics в одном хранилище
+        """
+        store = create_store()
+        add_element(store, "D1", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(
+            store,
+            "D2",
+            "duct",
+            flow=1000,
+            length=1.0,
+            temperature=-25,
+            height=0.3,
+            width=0.3,
+            thermophysics="thermo",
+        )
+        add_element(
+            store,
+            "T1",
+            "tee",
+            temperature=0,
+            angle=90,
+            flowtype="diverge",
+            flow_p=600,
+            flow_o=300,
+            diameter_c=0.160,
+            diameter_o=0.160,
+            diameter_p=0.160,
+        )
+        results = evaluate_store(store)
+        self.assertEqual(list(results), ["D1", "D2", "T1"])
+        self.assertAlmostEqual(results["D1"]["dP"], duct(**store["D1"]["params"]))
+        self.assertAlmostEqual(results["D2"]["dP"], duct(**store["D2"]["params"]))
+        self.assertAlmostEqual(results["T1"]["dP_o"], tee(**store["T1"]["params"])["dP_o"])
+
+    def test_add_element_unknown_kind(self):
+        """
+        Проверка ошибки при неизвестном виде элемента
+        """
+        with self.assertRaises(ValueError):
+            add_element(create_store(), "X", "damper", flow=100)
+
+    def test_scaled_params(self):
+        """
+        Проверка пропорционального пересчета расходов тройника
+        """
+        params = scaled_params("tee", {"flow_c": 900, "flow_o": 300, "angle": 90}, 1800)
+        self.assertAlmostEqual(float(params["flow_c"]), 1800)
+        self.assertAlmostEqual(float(params["flow_o"]), 600)
+        self.assertEqual(params["angle"], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import itertools
+import unittest
+from engine.project import element_spec
+from engine.store import create_store, add_element, evaluate_store
+from engine.stream import stream_results
+
+
+def elements(count):
+    # Бесконечный (или длинный) поток разнотипных элементов
+    for i in range(count):
+        yield f"D{i}", "duct", {"flow": 300 + i, "length": 1.0, "temperature": 0, "diameter": 0.16}
+        yield {
+            "id": f"E{i}",
+            "kind": "elbow",
+            "flow": 300 + i,
+            "temperature": 0,
+            "angle": 90,
+            "r0": 0.185,
+            "diameter": 0.16,
+        }
+
+
+class TestStream(unittest.TestCase):
+    def test_stream_order_and_values(self):
+        """
+        Результаты выдаются в порядке входа и совпадают с расчетом хранилища
+        """
+        store = create_store()
+        for spec in elements(10):
+            element_id, kind, params = element_spec(spec)
+            add_element(store, element_id, kind, **params)
+        expected = evaluate_store(store)
+        streamed = list(stream_results(elements(10), chunk_size=3))
+        self.assertEqual([element_id for element_id, _ in streamed], list(store))
+        for element_id, values in streamed:
+            self.assertAlmostEqual(values["dP"], expected[element_id]["dP"])
+
+    def test_stream_lazy(self):
+        """
+        Поток считается частями: первые результаты доступны без чтения всего входа
+        """
+        results = stream_results(elements(10**9), chunk_size=4, validate=True)
+        first = list(itertools.islice(results, 5))
+        self.assertEqual([element_id for element_id, _ in first], ["D0", "E0", "D1", "E1", "D2"])
+        self.assertEqual(first[0][1]["error"], 0)
+
+    def test_chunk_size(self):
+        """
+        Неположительный размер части - ValueError (проверка не отключается python -O)
+        """
+        with self.assertRaises(ValueError):
+            next(stream_results(elements(10), chunk_size=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
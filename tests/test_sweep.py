@@ -0,0 +1,117 @@
+import glob
+import os
+import tempfile
+import unittest
+import numpy as np
+from calculations.duct import duct_batch
+from calculations.tee import tee_batch
+from engine.statistics import summarize_groups
+from engine.sweep import sweep
+from physics import vectorized
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = self.directory.name
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_duct_grid(self):
+        """
+        Расчет воздуховода на сетке расход x диаметр совпадает с пакетной функцией
+        """
+        flows = np.linspace(100, 2000, 7)
+        diameters = np.array([0.16, 0.2, 0.25])
+        result = sweep(
+            "duct",
+            {"flow": flows, "diameter": diameters},
+            cache_directory=self.cache,
+            length=2.0,
+            temperature=20,
+        )
+        self.assertEqual(result["dP"].shape, (7, 3))
+        for j, diameter in enumerate(diameters):
+            expected = duct_batch(flows, 2.0, 20, diameter=diameter)
+            np.testing.assert_allclose(result["dP"][:, j], expected["dP"], rtol=1e-12)
+
+    def test_cache(self):
+        """
+        Результат сохраняется в кэш, повторный расчет той же сетки читается из файла;
+        другие постоянные аргументы - другой файл кэша
+        """
+        grid = {"flow": np.linspace(100, 2000, 5)}
+        first = sweep(
+            "duct", grid, cache_directory=self.cache, length=1.0, temperature=20, diameter=0.2
+        )
+        self.assertEqual(len(glob.glob(os.path.join(self.cache, "duct-*.npz"))), 1)
+        second = sweep(
+            "duct", grid, cache_directory=self.cache, length=1.0, temperature=20, diameter=0.2
+        )
+        self.assertEqual(set(first), set(second))
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name])
+        sweep("duct", grid, cache_directory=self.cache, length=2.0, temperature=20, diameter=0.2)
+        self.assertEqual(len(glob.glob(os.path.join(self.cache, "duct-*.npz"))), 2)
+
+    def test_statistics(self):
+        """
+        Статистика по частям сетки без сборки результатов совпадает со статистикой
+        полного результата; части с контрольными точками удаляются, кэш не пишется
+        """
+        grid = {"flow": np.linspace(100, 2000, 50), "diameter": np.array([0.16, 0.2])}
+        fixed = dict(length=1.0, temperature=20)
+        result = sweep("duct", grid, cache_directory=None, **fixed)
+        for cache_directory in (None, self.cache):
+            statistics = sweep(
+                "duct", grid, cache_directory=cache_directory, chunk_size=16, statistics={}, **fixed
+            )
+            summary = summarize_groups(statistics)["duct"]["dP"]
+            self.assertEqual(summary["count"], 100)
+            self.assertAlmostEqual(summary["mean"], result["dP"].mean())
+            self.assertEqual(summary["max"], result["dP"].max())
+        self.assertEqual(os.listdir(self.cache), [])
+
+    def test_linked(self):
+        """
+        Расход ответвления тройника, пропорциональный расходу ствола
+        """
+        flows = np.linspace(300, 3000, 6)
+        fixed = dict(
+            temperature=20,
+            angle=90,
+            flowtype="diverge",
+            diameter_c=0.315,
+            diameter_o=0.2,
+            diameter_p=0.315,
+        )
+        result = sweep(
+            "tee",
+            {"flow_c": flows},
+            {"flow_o": ("flow_c", 1 / 3)},
+            cache_directory=None,
+            **fixed,
+        )
+        expected = tee_batch(flow_c=flows, flow_o=flows / 3, **fixed)
+        np.testing.assert_allclose(result["dP_o"], expected["dP_o"], rtol=1e-12)
+        np.testing.assert_allclose(result["dP_p"], expected["dP_p"], rtol=1e-12)
+
+    def test_property(self):
+        """
+        Свойство воздуха на сетке температур возвращается под именем 'value'
+        """
+        temperatures = np.arange(-50, 501, 50)
+        result = sweep("density_mendeleev", {"t": temperatures}, cache_directory=self.cache)
+        np.testing.assert_allclose(result["value"], vectorized.density_mendeleev(temperatures))
+
+    def test_unknown_target(self):
+        """
+        Неизвестная величина - ошибка
+        """
+        with self.assertRaises(ValueError):
+            sweep("damper", {"flow": [1.0]}, cache_directory=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
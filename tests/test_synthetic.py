@@ -0,0 +1,133 @@
+import collections
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from engine.project import load_project
+from engine.store import add_element, create_store, evaluate_store, main_flow
+from engine.synthetic import generate_network, main
+
+
+def elements_by_id(network):
+    return {element["id"]: element for element in network["elements"]}
+
+
+class TestSynthetic(unittest.TestCase):
+    def test_valid(self):
+        """
+        Все элементы сети проходят проверку входных данных и дают конечные потери;
+        в сети есть элементы всех видов
+        """
+        for system in ("supply", "exhaust"):
+            network = generate_network(2000, system=system, seed=3)
+            kinds = collections.Counter(element["kind"] for element in network["elements"])
+            self.assertEqual(set(kinds), {"duct", "elbow", "transition", "tee", "cross"})
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "network.json")
+                with open(path, "w") as jsonfile:
+                    json.dump(network, jsonfile)
+                store = load_project(path)
+            results = evaluate_store(store, validate=True)
+            self.assertEqual(len(results), len(network["elements"]))
+            for values in results.values():
+                self.assertEqual(values["error"], 0)
+                self.assertTrue(all(np.isfinite(value) for value in values.values()))
+
+    def test_size(self):
+        """
+        Количество элементов близко к заданному, с ростом сети растет количество систем
+        """
+        for elements in (100, 1000, 20000):
+            network = generate_network(elements, seed=1)
+            self.assertLess(abs(len(network["elements"]) - elements), 0.05 * elements + 10)
+        self.assertGreater(network["systems"], 10)
+
+    def test_deterministic(self):
+        """
+        Одинаковые аргументы - одинаковая сеть, другое начальное значение - другая
+        """
+        self.assertEqual(generate_network(500, seed=7), generate_network(500, seed=7))
+        self.assertNotEqual(generate_network(500, seed=7), generate_network(500, seed=8))
+
+    def test_flows(self):
+        """
+        Расходы согласованы по дереву: элемент цепочки имеет расход элемента выше,
+        за узлом - расход своего патрубка; у каждой системы один начальный элемент
+        """
+        network = generate_network(1000, branching=1.5, seed=2)
+        elements = elements_by_id(network)
+        for element_id, (upstream, port) in network["links"].items():
+            element = elements[element_id]
+            if upstream is None:
+                self.assertIsNone(port)
+                continue
+            flow = main_flow(element["kind"], element)
+            parent = elements[upstream]
+            if port is None:
+                self.assertAlmostEqual(flow, main_flow(parent["kind"], parent))
+            else:
+                self.assertIn(parent["kind"], ("tee", "cross"))
+                self.assertAlmostEqual(flow, parent[f"flow_{port}"])
+        roots = [
+            element_id for element_id, (upstream, _) in network["links"].items() if not upstream
+        ]
+        self.assertEqual(len(roots), network["systems"])
+
+    def test_options(self):
+        """
+        Доли круглых сечений и количество ответвлений в узлах задаются аргументами
+        """
+        network = generate_network(1000, round_share=1, branching=1, elbow_share=0)
+        kinds = collections.Counter(element["kind"] for element in network["elements"])
+        self.assertEqual(kinds["cross"] + kinds["elbow"], 0)
+        self.assertFalse(any("height" in element for element in network["elements"]))
+        network = generate_network(1000, round_share=0, branching=2, transition_share=0)
+        kinds = collections.Counter(element["kind"] for element in network["elements"])
+        self.assertEqual(kinds["tee"] + kinds["transition"], 0)
+        self.assertFalse(any("diameter" in element for element in network["elements"]))
+        with self.assertRaises(ValueError):
+            generate_network(100, branching=3)
+        with self.assertRaises(ValueError):
+            generate_network(100, terminal_flow=(20000, 30000))
+
+    def test_deep_trees(self):
+        """
+        Глубокие деревья: расходы систем, которые не пропускает каталог, уменьшаются,
+        все элементы проходят проверку; заданный диапазон расходов не изменяется
+        """
+        network = generate_network(5000, depth=8, branching=1.3)
+        store = create_store()
+        for element in network["elements"]:
+            element = dict(element)
+            add_element(store, element.pop("id"), element.pop("kind"), **element)
+        results = evaluate_store(store, validate=True)
+        self.assertTrue(all(values["error"] == 0 for values in results.values()))
+        with self.assertRaises(ValueError):
+            generate_network(5000, depth=8, branching=1.3, terminal_flow=(100, 1000))
+
+    def test_cli(self):
+        """
+        Командная строка записывает файл сети, который читается как проект
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "network.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                main([path, "-n", "300", "--system", "exhaust"])
+            self.assertGreater(len(load_project(path)), 250)
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(
+                    [path, "-n", "300", "--terminal-flow", "50", "60", "--max-velocity", "4"]
+                    + ["--temperature", "-10"]
+                )
+            elements = list(load_project(path).values())
+            self.assertTrue(all(element["params"]["temperature"] == -10 for element in elements))
+            # Наименьший расход - расход концевого участка
+            flows = [main_flow(element["kind"], element["params"]) for element in elements]
+            self.assertTrue(50 <= min(flows) <= 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
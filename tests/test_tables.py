@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from physics import tables
+
+
+class TestTables(unittest.TestCase):
+    def setUp(self):
+        # Двумерная таблица билинейной функции: интерполяция по ней точна
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "grid.csv")
+        with open(path, "w") as csvfile:
+            csvfile.write("y,x,value\n")
+            for y in [2.0, 0.0, 1.0]:
+                for x in [0.0, 0.5, 2.0, 4.0]:
+                    csvfile.write(f"{y},{x},{1 + 2 * x + 3 * y + x * y}\n")
+        tables.register_table("test_grid", path, ("x", "y"))
+
+    def tearDown(self):
+        del tables.TABLES["test_grid"]
+        tables.load_table.cache_clear()
+        self.directory.cleanup()
+
+    def test_bilinear(self):
+        """
+        Билинейная интерполяция по массивам запросов, строки файла в любом порядке
+        """
+        x = np.array([0.0, 0.25, 1.3, 4.0, 3.99])
+        y = np.array([0.0, 1.7, 0.4, 2.0, 0.01])
+        np.testing.assert_allclose(
+            tables.interpolate("test_grid", "value", x, y), 1 + 2 * x + 3 * y + x * y
+        )
+        self.assertAlmostEqual(float(tables.interpolate("test_grid", "value", 1, 1)[()]), 7)
+
+    def test_outside(self):
+        """
+        Вне диапазона таблицы и для NaN - NaN
+        """
+        result = tables.interpolate("test_grid", "value", [-0.1, 1, 1, np.nan], [1, 2.1, 1, 1])
+        np.testing.assert_array_equal(np.isnan(result), [True, True, False, True])
+
+    def test_unknown_table(self):
+        with self.assertRaises(ValueError):
+            tables.load_table("elbow_vanes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from calculations.tee import tee
+from calculations.tee import tee, tee_batch
 
 
 class TestTee(unittest.TestCase):
@@ -143,6 +143,50 @@ class TestTee(unittest.TestCase):
                 thermophysics="idelchik",
             )
 
+    def test_tee_derivative(self):
+        """
+        Проверка аналитических производных dP по flow_o и flow_p конечной разностью
+        для смешения и разделения. Для разделения проход попадает в обе ветки формулы 51.
+        """
+        params = dict(temperature=0, angle=90, diameter_c=0.2, diameter_o=0.16, diameter_p=0.2)
+        for flowtype in ["converge", "diverge"]:
+            result = tee(flowtype=flowtype, flow_o=300, flow_p=600, derivative=True, **params)
+            batch = tee_batch(flowtype=flowtype, flow_o=300, flow_p=600, derivative=True, **params)
+            for name in ["o", "p"]:
+                step = {"o": 0.01 if name == "o" else 0, "p": 0.01 if name == "p" else 0}
+                plus = tee(
+                    flowtype=flowtype, flow_o=300 + step["o"], flow_p=600 + step["p"], **params
+                )
+                minus = tee(
+                    flowtype=flowtype, flow_o=300 - step["o"], flow_p=600 - step["p"], **params
+                )
+                for path in ["o", "p"]:
+                    key = f"ddP_{path}_dflow_{name}"
+                    finite_difference = (plus[f"dP_{path}"] - minus[f"dP_{path}"]) / 0.02
+                    self.assertAlmostEqual(result[key], finite_difference, places=6)
+                    self.assertAlmostEqual(batch[key][0], result[key])
+
+    def test_tee_batch(self):
+        """
+        Пакетный расчет с разными flowtype в одном пакете совпадает со скалярным
+        """
+        result = tee_batch(
+            temperature=-25,
+            angle=90,
+            flowtype=["diverge", "converge"],
+            flow_c=2000,
+            flow_o=1000,
+            height_c=0.3,
+            width_c=0.3,
+            height_p=0.3,
+            width_p=0.3,
+            height_o=0.3,
+            width_o=0.3,
+        )
+        self.assertAlmostEqual(result["dP_o"][0], 30.52, places=1)
+        self.assertAlmostEqual(result["dP_p"][0], 6.783, places=1)
+        self.assertAlmostEqual(result["dP_o"][1], 15.25, places=1)
+
 
 if __name__ == "__main__":
     unittest.main()
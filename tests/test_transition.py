@@ -1,5 +1,6 @@
+import math
 import unittest
-from calculations.transition import transition
+from calculations.transition import transition, transition_batch
 
 
 class Testtransition(unittest.TestCase):
@@ -87,6 +88,58 @@ class Testtransition(unittest.TestCase):
         )
         self.assertAlmostEqual(result, 0.4, places=1)
 
+    def test_transition_derivative(self):
+        """
+        Проверка аналитической производной dP по расходу конечной разностью
+        и совпадения пакетного расчета со скалярным
+        """
+        params = dict(
+            temperature=-25, height1=0.3, width1=0.3, height2=0.6, width2=0.6, length=0.22
+        )
+        result, derivative = transition(flow=2000, derivative=True, **params)
+        finite_difference = (
+            transition(flow=2000.01, **params) - transition(flow=1999.99, **params)
+        ) / 0.02
+        self.assertAlmostEqual(derivative, finite_difference, places=6)
+
+        batch = transition_batch(flow=2000, derivative=True, **params)
+        self.assertAlmostEqual(batch["dP"][0], result)
+        self.assertAlmostEqual(batch["ddP_dflow"][0], derivative)
+
+    def test_transition_batch_confusor(self):
+        """
+        Пакетный расчет сужения совпадает со скалярным (обе версии расчета)
+        """
+        params = dict(
+            flow=300,
+            temperature=0,
+            diameter1=0.16,
+            diameter2=0.125,
+            length=0.078,
+            roughness=0.0015,
+        )
+        for calcversion in [None, "22"]:
+            result = transition_batch(calcversion=calcversion, **params)
+            self.assertAlmostEqual(result["dP"][0], transition(calcversion=calcversion, **params))
+
+    def test_transition_batch_intermediates(self):
+        """
+        Промежуточные величины перехода: отношение площадей и угол раскрытия
+        """
+        result = transition_batch(
+            flow=300,
+            temperature=0,
+            diameter1=0.16,
+            diameter2=0.125,
+            length=0.078,
+            intermediates=("n_ratio", "alfa05", "dzeta_transition", "dzeta_friction", "zeta"),
+        )
+        self.assertAlmostEqual(result["n_ratio"][0], (0.16 / 0.125) ** 2)
+        self.assertAlmostEqual(result["alfa05"][0], math.atan(0.035 / 2 / 0.078))
+        self.assertAlmostEqual(
+            result["zeta"][0], result["dzeta_transition"][0] + result["dzeta_friction"][0]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
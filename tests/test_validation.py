@@ -0,0 +1,141 @@
+import unittest
+import numpy as np
+from calculations.duct import duct
+from engine.store import create_store, add_element, evaluate_elements, evaluate_store
+from engine.validation import (
+    validate,
+    error_messages,
+    error_summary,
+    GEOMETRY_BOTH,
+    GEOMETRY_MISSING,
+    ORIENTATION_INVALID,
+    FLOWS_INVALID,
+    FLOWTYPE_INVALID,
+    TEMPERATURE_OUT_OF_RANGE,
+    PARAMETER_INVALID,
+)
+from physics.vectorized import kinematic_viscosity_idelchik
+
+
+class TestValidation(unittest.TestCase):
+    def test_validate_duct(self):
+        """
+        Те же случаи, что в test_duct_assert_errors, но кодами ошибок по строкам
+        """
+        errors = validate(
+            "duct",
+            {
+                "flow": [600, 600, 600, 600, -1],
+                "length": 1.37,
+                "temperature": [0, 0, 0, 0, -200],
+                "height": [None, 0.3, None, 0.3, None],
+                "width": [None, None, None, None, None],
+                "diameter": [0.16, None, None, 0.16, 0.16],
+            },
+        )
+        self.assertEqual(errors[0], 0)
+        self.assertTrue(errors[1] & GEOMETRY_MISSING)
+        self.assertTrue(errors[2] & GEOMETRY_MISSING)
+        self.assertTrue(errors[3] & GEOMETRY_BOTH)
+        self.assertTrue(errors[4] & PARAMETER_INVALID)
+        self.assertTrue(errors[4] & TEMPERATURE_OUT_OF_RANGE)
+        self.assertIn("Значение температуры слишком далеко от данных", error_messages(errors[4]))
+
+    def test_validate_elbow_tee_cross(self):
+        """
+        Ориентация отвода, расходы и flowtype тройника, баланс расходов крестовины
+        """
+        errors = validate(
+            "elbow",
+            {
+                "flow": 1000,
+                "temperature": 0,
+                "angle": 90,
+                "r0": 0.25,
+                "oriented": [None, "vert", "diag"],
+                "height": 0.3,
+                "width": 0.6,
+            },
+        )
+        np.testing.assert_array_equal(errors & ORIENTATION_INVALID, [8, 0, 8])
+
+        errors = validate(
+            "tee",
+            {
+                "temperature": 0,
+                "angle": 90,
+                "flowtype": ["diverge", "mix", "converge"],
+                "flow_c": [None, None, 900],
+                "flow_o": [300, 300, 300],
+                "flow_p": [600, 600, 600],
+                "diameter_c": 0.16,
+                "diameter_o": 0.16,
+                "diameter_p": 0.16,
+            },
+        )
+        np.testing.assert_array_equal(errors, [0, FLOWTYPE_INVALID, FLOWS_INVALID])
+
+        errors = validate(
+            "cross",
+            {
+                "temperature": 0,
+                "flowtype": "diverge",
+                "flow_c": [900, 500],
+                "flow_o1": [300, 300],
+                "flow_o2": [300, 300],
+                "diameter_c": 0.16,
+                "diameter_o1": 0.16,
+                "diameter_o2": 0.16,
+                "diameter_p": 0.16,
+                "angle_o1": 90,
+                "angle_o2": 90,
+            },
+        )
+        np.testing.assert_array_equal(errors, [0, FLOWS_INVALID])
+
+    def test_masked_batch(self):
+        """
+        Некорректные строки не останавливают пакет: корректные считаются, некорректные - NaN
+        """
+        params = [
+            dict(flow=600, length=1.37, temperature=0, diameter=0.16),
+            dict(flow=600, length=1.37, temperature=0, height=0.3),
+            dict(flow=600, length=1.37, temperature=-500, diameter=0.16),
+            dict(flow=1000, length=1.0, temperature=-25, height=0.3, width=0.3),
+        ]
+        result = evaluate_elements("duct", params, validate=True)
+        self.assertAlmostEqual(result["dP"][0], duct(**params[0]))
+        self.assertAlmostEqual(result["dP"][3], duct(**params[3]))
+        self.assertTrue(np.all(np.isnan(result["dP"][1:3])))
+        self.assertEqual(
+            error_summary(result["error"]),
+            {
+                "Не указана ни пара height/width, ни diameter.": 1,
+                "Неправильно указаны геометрические характеристики": 1,
+                "Значение температуры слишком далеко от данных": 1,
+            },
+        )
+
+    def test_store_validate(self):
+        """
+        Код ошибки попадает в результаты элементов хранилища
+        """
+        store = create_store()
+        add_element(store, "D1", "duct", flow=600, length=1.37, temperature=0, diameter=0.16)
+        add_element(store, "D2", "duct", flow=600, length=1.37, temperature=0)
+        results = evaluate_store(store, validate=True)
+        self.assertEqual(results["D1"]["error"], 0)
+        self.assertNotEqual(results["D2"]["error"], 0)
+        self.assertTrue(np.isnan(results["D2"]["dP"]))
+
+    def test_viscosity_out_of_range(self):
+        """
+        Векторизованная вязкость по Идельчик дает NaN за пределом экстраполяции
+        """
+        result = kinematic_viscosity_idelchik(np.array([-81, -41, 0]))
+        self.assertTrue(np.isnan(result[0]))
+        self.assertFalse(np.any(np.isnan(result[1:])))
+
+
+if __name__ == "__main__":
+    unittest.main()